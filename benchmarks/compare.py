@@ -0,0 +1,79 @@
+# benchmarks/compare.py
+# 두 벤치마크 결과(run.py 의 JSON)를 비교한다
+#
+#   python benchmarks/compare.py benchmarks/results/a1b2c3d.json benchmarks/results/e4f5a6b.json
+#
+# seconds 는 작을수록, *_per_sec 는 클수록 좋다. --threshold(기본 10%) 보다 나빠진 항목이 있으면
+# 종료 코드 1 (CI 에서 회귀 검사로 쓸 수 있다). 설정(config)이 다르면 경고만 한다.
+import sys
+import json
+import argparse
+
+IGNORED_CONFIG = {"out", "scenarios"}
+
+
+def flatten(results, prefix=""):
+    """{"host": {"stats": {"seconds": ..}}} → {"host.stats.seconds": ..} (runs 목록은 뺀다)"""
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, name + "."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool) and \
+                (key == "seconds" or key.endswith("_seconds") or key.endswith("_per_sec")):
+            flat[name] = value
+    return flat
+
+
+def change(metric, old, new):
+    """좋아진 쪽이 양수인 변화율"""
+    if not old or not new:
+        return None
+    if metric.endswith("_per_sec"):
+        return new / old - 1
+    return old / new - 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two CEDGE benchmark results")
+    parser.add_argument("base")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Regression threshold as a fraction (default 0.10)")
+    args = parser.parse_args()
+
+    with open(args.base, "r", encoding="utf-8") as f:
+        base = json.load(f)
+    with open(args.new, "r", encoding="utf-8") as f:
+        new = json.load(f)
+
+    print(f"base {base['meta']['commit']}{' (dirty)' if base['meta'].get('dirty') else ''}  →  "
+          f"new {new['meta']['commit']}{' (dirty)' if new['meta'].get('dirty') else ''}")
+    differs = sorted(k for k in set(base["config"]) | set(new["config"])
+                     if k not in IGNORED_CONFIG and base["config"].get(k) != new["config"].get(k))
+    if differs:
+        print(f"⚠️  설정이 다릅니다: {', '.join(differs)} (결과를 직접 비교하기 어렵습니다)")
+
+    old_flat, new_flat = flatten(base["results"]), flatten(new["results"])
+    regressions = 0
+    for metric in sorted(set(old_flat) & set(new_flat)):
+        delta = change(metric, old_flat[metric], new_flat[metric])
+        mark = ""
+        if delta is not None and delta < -args.threshold:
+            mark = "  ❌ 회귀"
+            regressions += 1
+        elif delta is not None and delta > args.threshold:
+            mark = "  ✅"
+        shown = f"{delta * 100:+.1f}%" if delta is not None else "-"
+        print(f"   {metric:<40} {old_flat[metric]:>14,} → {new_flat[metric]:>14,}  {shown:>8}{mark}")
+    for metric in sorted(set(old_flat) ^ set(new_flat)):
+        print(f"   {metric:<40} (한쪽에만 있음)")
+
+    if regressions:
+        print(f"\n❌ {args.threshold:.0%} 넘게 나빠진 항목 {regressions}개")
+        sys.exit(1)
+    print("\n✅ 회귀 없음")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+# benchmarks/generate.py
+# 벤치마크용 합성 프로젝트 생성기 (같은 seed 면 어느 머신에서나 같은 파일, 같은 편집)
+#
+#   python benchmarks/generate.py /tmp/bench --files 1000 --size 20000 --kind text
+#   python benchmarks/generate.py /tmp/bench --edit-rate 0.1 --round 1     # 10% 파일을 편집
+#
+# 파일 i 의 내용과 round r 의 편집은 random.Random((seed, i, r)) 로만 정해지므로
+# 파일 수를 바꿔도 앞쪽 파일들은 그대로다. mtime 도 round 로 정해 두어 stat cache 결과가 재현된다.
+#   text  : 줄 단위 텍스트 (줄 바꿈, 삽입, 삭제)
+#   jsonl : {"id": ..., "name": ..., "score": ...} 레코드 (레코드 수정, 추가, 삭제)
+import os
+import json
+import random
+import argparse
+
+PROJECT = "bench_pj"
+BASE_MTIME = 1_700_000_000      # 생성 시각 (round r 의 편집은 BASE_MTIME + r)
+WORDS = ["alpha", "bravo", "charlie", "delta", "echo", "foxtrot", "golf", "hotel", "india",
+         "juliet", "kilo", "lima", "mike", "november", "oscar", "papa", "quebec", "romeo"]
+
+
+def _rng(seed, *parts):
+    return random.Random(":".join(str(p) for p in (seed, *parts)))
+
+
+def file_path(root, index, kind="text", project=PROJECT, per_dir=100):
+    """파일 i 의 경로. 폴더 하나에 per_dir 개씩 나눈다"""
+    ext = "jsonl" if kind == "jsonl" else "txt"
+    return os.path.join(root, project, f"d{index // per_dir:04d}", f"f{index:06d}.{ext}")
+
+
+def _line(rng, kind, n):
+    if kind == "jsonl":
+        return json.dumps({"id": n, "name": " ".join(rng.choices(WORDS, k=3)),
+                           "score": rng.randrange(1000)})
+    return f"{n:06d} " + " ".join(rng.choices(WORDS, k=rng.randint(4, 12)))
+
+
+def make_lines(seed, index, size, kind="text"):
+    rng = _rng(seed, index, 0)
+    lines = []
+    total = 0
+    while total < size:
+        line = _line(rng, kind, len(lines))
+        lines.append(line)
+        total += len(line) + 1
+    return lines
+
+
+def _write(path, lines, mtime):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    os.utime(path, (mtime, mtime))
+
+
+def generate_project(root, files, size, kind="text", seed=1, project=PROJECT):
+    """files 개의 파일(각각 약 size 바이트)을 만든다. 만든 경로 목록"""
+    paths = []
+    for i in range(files):
+        path = file_path(root, i, kind, project)
+        _write(path, make_lines(seed, i, size, kind), BASE_MTIME)
+        paths.append(path)
+    return paths
+
+
+def edit_lines(lines, rng, kind="text", edits=3):
+    """줄 몇 개를 바꾸고, 하나를 끼워 넣고, 하나를 지운다 (jsonl 은 레코드 단위)"""
+    lines = list(lines)
+    for _ in range(edits):
+        if not lines:
+            break
+        pos = rng.randrange(len(lines))
+        if kind == "jsonl":
+            record = json.loads(lines[pos])
+            record["score"] = rng.randrange(1000)
+            lines[pos] = json.dumps(record)
+        else:
+            lines[pos] = lines[pos].split(" ", 1)[0] + " " + " ".join(rng.choices(WORDS, k=6))
+    if lines:
+        lines.insert(rng.randrange(len(lines) + 1), _line(rng, kind, 900000 + rng.randrange(99999)))
+    if len(lines) > 1:
+        del lines[rng.randrange(len(lines))]
+    return lines
+
+
+def edit_project(root, files, rate, round_no, kind="text", seed=1, project=PROJECT):
+    """round_no 번째 편집: 파일 중 rate 비율을 고쳐 쓴다. 고친 경로 목록"""
+    chosen = _rng(seed, "pick", round_no).sample(range(files), max(1, int(files * rate)))
+    edited = []
+    for i in sorted(chosen):
+        path = file_path(root, i, kind, project)
+        with open(path, "r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        _write(path, edit_lines(lines, _rng(seed, i, round_no), kind), BASE_MTIME + round_no)
+        edited.append(path)
+    return edited
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic cedge project")
+    parser.add_argument("root")
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--size", type=int, default=20000, help="Approximate bytes per file")
+    parser.add_argument("--kind", choices=["text", "jsonl"], default="text")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--edit-rate", type=float, default=None,
+                        help="Edit this fraction of existing files instead of generating")
+    parser.add_argument("--round", type=int, default=1, help="Edit round number")
+    args = parser.parse_args()
+
+    if args.edit_rate is None:
+        paths = generate_project(args.root, args.files, args.size, args.kind, args.seed)
+        print(f"✅ {len(paths)}개 파일 생성: {os.path.join(args.root, PROJECT)}")
+    else:
+        paths = edit_project(args.root, args.files, args.edit_rate, args.round, args.kind, args.seed)
+        print(f"✏️  {len(paths)}개 파일 편집 (round {args.round})")
+
+
+if __name__ == "__main__":
+    main()
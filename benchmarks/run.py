@@ -0,0 +1,337 @@
+# benchmarks/run.py
+# 재현 가능한 벤치마크: 합성 프로젝트(generate.py)로 client 명령과 host API 를 재고 JSON 으로 남긴다
+#
+#   python benchmarks/run.py                                  # 기본 규모, 모든 시나리오
+#   python benchmarks/run.py --files 2000 --size 50000 --repeat 5 --out before.json
+#   python benchmarks/run.py --scenarios noop_add,incremental_add --kind jsonl
+#   python benchmarks/compare.py before.json after.json       # 커밋 간 비교
+#
+# 시나리오 (client 는 cli/ 의 함수를 같은 프로세스에서 부르고, 단계마다 캐시를 비워 CLI 한 번 실행과 같게 잰다)
+#   register         cedge register .           (새 복사본에서)
+#   noop_add         cedge add . 변경 없음       (stat cache 만 확인)
+#   incremental_add  cedge add . --edit-rate 비율의 파일을 고친 뒤
+#   show_diff        cedge show diff <파일>      (고친 파일들, 첫 버전과 비교)
+#   deep_history     --depth 번 고친 파일들의 첫 버전 복원
+#                    (reconstruct_version: keyframe 사용 / reconstruct_old_content_from_diffs: diff 전부 역적용)
+#   host             임시 host 프로세스의 register_files / register_file / uuid 조회 / stats 처리량
+#
+# 각 시나리오를 --repeat 번 돌려 중앙값을 seconds 로, 처리량(*_per_sec)은 중앙값 기준으로 남긴다.
+# 결과는 기본으로 benchmarks/results/<commit>.json 에 저장된다.
+import io
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+import statistics
+import subprocess
+import contextlib
+import http.client
+from concurrent.futures import ThreadPoolExecutor
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, os.path.join(REPO_DIR, "cli"))
+sys.path.insert(0, os.path.join(REPO_DIR, "server"))
+
+import log
+import packstore
+from commands import (register_files, add_files, show_diff_by_file, get_base_uuid,
+                      reconstruct_version, reconstruct_old_content_from_diffs)
+from packstore import open_store
+from tracked import TrackedIndex
+from loadtest import start_host, free_port, call
+from generate import PROJECT, generate_project, edit_project, file_path
+
+SCENARIOS = ["register", "noop_add", "incremental_add", "show_diff", "deep_history", "host"]
+CLIENT_SCENARIOS = SCENARIOS[:4]
+SHOW_DIFF_FILES = 20     # show_diff 에서 보는 파일 수 (고친 파일 중 앞에서부터)
+
+
+@contextlib.contextmanager
+def workdir(path):
+    """path 로 이동하고 CLI 출력을 숨긴다"""
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            yield
+    finally:
+        os.chdir(previous)
+
+
+def cold():
+    """열어 둔 pack / 저널을 닫아 다음 단계가 새 CLI 실행처럼 index 부터 읽게 한다"""
+    for journal in log._journals.values():
+        journal.flush()
+    log._journals.clear()
+    for store in packstore._stores.values():
+        store.close()
+    packstore._stores.clear()
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    fn(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def summarize(runs, **counts):
+    """runs(초) 의 중앙값과, counts 의 각 항목을 중앙값으로 나눈 처리량"""
+    seconds = statistics.median(runs)
+    result = {"seconds": round(seconds, 6), "runs": [round(r, 6) for r in runs]}
+    for name, count in counts.items():
+        result[name] = count
+        result[f"{name}_per_sec"] = round(count / seconds, 2) if seconds else None
+    return result
+
+
+def run_client(config, template, tmp):
+    """register → noop_add → incremental_add → show_diff 를 repeat 번, 매번 새 복사본에서"""
+    runs = {name: [] for name in CLIENT_SCENARIOS}
+    edited = []
+    for r in range(config["repeat"]):
+        work = os.path.join(tmp, f"client-{r}")
+        shutil.copytree(template, work)
+        with workdir(work):
+            cold()
+            runs["register"].append(timed(register_files, ".", config["jobs"]))
+            cold()
+            runs["noop_add"].append(timed(add_files, ".", config["jobs"]))
+            cold()
+            edited = edit_project(".", config["files"], config["edit_rate"], 1,
+                                  config["kind"], config["seed"])
+            runs["incremental_add"].append(timed(add_files, ".", config["jobs"]))
+            cold()
+            targets = [os.path.relpath(p, ".") for p in edited[:SHOW_DIFF_FILES]]
+            start = time.perf_counter()
+            for rel_path in targets:
+                show_diff_by_file(rel_path, ".", target_version=1)
+            runs["show_diff"].append(time.perf_counter() - start)
+            cold()
+        shutil.rmtree(work, ignore_errors=True)
+
+    return {
+        "register": summarize(runs["register"], files=config["files"]),
+        "noop_add": summarize(runs["noop_add"], files=config["files"]),
+        "incremental_add": summarize(runs["incremental_add"], files=len(edited)),
+        "show_diff": summarize(runs["show_diff"], files=min(len(edited), SHOW_DIFF_FILES)),
+    }
+
+
+def run_deep_history(config, tmp):
+    """history_files 개 파일을 depth 번 고쳐 add 한 뒤 첫 버전 복원 시간을 잰다"""
+    work = os.path.join(tmp, "history")
+    files = config["history_files"]
+    generate_project(work, files, config["size"], config["kind"], config["seed"])
+    start = time.perf_counter()
+    with workdir(work):
+        cold()
+        register_files(".")
+        for round_no in range(1, config["depth"] + 1):
+            edit_project(".", files, 1.0, round_no, config["kind"], config["seed"])
+            cold()
+            add_files(".")
+        cold()
+    build = time.perf_counter() - start
+
+    keyframe_runs, chain_runs = [], []
+    with workdir(work):
+        index = TrackedIndex.load(".")
+        targets = []
+        for i in range(files):
+            rel_path = os.path.relpath(file_path(".", i, config["kind"]), ".")
+            entry = index.get(rel_path)
+            targets.append((get_base_uuid(PROJECT, rel_path), entry["version"]))
+        for _ in range(config["repeat"]):
+            cold()
+            open_store(".")   # index 읽기는 재지 않는다
+            start = time.perf_counter()
+            for base_uuid, latest in targets:
+                reconstruct_version(base_uuid, 1, latest, ".")
+            keyframe_runs.append(time.perf_counter() - start)
+
+            cold()
+            store = open_store(".")
+            start = time.perf_counter()
+            for base_uuid, latest in targets:
+                reconstruct_old_content_from_diffs(store.last_content(base_uuid),
+                                                   store.diffs_between(base_uuid, 1, latest))
+            chain_runs.append(time.perf_counter() - start)
+        cold()
+    shutil.rmtree(work, ignore_errors=True)
+
+    return {
+        "build_seconds": round(build, 6),
+        "depth": config["depth"],
+        "keyframe": summarize(keyframe_runs, files=files),
+        "full_chain": summarize(chain_runs, files=files),
+    }
+
+
+def run_host(config, tmp):
+    """임시 host 를 띄우고 등록/조회 처리량을 잰다 (replicator 는 끈다)"""
+    work = os.path.join(tmp, "host")
+    os.makedirs(work)
+    port = free_port()
+    proc = start_host(config["host_server"], work, port)
+    clients = config["host_clients"]
+    total = config["host_uuids"]
+    try:
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+        call(conn, "POST", "/api/create_project", {"name": PROJECT})
+        call(conn, "POST", "/api/register_harbor",
+             {"name": "bh", "url": "http://127.0.0.1:9", "manage_project": [PROJECT]})
+
+        def parallel(make_requests):
+            """clients 개 연결이 make_requests(client 번호) 의 요청들을 나눠 보낸다. 걸린 시간"""
+            def worker(n):
+                c = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+                for request in make_requests(n):
+                    status, _ = call(c, *request)
+                    if status >= 400:
+                        raise RuntimeError(f"host 응답 {status}: {request[1]}")
+                c.close()
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=clients) as pool:
+                list(pool.map(worker, range(clients)))
+            return time.perf_counter() - start
+
+        share = max(1, total // clients)
+        batch = config["host_batch"]
+
+        def batches(n):
+            uuids = [f"bench-batch{n}-{i:08x}-1" for i in range(share)]
+            for i in range(0, share, batch):
+                yield ("POST", "/api/register_files", {
+                    "project": PROJECT, "harbor_name": "bh",
+                    "files": [{"uuid": u, "version": 1} for u in uuids[i:i + batch]]})
+
+        def singles(n):
+            for i in range(share):
+                yield ("POST", "/api/register_file",
+                       {"uuid": f"bench-single{n}-{i:08x}-1", "project": PROJECT, "harbor_name": "bh"})
+
+        def lookups(n):
+            for i in range(share):
+                yield ("GET", f"/api/uuid/bench-single{n}-{i:08x}-1", None)
+
+        def stats(n):
+            for _ in range(max(1, share // 10)):
+                yield ("GET", "/api/stats", None)
+
+        done = share * clients
+        return {
+            "server": config["host_server"],
+            "clients": clients,
+            "register_files": summarize([parallel(batches)], uuids=done),
+            "register_file": summarize([parallel(singles)], requests=done),
+            "uuid_lookup": summarize([parallel(lookups)], requests=done),
+            "stats": summarize([parallel(stats)], requests=max(1, share // 10) * clients),
+        }
+    finally:
+        proc.terminate()
+        proc.wait()
+        shutil.rmtree(work, ignore_errors=True)
+
+
+def git_meta():
+    def git(*args):
+        try:
+            return subprocess.run(["git", *args], cwd=REPO_DIR, capture_output=True,
+                                  text=True, timeout=30).stdout.strip()
+        except (OSError, subprocess.SubprocessError):
+            return ""
+    return {"commit": git("rev-parse", "--short", "HEAD") or "unknown",
+            "dirty": bool(git("status", "--porcelain", "--untracked-files=no"))}
+
+
+def run(config):
+    scenarios = config["scenarios"]
+    results = {}
+    tmp = tempfile.mkdtemp(prefix="cedge-bench-")
+    try:
+        if any(s in scenarios for s in CLIENT_SCENARIOS):
+            template = os.path.join(tmp, "template")
+            generate_project(template, config["files"], config["size"], config["kind"], config["seed"])
+            print(f"⏱️  client: 파일 {config['files']}개 × {config['size']:,} bytes, repeat {config['repeat']}")
+            client = run_client(config, template, tmp)
+            results.update({k: v for k, v in client.items() if k in scenarios})
+        if "deep_history" in scenarios:
+            print(f"⏱️  deep_history: 파일 {config['history_files']}개 × 버전 {config['depth'] + 1}")
+            results["deep_history"] = run_deep_history(config, tmp)
+        if "host" in scenarios:
+            print(f"⏱️  host ({config['host_server']}): UUID {config['host_uuids']:,}개, "
+                  f"연결 {config['host_clients']}개")
+            results["host"] = run_host(config, tmp)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    return {
+        "meta": {**git_meta(), "python": platform.python_version(),
+                 "platform": platform.platform(), "cpu_count": os.cpu_count(),
+                 "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S")},
+        "config": config,
+        "results": results,
+    }
+
+
+def print_results(report):
+    for name, result in report["results"].items():
+        if name == "deep_history":
+            print(f"   {name:<16} build {result['build_seconds']:.3f}s, "
+                  f"keyframe {result['keyframe']['seconds']:.4f}s, "
+                  f"full chain {result['full_chain']['seconds']:.4f}s")
+        elif name == "host":
+            for key in ("register_files", "register_file", "uuid_lookup", "stats"):
+                r = result[key]
+                rate = next(v for k, v in r.items() if k.endswith("_per_sec"))
+                print(f"   host.{key:<11} {r['seconds']:.3f}s  {rate:,}/s")
+        else:
+            print(f"   {name:<16} {result['seconds']:.4f}s  ({result['files_per_sec']:,} files/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CEDGE benchmark suite")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        help=f"Comma separated subset of: {', '.join(SCENARIOS)}")
+    parser.add_argument("--files", type=int, default=200, help="Files in the synthetic project")
+    parser.add_argument("--size", type=int, default=20000, help="Approximate bytes per file")
+    parser.add_argument("--kind", choices=["text", "jsonl"], default="text")
+    parser.add_argument("--edit-rate", type=float, default=0.1, help="Fraction of files edited")
+    parser.add_argument("--depth", type=int, default=50, help="Versions per file in deep_history")
+    parser.add_argument("--history-files", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--jobs", type=int, default=1, help="cedge register/add --jobs")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--host-server", choices=["async", "flask"], default="async")
+    parser.add_argument("--host-uuids", type=int, default=4000)
+    parser.add_argument("--host-clients", type=int, default=8)
+    parser.add_argument("--host-batch", type=int, default=500)
+    parser.add_argument("--out", default=None, help="Result file (default: benchmarks/results/<commit>.json)")
+    args = parser.parse_args()
+
+    config = vars(args).copy()
+    out = config.pop("out")
+    config["scenarios"] = [s for s in args.scenarios.split(",") if s]
+    unknown = set(config["scenarios"]) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    report = run(config)
+    print_results(report)
+    if out is None:
+        meta = report["meta"]
+        out = os.path.join(BENCH_DIR, "results",
+                           f"{meta['commit']}{'-dirty' if meta['dirty'] else ''}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📝 {out}")
+
+
+if __name__ == "__main__":
+    main()
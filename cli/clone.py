@@ -0,0 +1,468 @@
+# cli/clone.py
+# cedge clone: 여러 harbor 로부터 병렬로 프로젝트를 내려받는다
+#
+# 1. host 에서 프로젝트의 파일 레코드(UUID, 버전, replica 가 있는 harbor 들)를 한 번의
+#    NDJSON 스트림으로 받는다 (/api/project/<name>/manifest).
+#    받은 레코드와 revision 을 .cedge/clone.json 에 두고, 다음 실행에서는 since=<revision> 으로
+#    바뀐 레코드만 받는다. 같은 파일의 이전 버전은 받지 않는다.
+#    manifest API 가 없는 host 면 /api/project/<name> + UUID 별 /api/uuid/<uuid> 로 조회한다.
+# 2. harbor 에서 파일 manifest(경로, 크기, 해시, chunk 목록)를 받음   GET <harbor>/files/<uuid>
+# 3. 아직 없는 chunk 만, 그 chunk 를 가진 harbor 들에 나눠서 동시에 받음  GET <harbor>/chunks/<hash>
+#    harbor 마다 동시 연결 수를 제한하고, 실패하면 다른 harbor 로 재시도한다.
+#    chunk 마다 '남은 배정량 / 처리 속도'가 가장 작은(가장 빨리 끝낼) harbor 를 고른다.
+#    처리 속도는 처음에는 host 가 heartbeat 로 매긴 weight(/api/project/<name>/harbors)로
+#    추정하고, 받기 시작하면 실제로 잰 속도(EWMA)를 쓴다. 느리거나 실패하는 harbor 는 덜 받게 된다.
+# 4. chunk 는 sha256 으로, 파일은 전체 해시로 검증한 뒤 제자리에 옮긴다.
+#
+# 받은 chunk 는 <dest>/.cedge/objects 에 남으므로 중간에 끊겨도 다시 실행하면 이어서 받는다.
+import os
+import sys
+import json
+import time
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+from requests.adapters import HTTPAdapter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.chunkstore import ChunkStore
+from common.placement import placement_key
+from common.journal import Journal
+from common.paths import clean_relpath, safe_join
+from common.timings import TIMINGS
+from partial import PrefetchRules, add_placeholders, enforce_quota, touch_chunks, match_entries
+
+DEFAULT_HOST = "http://localhost:8000"
+PER_HARBOR_CONNECTIONS = 4
+REQUEST_TIMEOUT = 60
+BASE_RATE = 32 << 20    # weight 1.0 harbor 의 추정 처리 속도 (bytes/s), 실측 전까지만 쓴다
+UNKNOWN_WEIGHT = 0.5    # host 가 상태를 모르는 harbor
+RATE_ALPHA = 0.3        # 실측 속도 EWMA 계수
+FAIL_PENALTY = 0.5      # 실패하면 추정 속도를 이만큼 줄인다
+SUPERSEDED = object()   # harbor 가 410 으로 응답한 이전 버전 UUID
+
+
+class HarborPool:
+    """harbor 별 keep-alive 세션, 동시 연결 수 제한, 처리 속도 추정"""
+
+    def __init__(self, harbors, per_harbor=PER_HARBOR_CONNECTIONS):
+        self.urls = {h["name"]: h["url"].rstrip("/") for h in harbors}
+        self.sessions = {}
+        self.limits = {}
+        self.assigned = {name: 0 for name in self.urls}     # 누적 배정 바이트 (요약용)
+        self.outstanding = {name: 0 for name in self.urls}  # 아직 받고 있는 바이트
+        self.rates = {}                                     # 실측 속도 (bytes/s)
+        # host 가 죽었다고 본 harbor 는 다른 후보가 없을 때만 쓰도록 아주 낮게 둔다
+        self.weights = {h["name"]: 0.01 if h.get("alive") is False else
+                        max(0.01, h.get("weight", UNKNOWN_WEIGHT)) for h in harbors}
+        self.lock = threading.Lock()
+        for name in self.urls:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=per_harbor)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            self.sessions[name] = session
+            self.limits[name] = threading.BoundedSemaphore(per_harbor)
+
+    def get(self, name, path, **kwargs):
+        with self.limits[name]:
+            start = time.monotonic()
+            res = self.sessions[name].get(f"{self.urls[name]}{path}",
+                                          timeout=REQUEST_TIMEOUT, **kwargs)
+            res.raise_for_status()
+            res.elapsed_total = time.monotonic() - start
+        return res
+
+    def rate(self, name):
+        return self.rates.get(name) or self.weights[name] * BASE_RATE
+
+    def ranked(self, names):
+        """names 중 pool 에 있는 harbor 를 빠른 순으로"""
+        return sorted((n for n in names if n in self.urls), key=self.rate, reverse=True)
+
+    def pick(self, sources, size, exclude=()):
+        """지금 맡기면 가장 빨리 끝낼 harbor 를 고른다: (남은 배정량 + size) / 처리 속도"""
+        candidates = [s for s in sources if s in self.urls and s not in exclude]
+        if not candidates:
+            return None
+        with self.lock:
+            name = min(candidates, key=lambda s: (self.outstanding[s] + size) / self.rate(s))
+            self.assigned[name] += size
+            self.outstanding[name] += size
+        return name
+
+    def finish(self, name, size, elapsed=None):
+        """pick 으로 맡긴 size 바이트가 끝났다. elapsed 가 없으면 실패로 본다"""
+        with self.lock:
+            self.outstanding[name] -= size
+            current = self.rate(name)
+            if elapsed is None:
+                self.rates[name] = current * FAIL_PENALTY
+            else:
+                observed = size / max(elapsed, 1e-6)
+                prev = self.rates.get(name)
+                self.rates[name] = observed if prev is None else \
+                    RATE_ALPHA * observed + (1 - RATE_ALPHA) * prev
+
+
+def fetch_harbors(session, host, project):
+    """상태 순위가 있는 host 면 weight 가 붙은 목록을, 아니면 전체 harbor 목록을 쓴다"""
+    res = session.get(f"{host}/api/project/{project}/harbors", timeout=REQUEST_TIMEOUT)
+    if res.status_code == 200:
+        return res.json()
+    return session.get(f"{host}/api/harbors", timeout=REQUEST_TIMEOUT).json()
+
+
+def sync_manifest(session, host, project, state):
+    """
+    state["records"] ({uuid: {"version", "replicas"}}) 를 state["revision"] 이후 바뀐 것만 받아 갱신한다.
+    manifest API 가 없는 host 면 False.
+    """
+    since = state.get("revision", 0) if "records" in state else 0
+    res = session.get(f"{host}/api/project/{project}/manifest",
+                      params={"since": since, "format": "ndjson"},
+                      stream=True, timeout=REQUEST_TIMEOUT)
+    if res.status_code == 404 and not res.headers.get("Content-Type", "").startswith("application/json"):
+        return False
+    if res.status_code == 404:
+        raise RuntimeError(f"프로젝트가 존재하지 않습니다: {project}")
+    res.raise_for_status()
+
+    records = dict(state.get("records", {})) if since else {}
+    header = None
+    complete = False
+    received = 0
+    for line in res.iter_lines():
+        if not line:
+            continue
+        item = json.loads(line)
+        if header is None:
+            header = item
+        elif item.get("end"):
+            complete = True
+        else:
+            records[item["uuid"]] = {"version": item["version"], "replicas": item["replicas"]}
+            received += 1
+    if not complete:
+        raise RuntimeError("manifest 스트림이 중간에 끊겼습니다")
+
+    if since:
+        print(f"🔄 {project}: revision {since} → {header['revision']}, 바뀐 레코드 {received}개")
+    state["records"] = records
+    state["revision"] = header["revision"]
+    return True
+
+
+def latest_versions(records):
+    """같은 파일(placement_key 가 같은 UUID)의 버전 중 가장 높은 것만 남긴다"""
+    latest = {}
+    for uuid_, record in records.items():
+        key = placement_key(uuid_)
+        if key not in latest or record["version"] > records[latest[key]]["version"]:
+            latest[key] = uuid_
+    return {uuid_: records[uuid_]["replicas"] for uuid_ in latest.values()}
+
+
+def fetch_project_meta(host, project, jobs, state):
+    """host 에서 (파일 UUID 별 harbor 목록, harbor 목록)을 가져온다"""
+    session = requests.Session()
+    if sync_manifest(session, host, project, state):
+        return latest_versions(state["records"]), fetch_harbors(session, host, project)
+
+    res = session.get(f"{host}/api/project/{project}", timeout=REQUEST_TIMEOUT)
+    res.raise_for_status()
+    info = res.json()
+    if not info:
+        raise RuntimeError(f"프로젝트가 존재하지 않습니다: {project}")
+
+    harbors = fetch_harbors(session, host, project)
+
+    def lookup(uuid_):
+        data = session.get(f"{host}/api/uuid/{uuid_}", timeout=REQUEST_TIMEOUT).json()
+        # replica 가 있는 모든 harbor 가 chunk 를 받을 후보가 된다
+        replicas = data.get("replicas") or ([data["harbor_name"]] if data.get("harbor_name") else [])
+        return uuid_, replicas
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        locations = dict(pool.map(lookup, info.get("files", [])))
+    return locations, harbors
+
+
+def load_state(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"files": {}}
+
+
+def save_state(path, state):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp, path)
+
+
+def download_chunk(pool, store, chunk_hash, size, sources):
+    tried = set()
+    while True:
+        name = pool.pick(sources, size, exclude=tried)
+        if name is None:
+            raise RuntimeError(f"chunk 를 받을 수 있는 harbor 가 없습니다: {chunk_hash}")
+        tried.add(name)
+        try:
+            res = pool.get(name, f"/chunks/{chunk_hash}")
+        except requests.RequestException as e:
+            pool.finish(name, size)
+            print(f"⚠️  {name}: chunk {chunk_hash[:12]} 실패 ({e}), 다른 harbor 로 재시도")
+            continue
+        data = res.content
+        if hashlib.sha256(data).hexdigest() != chunk_hash:
+            pool.finish(name, size)
+            print(f"⚠️  {name}: chunk {chunk_hash[:12]} 해시 불일치, 다른 harbor 로 재시도")
+            continue
+        pool.finish(name, size, res.elapsed_total)
+        store.put(chunk_hash, data)
+        return len(data)
+
+
+def local_exists(root, path):
+    try:
+        return os.path.exists(safe_join(root, path))
+    except ValueError:
+        return False
+
+
+def assemble_file(store, manifest, dest_path):
+    """chunk 를 이어 붙여 임시 파일에 쓰고, 전체 해시를 확인한 뒤 옮긴다"""
+    os.makedirs(os.path.dirname(dest_path) or ".", exist_ok=True)
+    tmp = dest_path + ".cedge-part"
+    total = hashlib.sha256()
+    with open(tmp, "wb") as f:
+        for chunk_hash, _ in manifest["chunks"]:
+            data = store.get(chunk_hash)
+            total.update(data)
+            f.write(data)
+    if total.hexdigest() != manifest["hash"]:
+        os.remove(tmp)
+        raise RuntimeError(f"파일 해시가 일치하지 않습니다: {manifest['path']}")
+    os.replace(tmp, dest_path)
+
+
+def fetch_manifests(pool, locations, uuids, jobs):
+    """harbor 에서 파일 manifest 를 받는다. ({uuid: manifest}, 새 버전으로 대체된 UUID 수)"""
+    def fetch_manifest(uuid_):
+        for name in pool.ranked(locations[uuid_]):
+            try:
+                manifest = pool.get(name, f"/files/{uuid_}").json()
+                manifest["path"] = clean_relpath(manifest["path"])
+                return uuid_, manifest
+            except ValueError as e:
+                # harbor 가 준 경로가 clone 폴더 밖을 가리키면 받지 않는다
+                print(f"⚠️  {name}: manifest {uuid_} 거부 ({e})")
+            except requests.HTTPError as e:
+                if e.response.status_code == 410:
+                    return uuid_, SUPERSEDED   # 같은 파일의 새 버전이 있음
+                print(f"⚠️  {name}: manifest {uuid_} 실패 ({e})")
+            except requests.RequestException as e:
+                print(f"⚠️  {name}: manifest {uuid_} 실패 ({e})")
+        return uuid_, None
+
+    manifests = {}
+    superseded = 0
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        for uuid_, manifest in executor.map(fetch_manifest, uuids):
+            if manifest is None:
+                print(f"❌ manifest 를 받을 수 없습니다: {uuid_}")
+            elif manifest is SUPERSEDED:
+                superseded += 1
+            else:
+                manifests[uuid_] = manifest
+    return manifests, superseded
+
+
+def download_files(pool, store, manifests, locations, dest, per_harbor=PER_HARBOR_CONNECTIONS):
+    """
+    manifests 의 파일을 받아 dest 아래에 만든다. 없는 chunk 만 그 chunk 를 가진 모든 harbor 에
+    나눠서 병렬로 받는다. (완성된 UUID 목록, 받은 바이트 수)
+    """
+    needed = {}
+    for uuid_, manifest in manifests.items():
+        for chunk_hash, size in manifest["chunks"]:
+            if chunk_hash in needed:
+                needed[chunk_hash][1].update(locations.get(uuid_, ()))
+            elif not store.has(chunk_hash):
+                needed[chunk_hash] = (size, set(locations.get(uuid_, ())))
+
+    total = sum(size for size, _ in needed.values())
+    print(f"⬇️  chunk {len(needed)}개 ({total:,} bytes) 다운로드")
+    failed = set()
+    done_bytes = 0
+    with ThreadPoolExecutor(max_workers=max(1, per_harbor * len(pool.urls))) as executor:
+        futures = {executor.submit(download_chunk, pool, store, h, size, sources): h
+                   for h, (size, sources) in needed.items()}
+        for future in as_completed(futures):
+            try:
+                done_bytes += future.result()
+            except Exception as e:
+                failed.add(futures[future])
+                print(f"❌ {e}")
+
+    # 파일 조립 + 검증
+    completed = []
+    for uuid_, manifest in manifests.items():
+        if any(h in failed for h, _ in manifest["chunks"]):
+            continue
+        try:
+            assemble_file(store, manifest, safe_join(dest, manifest["path"]))
+        except (OSError, RuntimeError, ValueError) as e:
+            print(f"❌ {e}")
+            continue
+        completed.append(uuid_)
+        print(f"📥 {manifest['path']}")
+    return completed, done_bytes
+
+
+def print_pool_summary(pool, done_bytes):
+    print(f"   전송량 {done_bytes:,} bytes")
+    for name in pool.ranked(pool.urls):
+        if pool.assigned[name]:
+            print(f"   - {name}: {pool.assigned[name]:,} bytes 배정, "
+                  f"{pool.rate(name) / (1 << 20):.1f} MB/s")
+
+
+def clone_project(project, dest=None, host=DEFAULT_HOST, jobs=16,
+                  per_harbor=PER_HARBOR_CONNECTIONS, partial=None):
+    """
+    partial 이 있으면(partial.PrefetchRules) 부분 clone: 모든 파일의 manifest 를 placeholder 로
+    기록하고, 규칙에 맞는 파일만 바로 받는다. 나머지는 `cedge fetch <glob>` 로 받는다.
+    """
+    dest = dest or project
+    host = host.rstrip("/")
+    cedge_dir = os.path.join(dest, ".cedge")
+    os.makedirs(cedge_dir, exist_ok=True)
+    store = ChunkStore(os.path.join(cedge_dir, "objects"))
+    state_path = os.path.join(cedge_dir, "clone.json")
+    state = load_state(state_path)
+    if (state.get("project"), state.get("host")) != (project, host):
+        # 다른 host/프로젝트의 manifest 는 증분 기준으로 쓸 수 없다
+        state.pop("records", None)
+        state.pop("revision", None)
+    state.update({"project": project, "host": host})
+    if partial is not None:
+        # 이번에 주지 않은 규칙은 이전 부분 clone 때 저장한 값을 쓴다
+        partial = partial.merged(PrefetchRules.load(dest))
+        state["partial"] = True
+        partial.save(dest)
+
+    try:
+        with TIMINGS.phase("host-meta"):
+            locations, harbors = fetch_project_meta(host, project, jobs, state)
+    except (requests.RequestException, RuntimeError, ValueError) as e:
+        print(f"❌ host 조회 실패: {e}")
+        return
+
+    pool = HarborPool(harbors, per_harbor)
+    print(f"🔎 {project}: 파일 {len(locations)}개, harbor {len(pool.urls)}개")
+
+    # 1) manifest 수집 (placeholder 는 manifest 를 이미 가지고 있다)
+    todo = [u for u in locations if u not in state["files"]
+            or not (state["files"][u].get("chunks")
+                    or local_exists(dest, state["files"][u]["path"]))]
+    with TIMINGS.phase("manifests", files=len(todo)):
+        manifests, superseded = fetch_manifests(pool, locations, todo, jobs)
+
+    if state.get("partial"):
+        rules = partial if partial is not None else PrefetchRules.load(dest)
+        wanted = add_placeholders(state, manifests, rules)
+        print(f"🗂️  placeholder {len(manifests)}개 기록, 그중 {len(wanted)}개 prefetch")
+        manifests = wanted
+
+    # 2) 없는 chunk 만 모아서 병렬 다운로드 (chunk 를 가진 모든 harbor 가 후보) + 3) 조립/검증
+    with TIMINGS.phase("download", files=len(manifests)):
+        completed, done_bytes = download_files(pool, store, manifests, locations, dest, per_harbor)
+    TIMINGS.add("download", calls=0, bytes_read=done_bytes)
+    for uuid_ in completed:
+        manifest = manifests[uuid_]
+        if state.get("partial"):
+            state["files"][uuid_]["fetched"] = True
+        else:
+            state["files"][uuid_] = {"path": manifest["path"], "hash": manifest["hash"]}
+    save_state(state_path, state)
+    if state.get("partial"):
+        touch_chunks(store, [manifests[u] for u in completed])
+        enforce_quota(store, PrefetchRules.load(dest).cache_quota)
+
+    skipped = len(locations) - len(todo)
+    Journal(os.path.join(cedge_dir, "journal")).append(
+        "cloned", project=project, host=host, revision=state.get("revision"),
+        count=len(completed), skipped=skipped, bytes=done_bytes,
+        partial=True if state.get("partial") else None)
+    if state.get("partial"):
+        print(f"\n✅ 부분 clone 완료: {len(completed)}개 받음, "
+              f"placeholder {sum(1 for f in state['files'].values() if not f.get('fetched'))}개")
+        print("👉 나머지는 `cedge fetch '<glob>'` 로 필요할 때 받으세요.")
+    else:
+        print(f"\n✅ clone 완료: {len(completed)}개 받음, {skipped}개 이미 있음, "
+              f"실패 {len(todo) - len(completed) - superseded}개")
+    print_pool_summary(pool, done_bytes)
+
+
+def fetch_files(patterns, root=".", jobs=16, per_harbor=PER_HARBOR_CONNECTIONS, list_only=False):
+    """
+    cedge fetch: 부분 clone 의 placeholder 중 patterns(glob, 프로젝트 기준 경로)에 맞는 파일을 받는다.
+    manifest 는 clone.json 에 있으므로 host 에는 replica 위치의 증분만 묻고 바로 chunk 를 받는다.
+    """
+    cedge_dir = os.path.join(root, ".cedge")
+    state_path = os.path.join(cedge_dir, "clone.json")
+    state = load_state(state_path)
+    if "project" not in state:
+        print("❌ clone 한 폴더가 아닙니다 (.cedge/clone.json 없음). 먼저 `cedge clone`을 실행하세요.")
+        return
+    entries = match_entries(state["files"], patterns or ["*"])
+
+    if list_only:
+        for uuid_, entry in entries.items():
+            fetched = entry.get("fetched", "chunks" not in entry)
+            print(f"{'📄' if fetched else '☁️ '} {entry['path']}  {entry.get('size', 0):,} bytes")
+        pending = sum(1 for e in entries.values() if not e.get("fetched", "chunks" not in e))
+        print(f"\n총 {len(entries)}개, 받지 않은 파일 {pending}개")
+        return
+
+    todo = {u: dict(e, uuid=u) for u, e in entries.items() if "chunks" in e
+            and not (e.get("fetched") and local_exists(root, e["path"]))}
+    if not todo:
+        print("✅ 받을 파일이 없습니다 (모두 받았거나 패턴에 맞는 파일이 없음).")
+        return
+
+    try:
+        with TIMINGS.phase("host-meta"):
+            locations, harbors = fetch_project_meta(state["host"], state["project"], jobs, state)
+    except (requests.RequestException, RuntimeError, ValueError) as e:
+        print(f"❌ host 조회 실패: {e}")
+        return
+    # 그 사이 새 버전이 올라온 파일은 이전 버전의 replica 목록으로 받는다 (다음 clone 때 갱신됨)
+    for uuid_ in todo:
+        if uuid_ not in locations:
+            locations[uuid_] = state.get("records", {}).get(uuid_, {}).get("replicas", [])
+
+    pool = HarborPool(harbors, per_harbor)
+    store = ChunkStore(os.path.join(cedge_dir, "objects"))
+    start = time.monotonic()
+    with TIMINGS.phase("download", files=len(todo)):
+        completed, done_bytes = download_files(pool, store, todo, locations, root, per_harbor)
+    TIMINGS.add("download", calls=0, bytes_read=done_bytes)
+    for uuid_ in completed:
+        state["files"][uuid_]["fetched"] = True
+    save_state(state_path, state)
+    touch_chunks(store, [todo[u] for u in completed])
+    enforce_quota(store, PrefetchRules.load(root).cache_quota)
+
+    Journal(os.path.join(cedge_dir, "journal")).append(
+        "fetched", project=state["project"], host=state["host"], count=len(completed),
+        bytes=done_bytes, patterns=list(patterns))
+    print(f"\n✅ fetch 완료: {len(completed)}개 받음, 실패 {len(todo) - len(completed)}개 "
+          f"({time.monotonic() - start:.2f}s)")
+    print_pool_summary(pool, done_bytes)
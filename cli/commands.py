@@ -1,8 +1,22 @@
+import io
 import os
 import json
 import hashlib
 import time
 import difflib
+from functools import partial
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from diff_engine import get_opcodes
+from packstore import open_store, read_ref
+from streaming import use_stream, is_binary, read_text, file_hash
+from record_diff import (detect_format, diff_records, revert_records, describe_records,
+                         describe_parquet, load_record_keys, record_key_for)
+from tracked import TrackedIndex, tracked_path, lookup_path, iter_prefix, folder_prefix
+from log import open_journal
+from common.timings import TIMINGS, call_timed
+
+HOST_NODE = "http://localhost:8000"   # tracked.json 의 기본 host (cedge push 가 harbor 를 조회하는 곳)
 
 def sha1(s):
     return hashlib.sha1(s.encode("utf-8")).hexdigest()[:12]
@@ -10,7 +24,8 @@ def sha1(s):
 def generate_uuid(project, filepath):
     project_uuid = sha1(project)
     file_uuid = sha1(filepath)
-    time_uuid = str(int(time.time()))
+    # ns 단위: 같은 초에 같은 파일의 새 버전이 생겨도 (add --watch 등) UUID 가 겹치지 않는다
+    time_uuid = str(time.time_ns())
     return f"{project_uuid}-{file_uuid}-{time_uuid}"
 
 def read_file(path):
@@ -23,13 +38,61 @@ def read_file(path):
 def get_base_uuid(project, filepath):
     return f"{sha1(project)}-{sha1(filepath)}"
 
-def compute_diffs(old_text, new_text, version):
+def content_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+# stat cache (git index 방식)
+# tracked.json 의 각 항목에 size / mtime_ns / inode / 내용 해시를 저장해 두고,
+# stat 정보가 그대로인 파일은 열지 않고 건너뛴다.
+
+def stat_fields(st):
+    return {
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "ino": st.st_ino
+    }
+
+def stat_unchanged(entry, st):
+    return (
+        entry.get("size") == st.st_size
+        and entry.get("mtime_ns") == st.st_mtime_ns
+        and entry.get("ino") == st.st_ino
+    )
+
+def scan_files(top):
+    """os.scandir 기반 파일 순회. (full_path, stat_result)를 돌려준다."""
+    stack = [top]
+    while stack:
+        current = stack.pop()
+        try:
+            it = os.scandir(current)
+        except OSError:
+            continue
+        subdirs = []
+        with it:
+            for dir_entry in it:
+                try:
+                    if dir_entry.is_dir(follow_symlinks=False):
+                        subdirs.append(dir_entry.path)
+                    elif dir_entry.is_file():
+                        yield dir_entry.path, dir_entry.stat()
+                except OSError:
+                    continue
+        stack.extend(reversed(subdirs))
+
+def compute_diffs(old_text, new_text, version, engine="auto", path=None, record_key=None):
     old_lines = old_text.splitlines()
     new_lines = new_text.splitlines()
-    matcher = difflib.SequenceMatcher(None, old_lines, new_lines)
+
+    # JSONL/CSV 데이터셋은 레코드 단위로 비교한다 (라인 엔진을 직접 고른 경우 제외)
+    fmt = detect_format(path) if engine in ("auto", "record") else None
+    if fmt is not None:
+        return diff_records(old_lines, new_lines, version, fmt, record_key)
+    if engine == "record":
+        engine = "auto"
 
     diffs = []
-    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+    for tag, i1, i2, j1, j2 in get_opcodes(old_lines, new_lines, engine):
         if tag == "insert":
             diffs.append({
                 "type": "+",
@@ -52,7 +115,8 @@ def compute_diffs(old_text, new_text, version):
                 "version": version,
                 "start_l": i1 + 1,
                 "end_l": i2,
-                "old_l": old_lines[i1:i2]
+                "old_l": old_lines[i1:i2],
+                "new_n": j2 - j1
             })
     return diffs
 
@@ -80,65 +144,88 @@ def load_diff_metadata(path, fallback_content=""):
 
         return repaired
 
-def save_diff_file(base_uuid, new_diff_entries, new_content=None, root_dir="."):
+# keyframe: 일정 버전마다 전체 내용을 따로 저장해 두고,
+# 과거 버전 복원 시 가장 가까운 keyframe 부터 diff 를 되돌린다.
+KEYFRAME_INTERVAL = 16            # K 버전마다 keyframe
+KEYFRAME_DIFF_BYTES = 1 << 20     # 마지막 keyframe 이후 누적 diff 크기 상한
+
+def needs_keyframe(version, pending_bytes):
+    """version 의 내용을 keyframe 으로 남겨야 하는지 판단"""
+    if version < 2:
+        return False  # v1 은 모든 diff 를 되돌리면 되므로 별도 저장하지 않음
+    if version % KEYFRAME_INTERVAL == 0:
+        return True
+    return pending_bytes >= KEYFRAME_DIFF_BYTES
+
+def _migrate_legacy(store, base_uuid):
+    """예전 JSON diff 파일이 있으면 pack 으로 옮긴다. 손상된 파일을 사용자가 유지하기로 하면 False"""
+    try:
+        store.migrate_legacy(base_uuid)
+    except ValueError:
+        print(f"\n⚠️ 손상된 diff 파일 발견: {store.legacy_path(base_uuid)}")
+        answer = input("덮어쓰시겠습니까? [y/N]: ").strip().lower()
+        if answer != 'y':
+            print(f"⛔ 파일 무시됨: {base_uuid}.json")
+            return False
+        print("🧹 기존 손상된 파일 덮어쓰기 진행")
+        store.drop_legacy(base_uuid)
+    return True
+
+def save_diff_file(base_uuid, new_diff_entries, new_content=None, root_dir=".", version=None):
     """
     base_uuid: 파일의 베이스 uuid
     new_diff_entries: 추가할 diff 리스트
     new_content: 변경 후 최신 파일 전체 내용 (필수!)
     root_dir: 프로젝트 루트(디폴트 ".")
+    version: new_content 의 버전 (주어지면 직전 버전의 keyframe 여부를 판단)
     """
-    diff_dir = os.path.join(root_dir, ".cedge", "diff")
-    os.makedirs(diff_dir, exist_ok=True)
-    path = os.path.join(diff_dir, f"{base_uuid}.json")
+    store = open_store(root_dir)
+    if not _migrate_legacy(store, base_uuid):
+        return  # 중단
+
+    if new_content is None:
+        # 만약 new_content가 None이면 기존 값 유지
+        new_content = store.last_content(base_uuid)
+
+    # 덮어쓰기 직전의 last_content(= version - 1)를 keyframe 으로 보관
+    if version is not None and store.in_pack(base_uuid) and not store.is_chunked(base_uuid):
+        prev_version = version - 1
+        with TIMINGS.phase("keyframe-check"):
+            last_kf = max(store.keyframe_versions(base_uuid), default=0)
+            keyframe = needs_keyframe(prev_version, store.pending_diff_bytes(base_uuid, last_kf))
+        if keyframe:
+            store.add_keyframe(base_uuid, prev_version, store.last_content(base_uuid))
+
+    store.append_version(base_uuid, new_diff_entries, new_content, version or 1)
+
+def save_stream_version(base_uuid, manifest, root_dir=".", version=1):
+    """대용량/바이너리 파일 버전을 chunk manifest 로 기록 (chunk 는 put_chunks 에서 이미 저장됨)"""
+    store = open_store(root_dir)
+    if not _migrate_legacy(store, base_uuid):
+        return
 
-    existing_diffs = []
-    # last_content는 반드시 new_content를 우선 적용
-    last_content = new_content if new_content is not None else ""
+    # 직전 버전이 텍스트였다면 keyframe 으로 남겨 텍스트 이력을 계속 복원할 수 있게 한다
+    if version > 1 and store.in_pack(base_uuid) and not store.is_chunked(base_uuid):
+        store.add_keyframe(base_uuid, version - 1, store.last_content(base_uuid))
 
-    if os.path.exists(path):
-        try:
-            with open(path, "r", encoding="utf-8") as f:
-                existing_data = json.load(f)
-                if isinstance(existing_data, dict):
-                    existing_diffs = existing_data.get("diffs", [])
-                    # 만약 new_content가 None이면 기존 값 유지
-                    if last_content == "":
-                        last_content = existing_data.get("last_content", "")
-        except Exception:
-            print(f"\n⚠️ 손상된 diff 파일 발견: {path}")
-            answer = input("덮어쓰시겠습니까? [y/N]: ").strip().lower()
-            if answer != 'y':
-                print(f"⛔ 파일 무시됨: {base_uuid}.json")
-                return  # 중단
-            else:
-                print(f"🧹 기존 손상된 파일 덮어쓰기 진행")
-                existing_diffs = []
-                # last_content는 new_content 우선
-
-    # diff 병합 및 저장
-    merged_data = {
-        "last_content": last_content,
-        "diffs": existing_diffs + new_diff_entries
-    }
+    store.append_manifest(base_uuid, manifest, version)
 
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(merged_data, f, indent=2)
 
+def get_last_content_from_diff(base_uuid, root_dir=".", filename=None):
+    store = open_store(root_dir)
+    if store.in_pack(base_uuid):
+        return store.last_content(base_uuid)
 
-
-def get_last_content_from_diff(base_uuid, root_dir="."):
-    path = os.path.join(root_dir, ".cedge", "diff", f"{base_uuid}.json")
+    path = store.legacy_path(base_uuid)
     # 파일이 손상되었을 경우, 최신 파일 내용을 fallback으로 넘겨줌
-    tracked_path = os.path.join(root_dir, ".cedge", "tracked", "tracked.json")
+    # (호출하는 쪽이 filename 을 알면 tracked.json 을 읽지 않는다)
     fallback = ""
-
-    if os.path.exists(tracked_path):
-        with open(tracked_path, "r", encoding="utf-8") as f:
-            tracked = json.load(f)
-        for file in tracked.get("files", []):
-            if file["base_uuid"] == base_uuid:
-                fallback = read_file(file["filename"])
-                break
+    if filename is None:
+        index = TrackedIndex.load(root_dir)
+        entry = index.get_base(base_uuid) if index else None
+        filename = entry["filename"] if entry else None
+    if filename is not None:
+        fallback = read_file(filename)
 
     data = load_diff_metadata(path, fallback_content=fallback)
     return data.get("last_content", "")
@@ -148,57 +235,89 @@ def reconstruct_old_content_from_diffs(last_content, diffs):
     """현재(last_content)에서 diff들을 역으로 적용해 이전 버전 복원"""
     if not diffs:
         return last_content
-        
+
     lines = last_content.splitlines()
-    
+
+    # 같은 버전의 diff 묶음 단위로 처리
+    groups = []
+    for diff in diffs:
+        if groups and groups[-1][0] == diff.get("version"):
+            groups[-1][1].append(diff)
+        else:
+            groups.append((diff.get("version"), [diff]))
+
     # diff들을 역순으로 처리 (최신 변경부터 되돌림)
-    for diff in reversed(diffs):
-        t = diff["type"]
-        start = diff["start_l"] - 1  # 1-based → 0-based 변환
-        end = diff["end_l"] - 1      # 1-based → 0-based 변환
-        
-        # 범위 검증
-        if start < 0:
-            print(f"⚠️  Warning: Invalid start index {start} for diff {diff}")
+    for _, group in reversed(groups):
+        if group[0]["type"] == "r":
+            # 레코드 단위 diff (record_diff)
+            lines = revert_records(lines, group[0])
             continue
-            
-        if t == "+":
-            # 추가된 라인들을 제거
-            # start_l부터 end_l까지의 라인을 삭제
-            if end >= start and end < len(lines):
-                del lines[start:end + 1]
-            elif start < len(lines):
-                # end가 범위를 벗어난 경우, start부터 끝까지 삭제
-                del lines[start:]
-                
-        elif t == "-":
-            # 삭제된 라인들을 복원
-            old_lines = diff.get("old_l", [])
-            if start <= len(lines):
-                lines[start:start] = old_lines
-            else:
-                # start가 범위를 벗어난 경우, 끝에 추가
-                lines.extend(old_lines)
-                
-        elif t == "m":
-            # 수정된 라인들을 원래대로 복원
+        # start_l/end_l 은 이전 버전 기준 좌표이므로, 앞선 hunk 들의 줄 수 변화를 더해
+        # 현재(새 버전) 기준 위치를 구한다
+        placed = []
+        offset = 0
+        for diff in group:
+            t = diff["type"]
+            start = diff["start_l"] - 1  # 1-based → 0-based 변환
             old_lines = diff.get("old_l", [])
-            if end >= start and end < len(lines):
-                lines[start:end + 1] = old_lines
-            elif start < len(lines):
-                # end가 범위를 벗어난 경우, start부터 끝까지 교체
-                lines[start:] = old_lines
+
+            if start < 0:
+                print(f"⚠️  Warning: Invalid start index {start} for diff {diff}")
+                continue
+
+            if t == "+":
+                new_n = diff["end_l"] - diff["start_l"] + 1
+            elif t == "-":
+                new_n = 0
             else:
-                # start도 범위를 벗어난 경우, 끝에 추가
-                lines.extend(old_lines)
-    
+                # 예전 형식의 m 레코드에는 new_n 이 없으므로 줄 수가 같다고 가정
+                new_n = diff.get("new_n", len(old_lines))
+
+            placed.append((start + offset, new_n, old_lines))
+            offset += new_n - len(old_lines)
+
+        for pos, new_n, old_lines in reversed(placed):
+            if pos > len(lines):
+                # 범위를 벗어난 경우, 끝에 붙인다
+                pos = len(lines)
+            lines[pos:pos + new_n] = old_lines
+
     return "\n".join(lines)
 
+def reconstruct_version(base_uuid, target_version, latest_version, root_dir="."):
+    """
+    target_version 의 내용을 복원한다.
+    target 이상인 가장 가까운 keyframe(없으면 last_content)에서 시작하므로
+    되돌리는 diff 수는 KEYFRAME_INTERVAL 정도로 제한된다.
+    """
+    store = open_store(root_dir)
+    if target_version >= latest_version:
+        return store.last_content(base_uuid)
+
+    start_version = latest_version
+    content = None
+    for kf in store.keyframe_versions(base_uuid):
+        if target_version <= kf < latest_version:
+            content = store.keyframe(base_uuid, kf)
+            if content is not None:
+                start_version = kf
+                break
+    if content is None:
+        # 최신 버전이 chunk 로 저장된 경우 last_content 는 텍스트가 아니므로 읽을 수 없다
+        content = store.last_content(base_uuid)
+
+    diffs = store.diffs_between(base_uuid, target_version, start_version)
+    with TIMINGS.phase("reconstruct"):
+        return reconstruct_old_content_from_diffs(content, diffs)
+
 
 # cli commands
 
-def show_diff_by_file(rel_path, root_dir="."):
-    """파일의 diff를 표시하는 함수"""
+def show_diff_by_file(rel_path, root_dir=".", target_version=None, entry=None):
+    """
+    파일의 diff를 표시하는 함수 (target_version 이 없으면 최초 등록 버전과 비교)
+    entry(tracked.json 항목)를 넘기면 tracked.json 을 다시 읽지 않는다.
+    """
     full_path = os.path.join(root_dir, rel_path)
 
     if not os.path.exists(full_path):
@@ -207,35 +326,43 @@ def show_diff_by_file(rel_path, root_dir="."):
 
     project = rel_path.split(os.sep)[0]
     base_uuid = get_base_uuid(project, rel_path)
-    diff_path = os.path.join(root_dir, ".cedge", "diff", f"{base_uuid}.json")
-
-    # 파일의 버전 로드
-    version = None
-    tracked_path = os.path.join(root_dir, ".cedge", "tracked", "tracked.json")
-    if os.path.exists(tracked_path):
-        with open(tracked_path, "r", encoding="utf-8") as f:
-            tracked = json.load(f)
-            for entry in tracked.get("files", []):
-                if entry["filename"] == rel_path:
-                    version = entry["version"]
-                    break
-
-    if not os.path.exists(diff_path):
-        print(f"❌ diff 기록이 존재하지 않습니다: {diff_path}")
+
+    # 파일의 버전 로드 (tracked.idx 로 해당 항목 근처만 읽는다)
+    if entry is None:
+        entry = lookup_path(root_dir, rel_path)
+    version = entry["version"] if entry else None
+
+    store = open_store(root_dir)
+    if not store.has(base_uuid):
+        print(f"❌ diff 기록이 존재하지 않습니다: {base_uuid}")
+        return
+
+    if target_version is None:
+        old_version = 1
+        old_label = f"{rel_path} (old)"
+    else:
+        if version is None or not 1 <= target_version <= version:
+            print(f"❌ 존재하지 않는 버전입니다: {rel_path} v{target_version} (최신 v{version})")
+            return
+        old_version = target_version
+        old_label = f"{rel_path} (v{target_version})"
+
+    # 대용량/바이너리 파일은 내용 대신 크기와 해시로 비교
+    if store.is_chunked(base_uuid, old_version) or use_stream(full_path, os.path.getsize(full_path)):
+        show_stream_diff(base_uuid, rel_path, old_version, version, old_label, root_dir)
         return
 
     try:
-        with open(diff_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-            last_content = data.get("last_content", "")
-            diffs = data.get("diffs", [])
+        if version is None:
+            data = store.load(base_uuid)
+            old_content = reconstruct_old_content_from_diffs(data.get("last_content", ""),
+                                                             data.get("diffs", []))
+        else:
+            old_content = reconstruct_version(base_uuid, old_version, version, root_dir)
     except Exception as e:
         print(f"❌ diff 파일을 읽을 수 없습니다: {e}")
         return
 
-    # 디버그 모드인 경우 상세한 복원 과정 출력
-    old_content = reconstruct_old_content_from_diffs(last_content, diffs)
-    
     current_content = read_file(full_path)
 
     # 내용이 동일한지 확인 (공백 제거 후 비교)
@@ -247,6 +374,13 @@ def show_diff_by_file(rel_path, root_dir="."):
     print(f"\n📄 diff content: {rel_path} (v{version})")
     print("=" * 40)
 
+    # 데이터셋은 라인 대신 레코드 단위로 보여준다 (정렬만 바뀐 경우 라인 diff 는 파일 전체)
+    fmt = detect_format(rel_path)
+    if fmt is not None:
+        key = record_key_for(load_record_keys(root_dir), rel_path)
+        print("\n".join(describe_records(old_content, current_content, fmt, key)))
+        return
+
     old_lines = old_content.splitlines()
     new_lines = current_content.splitlines()
 
@@ -254,7 +388,7 @@ def show_diff_by_file(rel_path, root_dir="."):
     diff_output = difflib.unified_diff(
         old_lines,
         new_lines,
-        fromfile=f"{rel_path} (old)",
+        fromfile=old_label,
         tofile=f"{rel_path} (new)",
         lineterm=""
     )
@@ -266,164 +400,405 @@ def show_diff_by_file(rel_path, root_dir="."):
         print("변경 사항이 감지되지 않았습니다.")
 
 
-def show_diff_by_folder(folder_path, root_dir="."):
-    tracked_path = os.path.join(root_dir, ".cedge", "tracked", "tracked.json")
-    if not os.path.exists(tracked_path):
+def show_stream_diff(base_uuid, rel_path, old_version, version, old_label, root_dir="."):
+    """대용량/바이너리 파일의 변경 여부를 크기와 해시로 표시"""
+    full_path = os.path.join(root_dir, rel_path)
+    store = open_store(root_dir)
+
+    if store.is_chunked(base_uuid, old_version):
+        manifest = store.manifest(base_uuid, old_version)
+        old_size, old_hash = manifest["size"], manifest["hash"]
+    else:
+        old_bytes = reconstruct_version(base_uuid, old_version, version, root_dir).encode("utf-8")
+        old_size, old_hash = len(old_bytes), hashlib.sha256(old_bytes).hexdigest()
+
+    new_size, new_hash = os.path.getsize(full_path), file_hash(full_path)
+    if new_hash == old_hash:
+        print(f"📄 {rel_path} (v{version}): 변경 사항 없음")
+        return
+
+    print(f"\n📄 diff content: {rel_path} (v{version})")
+    print("=" * 40)
+    print("바이너리/대용량 파일이 변경되었습니다.")
+    print(f"--- {old_label}: {old_size:,} bytes ({old_hash[:12]})")
+    print(f"+++ {rel_path} (new): {new_size:,} bytes ({new_hash[:12]})")
+
+    # Parquet 은 pyarrow 가 있으면 row group / 컬럼 / 레코드 단위로 요약한다
+    if rel_path.lower().endswith(".parquet") and store.is_chunked(base_uuid, old_version):
+        old_file = io.BytesIO()
+        store.write_chunks(manifest, old_file)
+        key = record_key_for(load_record_keys(root_dir), rel_path)
+        summary = describe_parquet(old_file.getvalue(), full_path, key)
+        if summary:
+            print("\n".join(summary))
+
+
+def checkout_file(rel_path, target_version, root_dir="."):
+    """파일을 target_version 의 내용으로 되돌린다 (작업 파일만 변경, tracked.json 은 그대로)"""
+    if not os.path.exists(tracked_path(root_dir)):
+        print("❌ tracked.json이 존재하지 않습니다.")
+        return
+
+    entry = lookup_path(root_dir, rel_path)
+    if entry is None:
+        print(f"❌ 추적 중인 파일이 아닙니다: {rel_path}")
+        return
+
+    if not 1 <= target_version <= entry["version"]:
+        print(f"❌ 존재하지 않는 버전입니다: {rel_path} v{target_version} (최신 v{entry['version']})")
+        return
+
+    store = open_store(root_dir)
+    if store.is_chunked(entry["base_uuid"], target_version):
+        # chunk 단위로 흘려 써서 메모리 사용을 일정하게 유지
+        manifest = store.manifest(entry["base_uuid"], target_version)
+        with open(os.path.join(root_dir, rel_path), "wb") as f:
+            store.write_chunks(manifest, f)
+    else:
+        content = reconstruct_version(entry["base_uuid"], target_version, entry["version"], root_dir)
+        with open(os.path.join(root_dir, rel_path), "w", encoding="utf-8") as f:
+            f.write(content)
+    open_journal(root_dir).append("checkout", project=entry["project"], file=entry["base_uuid"],
+                                  path=rel_path, version=target_version, latest=entry["version"])
+    print(f"⏪ {rel_path} → v{target_version} 내용으로 복원되었습니다.")
+
+
+def gc_store(root_dir="."):
+    """JSON diff 파일을 pack 으로 옮기고, 더 이상 쓰이지 않는 객체를 정리한다."""
+    if not os.path.exists(os.path.join(root_dir, ".cedge")):
+        print("❌ .cedge 폴더가 존재하지 않습니다. 먼저 `cedge register .`를 실행하세요.")
+        return
+
+    store = open_store(root_dir)
+    before, after, migrated = store.repack()
+    print(f"📦 JSON diff 파일 {migrated}개를 pack 으로 옮겼습니다.")
+    print(f"🧹 repack 완료: {before:,} bytes → {after:,} bytes")
+
+
+def show_diff_by_folder(folder_path, root_dir=".", target_version=None):
+    if not os.path.exists(tracked_path(root_dir)):
         print("❌ tracked.json이 존재하지 않습니다.")
         return
 
-    abs_folder = os.path.abspath(folder_path)
-    with open(tracked_path, "r", encoding="utf-8") as f:
-        tracked = json.load(f)
-        for entry in tracked.get("files", []):
-            file_path = os.path.abspath(os.path.join(root_dir, entry["filename"]))
-            if file_path.startswith(abs_folder):
-                show_diff_by_file(entry["filename"], root_dir)
-
-def show_diff_all(root_dir="."):
-    tracked_path = os.path.join(root_dir, ".cedge", "tracked", "tracked.json")
-    if not os.path.exists(tracked_path):
+    # tracked.json 은 filename 순이므로 폴더 안의 항목은 한 구간에 모여 있다
+    for entry in iter_prefix(root_dir, folder_prefix(folder_path, root_dir)):
+        show_diff_by_file(entry["filename"], root_dir, target_version, entry)
+
+def show_diff_all(root_dir=".", target_version=None):
+    if not os.path.exists(tracked_path(root_dir)):
         print("❌ tracked.json이 존재하지 않습니다.")
         return
 
-    with open(tracked_path, "r", encoding="utf-8") as f:
-        tracked = json.load(f)
-        for entry in tracked.get("files", []):
-            rel_path = entry["filename"]
-            show_diff_by_file(rel_path, root_dir)
+    # tracked.json 을 한 번만 (idx 가 있으면 한 줄씩) 읽는다
+    for entry in iter_prefix(root_dir, ""):
+        show_diff_by_file(entry["filename"], root_dir, target_version, entry)
 
 
-def register_files(root_dir="."):
-    cedge_dir = os.path.join(root_dir, ".cedge", "tracked")
-    tracked_path = os.path.join(cedge_dir, "tracked.json")
+# scan → hash/diff → write 파이프라인
+# producer(scan_files)가 작업을 만들고, 프로세스 풀이 읽기/해시/diff 계산을 맡으며,
+# .cedge/diff/*.json 과 tracked.json 은 메인 프로세스(단일 writer)만 기록한다.
 
-    if os.path.exists(tracked_path):
-        print("❌ 이미 등록된 프로젝트입니다.")
-        print("👉 대신 `cedge add .` 명령을 사용하세요.")
+def run_pipeline(tasks, worker, jobs=1):
+    """tasks 를 worker 로 처리하고 (task, result)를 입력 순서대로 돌려준다."""
+    if jobs <= 1:
+        for task in tasks:
+            yield task, worker(task)
         return
 
-    os.makedirs(cedge_dir, exist_ok=True)
-    tracked_files = []
-    host_node = "http://localhost:9001"
+    # --timings 일 때는 worker 프로세스에서 잰 단계별 시간을 결과와 함께 받아 합친다
+    timed = TIMINGS.enabled
+    submit_worker = partial(call_timed, worker) if timed else worker
+
+    def result_of(future):
+        if not timed:
+            return future.result()
+        result, phases = future.result()
+        TIMINGS.merge(phases)
+        return result
+
+    window = jobs * 4  # 동시에 대기시킬 최대 작업 수 (메모리 상한)
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        pending = deque()
+        for task in tasks:
+            pending.append((task, pool.submit(submit_worker, task)))
+            if len(pending) >= window:
+                done_task, future = pending.popleft()
+                yield done_task, result_of(future)
+        while pending:
+            done_task, future = pending.popleft()
+            yield done_task, result_of(future)
+
+def _read_last_content(root_dir, ref):
+    # worker 에서는 사용자에게 물어볼 수 없으므로 손상 시 None 을 돌려준다
+    if ref is None:
+        return ""
+    try:
+        return read_ref(root_dir, ref)
+    except FileNotFoundError:
+        return ""
+    except (ValueError, AttributeError):
+        return None
 
+def _read_small(task):
+    """작은 텍스트 파일이면 (text, hash), 스트리밍으로 처리할 파일이면 None"""
+    path = task["full_path"]
+    size = task["stat"].st_size
+    try:
+        if use_stream(path, size):
+            return None
+        with TIMINGS.phase("read", files=1, bytes_read=size):
+            return read_text(path)
+    except UnicodeDecodeError:
+        return None
+    except OSError:
+        return "", content_hash("")  # 읽을 수 없는 파일은 빈 내용으로 취급
+
+def is_modified(entry, new_hash, mtime):
+    if "hash" in entry:
+        return new_hash != entry["hash"]
+    # 해시가 없는 예전 항목은 mtime 기준으로 판단
+    return mtime > entry.get("mtime", 0)
+
+def _register_worker(task):
+    small = _read_small(task)
+    if small is None:
+        return {"stream": True, "binary": is_binary(task["full_path"])}
+    content, new_hash = small
+    return {"content": content, "hash": new_hash}
+
+def _add_worker(task):
+    small = _read_small(task)
+    if small is None:
+        # 대용량/바이너리 파일은 writer 가 한 번 읽으면서 chunk 저장과 해시를 함께 처리
+        return {"kind": "stream", "binary": is_binary(task["full_path"])}
+
+    new_content, new_hash = small
+    result = {"content": new_content, "hash": new_hash}
+
+    entry = task.get("entry")
+    if entry is None:
+        result["kind"] = "new"
+        return result
+
+    if not is_modified(entry, new_hash, task["mtime"]):
+        result["kind"] = "touched"
+        return result
+
+    ref = task["content_ref"]
+    if ref is not None and ref[0] == "manifest":
+        # 직전 버전이 chunk 로 저장된 경우 라인 diff 없이 텍스트 이력을 새로 시작
+        result["kind"] = "modified"
+        result["diffs"] = []
+        return result
+
+    old_content = _read_last_content(task["root_dir"], ref)
+    if old_content is None:
+        result["kind"] = "corrupt"
+        return result
+
+    result["kind"] = "modified"
+    with TIMINGS.phase("diff", files=1):
+        result["diffs"] = compute_diffs(old_content, new_content, entry["version"] + 1,
+                                        task["diff_engine"], task["rel_path"], task["record_key"])
+    return result
+
+def iter_project_files(root_dir):
+    """root_dir 아래 각 프로젝트 폴더의 파일을 (project, full_path, stat) 로 순회"""
     for project in os.listdir(root_dir):
         project_path = os.path.join(root_dir, project)
         if not os.path.isdir(project_path) or project.startswith("."):
             continue
+        for full_path, st in TIMINGS.timed_iter("scan", scan_files(project_path)):
+            yield project, full_path, st
 
-        for dirpath, _, filenames in os.walk(project_path):
-            for fname in filenames:
-                full_path = os.path.join(dirpath, fname)
-                rel_path = os.path.relpath(full_path, root_dir)
-                base_uuid = get_base_uuid(project, rel_path)
-                full_uuid = generate_uuid(project, rel_path)
-                mtime = os.path.getmtime(full_path)
-                content = read_file(full_path)
-
-                save_diff_file(base_uuid, [], content, root_dir)
-
-                entry = {
-                    "uuid": full_uuid,
-                    "base_uuid": base_uuid,
-                    "project": project,
-                    "filename": rel_path,
-                    "version": 1,
-                    "mtime": mtime
-                }
-
-                print(f"📦 등록됨: {rel_path} → {entry['uuid']}")
-                tracked_files.append(entry)
-
-    with open(tracked_path, "w", encoding="utf-8") as f:
-        json.dump({
-            "host_node": host_node,
-            "files": tracked_files
-        }, f, indent=2)
-
-    print(f"\n✅ 총 {len(tracked_files)}개 파일이 .cedge/tracked/tracked.json에 저장되었습니다.")
-
-def add_files(root_dir="."):
-    tracked_path = os.path.join(root_dir, ".cedge", "tracked", "tracked.json")
-    if not os.path.exists(tracked_path):
-        print("❌ tracked.json이 존재하지 않습니다. 먼저 `cedge register .`를 실행하세요.")
+
+def register_files(root_dir=".", jobs=1):
+    if os.path.exists(tracked_path(root_dir)):
+        print("❌ 이미 등록된 프로젝트입니다.")
+        print("👉 대신 `cedge add .` 명령을 사용하세요.")
         return
 
-    with open(tracked_path, "r", encoding="utf-8") as f:
-        tracked = json.load(f)
+    os.makedirs(os.path.dirname(tracked_path(root_dir)), exist_ok=True)
+    index = TrackedIndex(root_dir, HOST_NODE)
 
-    host_node = tracked.get("host_node", "http://localhost:9001")
-    old_entries = tracked.get("files", [])
-    old_index = {(entry["project"], sha1(entry["filename"])): entry for entry in old_entries}
+    tasks = (
+        {"project": project, "full_path": full_path, "stat": st}
+        for project, full_path, st in iter_project_files(root_dir)
+    )
 
-    changes_made = False
+    store = open_store(root_dir)
+    journal = open_journal(root_dir)
+
+    for task, result in run_pipeline(tasks, _register_worker, jobs):
+        project = task["project"]
+        st = task["stat"]
+        rel_path = os.path.relpath(task["full_path"], root_dir)
+        base_uuid = get_base_uuid(project, rel_path)
+        full_uuid = generate_uuid(project, rel_path)
+
+        if result.get("stream"):
+            manifest = store.put_chunks(task["full_path"], result["binary"])
+            save_stream_version(base_uuid, manifest, root_dir, 1)
+            result["hash"] = manifest["hash"]
+        else:
+            save_diff_file(base_uuid, [], result["content"], root_dir)
+
+        entry = {
+            "uuid": full_uuid,
+            "base_uuid": base_uuid,
+            "project": project,
+            "filename": rel_path,
+            "version": 1,
+            "mtime": st.st_mtime,
+            "hash": result["hash"],
+            **stat_fields(st)
+        }
 
-    for project in os.listdir(root_dir):
-        project_path = os.path.join(root_dir, project)
-        if not os.path.isdir(project_path) or project.startswith("."):
-            continue
+        print(f"📦 등록됨: {rel_path} → {entry['uuid']}")
+        journal.append("file-registered", project=project, uuid=full_uuid, file=base_uuid,
+                       path=rel_path, version=1, hash=result["hash"])
+        index.add(entry)
+
+    index.save()
+    print(f"\n✅ 총 {len(index)}개 파일이 .cedge/tracked/tracked.json에 저장되었습니다.")
+
+def add_files(root_dir=".", jobs=1, diff_engine="auto"):
+    index = TrackedIndex.load(root_dir)
+    if index is None:
+        print("❌ tracked.json이 존재하지 않습니다. 먼저 `cedge register .`를 실행하세요.")
+        return
+    index.host_node = index.host_node or HOST_NODE
 
-        for dirpath, _, filenames in os.walk(project_path):
-            for fname in filenames:
-                full_path = os.path.join(dirpath, fname)
-                rel_path = os.path.relpath(full_path, root_dir)
-                file_uuid = sha1(rel_path)
-                mtime = os.path.getmtime(full_path)
-                key = (project, file_uuid)
-
-                base_uuid = get_base_uuid(project, rel_path)
-                new_content = read_file(full_path)
-
-                if key in old_index:
-                    entry = old_index[key]
-                    if mtime > entry.get("mtime", 0):
-                        old_version = entry["version"]
-                        # get fallback content for diff recovery
-                        fallback_content = read_file(full_path)
-
-                        try:
-                            old_content = get_last_content_from_diff(base_uuid, root_dir)
-                        except RuntimeError:
-                            continue  # 사용자 거절 시 무시
-
-                        # compute and save diffs
-                        diffs = compute_diffs(old_content, new_content, old_version + 1)
-                        save_diff_file(base_uuid, diffs, new_content, root_dir)
-
-                        # update entry
-                        new_uuid = generate_uuid(project, rel_path)
-                        entry.update({
-                            "uuid": new_uuid,
-                            "version": old_version + 1,
-                            "mtime": mtime,
-                            "filename": rel_path
-                        })
-
-                        print(f"🔁 버전 증가: {rel_path} → v{entry['version']}")
-                        changes_made = True
-                else:
-                    # 신규 파일
-                    new_uuid = generate_uuid(project, rel_path)
-                    save_diff_file(base_uuid, [], new_content, root_dir)
-
-                    new_entry = {
-                        "uuid": new_uuid,
-                        "base_uuid": base_uuid,
-                        "project": project,
-                        "filename": rel_path,
-                        "version": 1,
-                        "mtime": mtime
-                    }
-                    old_entries.append(new_entry)
-                    print(f"🆕 신규 추가: {rel_path}")
-                    changes_made = True
+    changes_made, index_dirty = apply_changes(index, root_dir, iter_project_files(root_dir),
+                                              jobs, diff_engine)
 
     # 최종 반영
+    if changes_made or index_dirty:
+        index.save()
+
     if changes_made:
-        with open(tracked_path, "w", encoding="utf-8") as f:
-            json.dump({
-                "host_node": host_node,
-                "files": old_entries
-            }, f, indent=2)
         print("\n✅ 변경 사항이 tracked.json에 반영되었습니다.")
     else:
         print("✅ 변경된 파일이 없습니다. tracked.json은 그대로 유지됩니다.")
+
+def apply_changes(index, root_dir, files, jobs=1, diff_engine="auto"):
+    """
+    files ((project, full_path, stat) 순회)의 변경 사항을 새 버전으로 기록하고 index 를 갱신한다.
+    index 저장은 호출한 쪽이 한다. (버전이 바뀜, stat cache 만 바뀜)을 돌려준다.
+    """
+    changes_made = False
+    index_dirty = False  # 버전 변화 없이 stat cache만 갱신된 경우
+    store = open_store(root_dir)
+    journal = open_journal(root_dir)
+    record_keys = load_record_keys(root_dir)
+
+    def candidates():
+        for project, full_path, st in files:
+            rel_path = os.path.relpath(full_path, root_dir)
+            entry = index.get(rel_path)
+
+            # stat 정보가 같으면 파일을 열지 않는다
+            if entry is not None and stat_unchanged(entry, st):
+                continue
+
+            base_uuid = get_base_uuid(project, rel_path)
+            yield {
+                "project": project,
+                "full_path": full_path,
+                "rel_path": rel_path,
+                "base_uuid": base_uuid,
+                "root_dir": root_dir,
+                "content_ref": store.content_ref(base_uuid) if entry is not None else None,
+                "mtime": st.st_mtime,
+                "stat": st,
+                "entry": entry,
+                "diff_engine": diff_engine,
+                "record_key": record_key_for(record_keys, rel_path)
+            }
+
+    for task, result in run_pipeline(candidates(), _add_worker, jobs):
+        project = task["project"]
+        rel_path = task["rel_path"]
+        base_uuid = task["base_uuid"]
+        st = task["stat"]
+        new_content = result.get("content")
+        kind = result["kind"]
+        entry = task["entry"]
+        manifest = None
+
+        if kind == "stream":
+            manifest = store.put_chunks(task["full_path"], result["binary"])
+            result["hash"] = manifest["hash"]
+            if entry is None:
+                kind = "new"
+            elif is_modified(entry, manifest["hash"], task["mtime"]):
+                kind = "modified"
+            else:
+                kind = "touched"
+
+        if kind == "new":
+            # 신규 파일
+            new_uuid = generate_uuid(project, rel_path)
+            if manifest is not None:
+                save_stream_version(base_uuid, manifest, root_dir, 1)
+            else:
+                save_diff_file(base_uuid, [], new_content, root_dir)
+
+            new_entry = {
+                "uuid": new_uuid,
+                "base_uuid": base_uuid,
+                "project": project,
+                "filename": rel_path,
+                "version": 1,
+                "mtime": st.st_mtime,
+                "hash": result["hash"],
+                **stat_fields(st)
+            }
+            index.add(new_entry)
+            print(f"🆕 신규 추가: {rel_path}")
+            journal.append("file-added", project=project, uuid=new_uuid, file=base_uuid,
+                           path=rel_path, version=1, hash=result["hash"])
+            changes_made = True
+            continue
+
+        # worker 는 pickle 된 사본을 받으므로 원본 항목을 갱신한다
+        entry = index.get(rel_path)
+
+        if kind == "touched":
+            entry.update({"mtime": st.st_mtime, "hash": result["hash"], **stat_fields(st)})
+            index_dirty = True
+            continue
+
+        old_version = entry["version"]
+        if manifest is not None:
+            save_stream_version(base_uuid, manifest, root_dir, old_version + 1)
+        elif kind == "corrupt":
+            # 손상된 diff 파일은 writer 에서 사용자 확인 후 복구
+            try:
+                old_content = get_last_content_from_diff(base_uuid, root_dir, task["full_path"])
+            except RuntimeError:
+                continue  # 사용자 거절 시 무시
+            diffs = compute_diffs(old_content, new_content, old_version + 1, diff_engine,
+                                  rel_path, task["record_key"])
+            save_diff_file(base_uuid, diffs, new_content, root_dir, old_version + 1)
+        else:
+            save_diff_file(base_uuid, result["diffs"], new_content, root_dir, old_version + 1)
+
+        # update entry
+        new_uuid = generate_uuid(project, rel_path)
+        entry.update({
+            "uuid": new_uuid,
+            "version": old_version + 1,
+            "mtime": st.st_mtime,
+            "filename": rel_path,
+            "hash": result["hash"],
+            **stat_fields(st)
+        })
+        index.add(entry)
+
+        print(f"🔁 버전 증가: {rel_path} → v{entry['version']}")
+        journal.append("version-added", project=project, uuid=new_uuid, file=base_uuid,
+                       path=rel_path, version=entry["version"], hash=result["hash"])
+        changes_made = True
+
+    return changes_made, index_dirty
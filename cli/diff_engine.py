@@ -0,0 +1,245 @@
+# cli/diff_engine.py
+# compute_diffs 가 사용하는 라인 diff 엔진 모음
+#
+# 모든 엔진은 difflib.SequenceMatcher.get_opcodes() 와 같은
+# (tag, i1, i2, j1, j2) 목록을 돌려주므로, 기존 +/-/m diff 레코드 형식은 그대로 유지된다.
+#
+# - difflib  : 기존 SequenceMatcher (최악의 경우 O(n^2))
+# - myers    : Myers O(ND) 알고리즘
+# - patience : 양쪽에서 유일한 라인을 기준점으로 나누고, 나머지는 myers 로 처리
+# - chunk    : 내용 기반으로 라인을 묶은 chunk 해시끼리 patience diff (대용량용, 선형)
+# - auto     : 기본값. patience 를 쓰다가 AUTO_CHUNK_LINES 를 넘으면 chunk 로 전환
+#              (JSONL/CSV 데이터셋은 record_diff 의 레코드 단위 diff 를 쓴다)
+# - record   : 데이터셋이면 레코드 단위 diff, 아니면 auto 와 같음
+import difflib
+import zlib
+from bisect import bisect_left
+
+AUTO_CHUNK_LINES = 1_000_000   # old + new 라인 수가 이 값을 넘으면 chunk 엔진 사용
+MYERS_MAX_D = 4096             # myers 편집 거리 상한 (넘으면 구간 전체를 replace 로 처리)
+CHUNK_MASK = 0x3F              # 평균 64 라인마다 chunk 경계
+
+ENGINES = ("auto", "record", "patience", "myers", "chunk", "difflib")
+
+
+def intern_lines(old_lines, new_lines):
+    """라인을 정수 id 로 바꿔서 비교 비용을 줄인다."""
+    table = {}
+    a = [table.setdefault(line, len(table)) for line in old_lines]
+    b = [table.setdefault(line, len(table)) for line in new_lines]
+    return a, b
+
+
+def _opcodes_from_matches(matches, n, m):
+    """(i, j) 매칭 쌍(두 좌표 모두 증가 순)을 difflib 형식 opcode 로 변환"""
+    opcodes = []
+    i = j = 0
+    k = 0
+    total = len(matches)
+    while k < total:
+        ai, bj = matches[k]
+        size = 1
+        while k + size < total and matches[k + size] == (ai + size, bj + size):
+            size += 1
+        if i < ai and j < bj:
+            opcodes.append(("replace", i, ai, j, bj))
+        elif i < ai:
+            opcodes.append(("delete", i, ai, j, bj))
+        elif j < bj:
+            opcodes.append(("insert", i, ai, j, bj))
+        opcodes.append(("equal", ai, ai + size, bj, bj + size))
+        i, j = ai + size, bj + size
+        k += size
+
+    if i < n and j < m:
+        opcodes.append(("replace", i, n, j, m))
+    elif i < n:
+        opcodes.append(("delete", i, n, j, m))
+    elif j < m:
+        opcodes.append(("insert", i, n, j, m))
+    return opcodes
+
+
+def _myers_matches(a, alo, ahi, b, blo, bhi, max_d=MYERS_MAX_D):
+    """a[alo:ahi] 와 b[blo:bhi] 사이의 매칭 쌍. 편집 거리가 max_d 를 넘으면 빈 목록."""
+    n = ahi - alo
+    m = bhi - blo
+    v = {1: 0}
+    trace = []
+
+    for d in range(min(n + m, max_d) + 1):
+        trace.append(dict(v))
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and v[k - 1] < v[k + 1]):
+                x = v[k + 1]
+            else:
+                x = v[k - 1] + 1
+            y = x - k
+            while x < n and y < m and a[alo + x] == b[blo + y]:
+                x += 1
+                y += 1
+            v[k] = x
+            if x >= n and y >= m:
+                return _myers_backtrack(trace, n, m, alo, blo)
+    return []
+
+
+def _myers_backtrack(trace, n, m, alo, blo):
+    pairs = []
+    x, y = n, m
+    for d in range(len(trace) - 1, -1, -1):
+        v = trace[d]
+        k = x - y
+        if k == -d or (k != d and v[k - 1] < v[k + 1]):
+            prev_k = k + 1
+        else:
+            prev_k = k - 1
+        prev_x = v[prev_k]
+        prev_y = prev_x - prev_k
+        while x > prev_x and y > prev_y:
+            x -= 1
+            y -= 1
+            pairs.append((alo + x, blo + y))
+        x, y = prev_x, prev_y
+    pairs.reverse()
+    return pairs
+
+
+def _unique_anchors(a, alo, ahi, b, blo, bhi):
+    """양쪽 구간에서 한 번씩만 나오는 라인들의 최장 증가 부분열 (patience)"""
+    count_a = {}
+    for i in range(alo, ahi):
+        x = a[i]
+        count_a[x] = -1 if x in count_a else i
+    count_b = {}
+    for j in range(blo, bhi):
+        x = b[j]
+        count_b[x] = -1 if x in count_b else j
+
+    pairs = []
+    for i in range(alo, ahi):
+        x = a[i]
+        if count_a[x] == i:
+            j = count_b.get(x, -1)
+            if j >= 0:
+                pairs.append((i, j))
+    if not pairs:
+        return []
+
+    # b 좌표 기준 LIS
+    tails = []
+    tail_idx = []
+    prev = [-1] * len(pairs)
+    for idx, (_, j) in enumerate(pairs):
+        pos = bisect_left(tails, j)
+        if pos == len(tails):
+            tails.append(j)
+            tail_idx.append(idx)
+        else:
+            tails[pos] = j
+            tail_idx[pos] = idx
+        prev[idx] = tail_idx[pos - 1] if pos > 0 else -1
+
+    result = []
+    idx = tail_idx[-1]
+    while idx >= 0:
+        result.append(pairs[idx])
+        idx = prev[idx]
+    result.reverse()
+    return result
+
+
+def _patience_matches(a, b):
+    matches = []
+    stack = [(0, len(a), 0, len(b))]
+    while stack:
+        alo, ahi, blo, bhi = stack.pop()
+
+        # 공통 prefix / suffix
+        while alo < ahi and blo < bhi and a[alo] == b[blo]:
+            matches.append((alo, blo))
+            alo += 1
+            blo += 1
+        while alo < ahi and blo < bhi and a[ahi - 1] == b[bhi - 1]:
+            ahi -= 1
+            bhi -= 1
+            matches.append((ahi, bhi))
+        if alo == ahi or blo == bhi:
+            continue
+
+        anchors = _unique_anchors(a, alo, ahi, b, blo, bhi)
+        if not anchors:
+            matches.extend(_myers_matches(a, alo, ahi, b, blo, bhi))
+            continue
+
+        prev_a, prev_b = alo, blo
+        for ai, bj in anchors:
+            stack.append((prev_a, ai, prev_b, bj))
+            matches.append((ai, bj))
+            prev_a, prev_b = ai + 1, bj + 1
+        stack.append((prev_a, ahi, prev_b, bhi))
+
+    matches.sort()
+    return matches
+
+
+def _chunk_bounds(lines):
+    """라인 내용의 해시로 chunk 경계를 정한다 (삽입/삭제에도 경계가 밀리지 않음)"""
+    bounds = []
+    start = 0
+    for i, line in enumerate(lines):
+        if zlib.crc32(line.encode("utf-8", "surrogatepass")) & CHUNK_MASK == 0:
+            bounds.append((start, i + 1))
+            start = i + 1
+    if start < len(lines):
+        bounds.append((start, len(lines)))
+    return bounds
+
+
+def opcodes_difflib(old_lines, new_lines):
+    return difflib.SequenceMatcher(None, old_lines, new_lines).get_opcodes()
+
+
+def opcodes_myers(old_lines, new_lines):
+    a, b = intern_lines(old_lines, new_lines)
+    matches = _myers_matches(a, 0, len(a), b, 0, len(b))
+    return _opcodes_from_matches(matches, len(a), len(b))
+
+
+def opcodes_patience(old_lines, new_lines):
+    a, b = intern_lines(old_lines, new_lines)
+    return _opcodes_from_matches(_patience_matches(a, b), len(a), len(b))
+
+
+def opcodes_chunk(old_lines, new_lines):
+    a, b = intern_lines(old_lines, new_lines)
+    a_bounds = _chunk_bounds(old_lines)
+    b_bounds = _chunk_bounds(new_lines)
+    table = {}
+    ca = [table.setdefault(tuple(a[s:e]), len(table)) for s, e in a_bounds]
+    cb = [table.setdefault(tuple(b[s:e]), len(table)) for s, e in b_bounds]
+
+    # chunk 단위 매칭을 라인 단위로 펼친다
+    matches = []
+    for ci, cj in _patience_matches(ca, cb):
+        (sa, ea), (sb, _) = a_bounds[ci], b_bounds[cj]
+        matches.extend((sa + k, sb + k) for k in range(ea - sa))
+    return _opcodes_from_matches(matches, len(a), len(b))
+
+
+def get_opcodes(old_lines, new_lines, engine="auto"):
+    if engine == "auto":
+        if len(old_lines) + len(new_lines) > AUTO_CHUNK_LINES:
+            engine = "chunk"
+        else:
+            engine = "patience"
+
+    if engine == "patience":
+        return opcodes_patience(old_lines, new_lines)
+    if engine == "myers":
+        return opcodes_myers(old_lines, new_lines)
+    if engine == "chunk":
+        return opcodes_chunk(old_lines, new_lines)
+    if engine == "difflib":
+        return opcodes_difflib(old_lines, new_lines)
+    raise ValueError(f"Unknown diff engine: {engine}")
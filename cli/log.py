@@ -0,0 +1,111 @@
+# cli/log.py
+# cedge log: .cedge/journal 의 이벤트(등록, 버전 추가, checkout, push, clone)를 조회한다
+#
+#   cedge log                     최근 이벤트
+#   cedge log <파일>              그 파일의 이력 (저널 색인의 file=base_uuid 로 바로 찾음)
+#   cedge log <프로젝트 폴더>      프로젝트의 이벤트 (project 색인)
+#   cedge log --since 2h          2시간 이내 (또는 2026-10-01, 2026-10-01T12:00, unix 시각)
+#   cedge log --host <url>        로컬 대신 host 의 저널 (/api/log)
+import os
+import sys
+import time
+import datetime
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.journal import Journal
+from tracked import lookup_path
+
+DEFAULT_LIMIT = 50
+_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+_journals = {}
+
+
+def open_journal(root_dir="."):
+    """root_dir 별로 하나의 Journal 을 재사용한다 (프로세스가 끝날 때 flush)"""
+    key = os.path.abspath(root_dir)
+    journal = _journals.get(key)
+    if journal is None:
+        journal = Journal(os.path.join(root_dir, ".cedge", "journal"))
+        _journals[key] = journal
+    return journal
+
+
+def parse_time(value):
+    """"2h" / "3d" 같은 상대 시간, ISO 날짜/시각, unix 시각을 unix 시각으로"""
+    if value is None:
+        return None
+    value = value.strip()
+    if value[:-1].isdigit() and value[-1] in _UNITS:
+        return time.time() - int(value[:-1]) * _UNITS[value[-1]]
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.datetime.fromisoformat(value).timestamp()
+
+
+def _filters_for(path, root_dir):
+    """경로를 저널 조건으로 바꾼다: 파일이면 file, 프로젝트 폴더면 project, 하위 폴더면 path prefix"""
+    if path in (None, "."):
+        return {}, None
+    rel = os.path.relpath(os.path.abspath(path), os.path.abspath(root_dir))
+    entry = lookup_path(root_dir, rel)
+    if entry is not None:
+        return {"file": entry["base_uuid"]}, None
+    parts = rel.split(os.sep)
+    if os.path.isdir(path):
+        prefix = None if len(parts) == 1 else rel.rstrip(os.sep) + os.sep
+        return {"project": parts[0]}, prefix
+    # 추적 목록에 없는(삭제된) 파일은 경로로 찾는다
+    return {"project": parts[0], "path": rel}, None
+
+
+def format_event(e):
+    when = datetime.datetime.fromtimestamp(e["ts"]).strftime("%Y-%m-%d %H:%M:%S")
+    what = e.get("path") or e.get("project") or e.get("harbor") or ""
+    details = []
+    if "version" in e:
+        details.append(f"v{e['version']}")
+    if "uuid" in e:
+        details.append(e["uuid"])
+    if "harbor" in e and e["harbor"] != what:
+        details.append(f"@{e['harbor']}")
+    if "count" in e:
+        details.append(f"{e['count']}개")
+    if "message" in e and not details:
+        details.append(e["message"])
+    return f"{when}  {e['type']:<20} {what}  {' '.join(details)}".rstrip()
+
+
+def show_log(path=None, root_dir=".", since=None, until=None, event_type=None,
+             limit=DEFAULT_LIMIT, host=None):
+    filters, prefix = _filters_for(path, root_dir)
+    since, until = parse_time(since), parse_time(until)
+
+    if host:
+        params = {k: v for k, v in filters.items() if k in ("project", "file")}
+        params.update({"since": since, "until": until, "type": event_type, "limit": limit})
+        res = requests.get(f"{host.rstrip('/')}/api/log",
+                           params={k: v for k, v in params.items() if v is not None}, timeout=30)
+        if res.status_code != 200:
+            print(f"❌ host 저널 조회 실패: {res.status_code}, {res.text}")
+            return
+        events = res.json()["events"]
+    else:
+        if not os.path.isdir(os.path.join(root_dir, ".cedge")):
+            print("❌ .cedge 폴더가 존재하지 않습니다. 먼저 `cedge register .`를 실행하세요.")
+            return
+        journal = open_journal(root_dir)
+        if prefix:
+            # 하위 폴더는 색인이 없으므로 project 로 좁힌 뒤 경로로 거른다
+            events = [e for e in journal.query(since, until, None, True, type=event_type, **filters)
+                      if e.get("path", "").startswith(prefix)][:limit]
+        else:
+            events = journal.query(since, until, limit, True, type=event_type, **filters)
+
+    if not events:
+        print("📭 조건에 맞는 기록이 없습니다.")
+        return
+    for e in events:
+        print(format_event(e))
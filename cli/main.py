@@ -1,14 +1,89 @@
 # cli/main.py
 import argparse
 import subprocess
-from commands import register_files, add_files, show_diff_by_file, show_diff_by_folder, show_diff_all
+from commands import register_files, add_files, show_diff_by_file, show_diff_by_folder, show_diff_all, checkout_file, gc_store
+from diff_engine import ENGINES
+from clone import clone_project, fetch_files, DEFAULT_HOST, PER_HARBOR_CONNECTIONS
+from partial import PrefetchRules, parse_size
+from push import push_files, PART_SIZE, MAX_IN_FLIGHT
+from status import show_status, show_remote_status, DEFAULT_JOBS as STATUS_JOBS
+from log import show_log, DEFAULT_LIMIT as LOG_LIMIT
+from watch import watch_files, DEBOUNCE, POLL_INTERVAL
+from common.timings import TIMINGS
+from common.profiler import profile, MODES as PROFILE_MODES, SAMPLE_INTERVAL
 import os
+import sys
+import json
 
 def run_host() :
     subprocess.run(["python", "server/host_server.py"])
 
+def run_command(args):
+    if args.command == "host":
+        run_host()
+
+    elif args.command == "register":
+        abs_path = os.path.abspath(args.path)
+        register_files(abs_path, args.jobs)
+
+    elif args.command == "add" and args.watch:
+        watch_files(args.path, args.jobs, args.diff_engine, args.debounce, args.poll, args.interval)
+
+    elif args.command == "add" :
+        add_files(args.path, args.jobs, args.diff_engine)
+
+    elif args.command == "status" and args.remote:
+        show_remote_status(args.path, args.host, args.format)
+
+    elif args.command == "status":
+        show_status(args.path, args.jobs, args.format)
+
+    elif args.command == "log":
+        show_log(os.path.normpath(args.path), ".", args.since, args.until, args.type,
+                 args.limit, args.host)
+
+    elif args.command == "show" and args.subcommand == "diff":
+        show_path = os.path.abspath(args.path)
+        if args.path == ".":
+            show_diff_all(".", args.version)
+        elif os.path.isfile(show_path):
+            show_diff_by_file(args.path, target_version=args.version)
+        elif os.path.isdir(show_path):
+            show_diff_by_folder(args.path, target_version=args.version)
+        else:
+            print(f"❌ 파일 또는 폴더를 찾을 수 없습니다: {args.path}")
+
+    elif args.command == "clone":
+        rules = None
+        if args.partial:
+            rules = PrefetchRules(args.include, args.sample, parse_size(args.max_file_size),
+                                  parse_size(args.max_bytes), parse_size(args.cache_quota))
+        clone_project(args.project, args.dest, args.host, args.jobs, args.per_harbor, rules)
+
+    elif args.command == "fetch":
+        fetch_files(args.patterns, ".", args.jobs, args.per_harbor, args.list)
+
+    elif args.command == "push":
+        push_files(args.path, args.host, args.harbor, args.jobs, args.part_size)
+
+    elif args.command in ("gc", "repack"):
+        gc_store(".")
+
+    elif args.command == "checkout":
+        checkout_file(os.path.normpath(args.path), args.version)
+
 if __name__ == "__main__" :
     parser = argparse.ArgumentParser(description="CEDGE CLI")
+    parser.add_argument("--timings", action="store_true",
+                        help="Print per-phase wall time, bytes and file counts to stderr")
+    parser.add_argument("--timings-json", default=None, metavar="FILE",
+                        help="Also write the per-phase timings to FILE as JSON")
+    parser.add_argument("--profile", default=None, metavar="FILE",
+                        help="Profile the command and write the result to FILE")
+    parser.add_argument("--profile-mode", choices=PROFILE_MODES, default="cprofile",
+                        help="cprofile: pstats file, sample: collapsed stacks for flame graphs")
+    parser.add_argument("--sample-interval", type=float, default=SAMPLE_INTERVAL,
+                        help="Sampling profiler interval in seconds (default: 0.005)")
     subparsers = parser.add_subparsers(dest="command", required=True)
 
     # cedge host
@@ -17,10 +92,42 @@ if __name__ == "__main__" :
     # cedge register [path]
     register_parser = subparsers.add_parser("register", help="Register project files")
     register_parser.add_argument("path", nargs="?", default=".", help="Path to project root (default: .)")
+    register_parser.add_argument("--jobs", "-j", type=int, default=1, help="Number of worker processes (default: 1)")
 
     # cedge add [path]
     add_parser = subparsers.add_parser("add", help="Add or update tracked files")
     add_parser.add_argument("path", nargs="?", default=".")
+    add_parser.add_argument("--jobs", "-j", type=int, default=1, help="Number of worker processes (default: 1)")
+    add_parser.add_argument("--diff-engine", choices=ENGINES, default="auto",
+                            help="Line diff algorithm (default: auto)")
+    add_parser.add_argument("--watch", action="store_true",
+                            help="Keep running and add files as they change (inotify, or polling)")
+    add_parser.add_argument("--debounce", type=float, default=DEBOUNCE,
+                            help="Seconds a file must stay quiet before it is added (default: 2)")
+    add_parser.add_argument("--poll", action="store_true", help="Use stat polling instead of inotify")
+    add_parser.add_argument("--interval", type=float, default=POLL_INTERVAL,
+                            help="Polling interval in seconds (default: 5)")
+
+    # cedge status [path]
+    status_parser = subparsers.add_parser("status", help="List modified, added and deleted files")
+    status_parser.add_argument("path", nargs="?", default=".")
+    status_parser.add_argument("--jobs", "-j", type=int, default=STATUS_JOBS,
+                               help="Folders scanned in parallel (default: 8)")
+    status_parser.add_argument("--format", choices=["text", "json", "porcelain"], default="text",
+                               help="Output format (default: text)")
+    status_parser.add_argument("--remote", action="store_true",
+                               help="Compare tracked versions with the host (Merkle tree walk)")
+    status_parser.add_argument("--host", default=None, help="Host URL (default: host_node in tracked.json)")
+
+    # cedge log [file|folder|.]
+    log_parser = subparsers.add_parser("log", help="Show the event history of files or projects")
+    log_parser.add_argument("path", nargs="?", default=".")
+    log_parser.add_argument("--since", default=None, help="e.g. 2h, 3d, 2026-10-01 or unix time")
+    log_parser.add_argument("--until", default=None)
+    log_parser.add_argument("--type", default=None, help="Event type (e.g. version-added)")
+    log_parser.add_argument("--limit", "-n", type=int, default=LOG_LIMIT,
+                            help="Max events, newest first (default: 50)")
+    log_parser.add_argument("--host", default=None, help="Query the host journal instead")
 
     # cedge show diff [file|folder|.]
     show_parser = subparsers.add_parser("show", help="Show info or diff")
@@ -28,31 +135,65 @@ if __name__ == "__main__" :
 
     show_diff_parser = show_subparsers.add_parser("diff", help="Show diff of files")
     show_diff_parser.add_argument("path", help="File, folder, or '.' for all")
+    show_diff_parser.add_argument("--version", type=int, default=None,
+                                  help="Compare against this version (default: first registered version)")
+
+    # cedge checkout <file> --version N
+    checkout_parser = subparsers.add_parser("checkout", help="Restore a file to a previous version")
+    checkout_parser.add_argument("path", help="Tracked file path")
+    checkout_parser.add_argument("--version", type=int, required=True)
     
 
 
 
-    # TODO: cedge push --host http://localhost:8000
+    # cedge clone <project>
+    clone_parser = subparsers.add_parser("clone", help="Clone a project from its harbors in parallel")
+    clone_parser.add_argument("project")
+    clone_parser.add_argument("dest", nargs="?", default=None, help="Destination folder (default: project name)")
+    clone_parser.add_argument("--host", default=DEFAULT_HOST)
+    clone_parser.add_argument("--jobs", "-j", type=int, default=16, help="Metadata request concurrency")
+    clone_parser.add_argument("--per-harbor", type=int, default=PER_HARBOR_CONNECTIONS,
+                              help="Max concurrent connections per harbor")
+    clone_parser.add_argument("--partial", action="store_true",
+                              help="Record all files as placeholders and download only prefetch matches")
+    clone_parser.add_argument("--include", action="append", default=None,
+                              help="Glob of files to prefetch (repeatable)")
+    clone_parser.add_argument("--sample", type=float, default=None,
+                              help="Prefetch a deterministic fraction of files (0-1)")
+    clone_parser.add_argument("--max-bytes", default=None, help="Total prefetch size cap (e.g. 10G)")
+    clone_parser.add_argument("--max-file-size", default=None, help="Skip prefetching larger files (e.g. 1G)")
+    clone_parser.add_argument("--cache-quota", default=None, help="Local chunk cache quota (e.g. 5G)")
 
-    args = parser.parse_args()
+    # cedge fetch [glob ...]
+    fetch_parser = subparsers.add_parser("fetch", help="Download placeholders of a partial clone")
+    fetch_parser.add_argument("patterns", nargs="*", help="Globs relative to the clone (default: all)")
+    fetch_parser.add_argument("--jobs", "-j", type=int, default=16, help="Metadata request concurrency")
+    fetch_parser.add_argument("--per-harbor", type=int, default=PER_HARBOR_CONNECTIONS,
+                              help="Max concurrent connections per harbor")
+    fetch_parser.add_argument("--list", action="store_true", help="List placeholders and whether they are fetched")
 
-    if args.command == "host":
-        run_host()
+    # cedge gc (repack)
+    subparsers.add_parser("gc", aliases=["repack"], help="Repack the .cedge diff store")
 
-    elif args.command == "register":
-        abs_path = os.path.abspath(args.path)
-        register_files(abs_path)
+    # cedge push [path]
+    push_parser = subparsers.add_parser("push", help="Upload new file versions to the project's harbor")
+    push_parser.add_argument("path", nargs="?", default=".")
+    push_parser.add_argument("--host", default=None, help="Host URL (default: host_node in tracked.json)")
+    push_parser.add_argument("--harbor", default=None, help="Harbor URL (default: ask the host)")
+    push_parser.add_argument("--jobs", "-j", type=int, default=MAX_IN_FLIGHT, help="Parts in flight")
+    push_parser.add_argument("--part-size", type=int, default=PART_SIZE, help="Upload part size in bytes")
 
-    elif args.command == "add" :
-        add_files(args.path)
+    args = parser.parse_args()
 
-    elif args.command == "show" and args.subcommand == "diff":
-        show_path = os.path.abspath(args.path)
-        if args.path == ".":
-            show_diff_all(".")
-        elif os.path.isfile(show_path):
-            show_diff_by_file(args.path)
-        elif os.path.isdir(show_path):
-            show_diff_by_folder(args.path)
-        else:
-            print(f"❌ 파일 또는 폴더를 찾을 수 없습니다: {args.path}")
+    # 단계별 시간 (--timings) 과 프로파일 (--profile) 은 명령이 중간에 끝나도 출력한다
+    if args.timings or args.timings_json:
+        TIMINGS.enable()
+    try:
+        with profile(args.profile, args.profile_mode, args.sample_interval):
+            run_command(args)
+    finally:
+        if TIMINGS.enabled:
+            print("\n" + TIMINGS.report(), file=sys.stderr)
+            if args.timings_json:
+                with open(args.timings_json, "w", encoding="utf-8") as f:
+                    json.dump({"command": sys.argv[1:], **TIMINGS.as_dict()}, f, indent=2)
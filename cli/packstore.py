@@ -0,0 +1,514 @@
+# cli/packstore.py
+# .cedge/diff 저장소를 대신하는 압축 packfile 저장소
+#
+# 파일마다 .cedge/diff/<base_uuid>.json 을 통째로 다시 쓰던 방식 대신,
+# 모든 객체를 .cedge/pack/pack-NNNN.pack 에 압축해서 이어 붙이고
+# 위치(offset)는 .cedge/pack/index 에 한 줄씩 추가한다.
+# 버전 추가 비용 = pack append + index 한 줄.
+#
+# 객체 종류
+#   C : 최신 전체 내용 (last_content). 가장 마지막 C 가 유효하다.
+#   D : 한 버전의 diff 레코드 목록
+#   K : keyframe (특정 버전의 전체 내용)
+#   M : 대용량/바이너리 파일 버전의 chunk 목록 (manifest). 가장 마지막 C/M 이 최신 버전
+#   B : chunk 데이터 (base_uuid 자리에 chunk 의 sha256 을 기록)
+#
+# CONTENT_CHUNK_MIN 이상인 C/K 내용도 chunk 로 나눠 B 객체로 저장하고 본문에는 chunk 키 목록만
+# 남긴다(CODEC_CHUNKS). 키는 harbor 와 같은 common.chunking 기준이므로
+# 파일/프로젝트 간에 겹치는 내용은 한 번만 저장된다.
+#
+# 기존 .cedge/diff/*.json 과 .cedge/keyframes/ 파일은 그대로 읽을 수 있으며,
+# 해당 파일에 새 버전이 추가될 때 또는 `cedge gc` 실행 시 pack 으로 옮겨진다.
+import os
+import sys
+import json
+import struct
+import zlib
+import hashlib
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.chunking import iter_bytes_chunks, chunk_file
+from common.timings import TIMINGS
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+CODEC_RAW = 0
+CODEC_ZLIB = 1
+CODEC_ZSTD = 2
+CODEC_CHUNKS = 3                # 본문이 chunk 키 목록(JSON)인 객체
+
+HEADER = struct.Struct(">IB")   # payload 길이, codec
+MIN_COMPRESS = 64               # 이보다 작은 객체는 압축하지 않음
+CONTENT_CHUNK_MIN = 256 << 10   # 이보다 큰 C/K 내용은 chunk 로 나눠 중복 제거
+
+
+def compress(data):
+    if len(data) < MIN_COMPRESS:
+        return CODEC_RAW, data
+    if zstandard is not None:
+        return CODEC_ZSTD, zstandard.ZstdCompressor(level=3).compress(data)
+    return CODEC_ZLIB, zlib.compress(data, 6)
+
+
+def decompress(codec, data):
+    if codec == CODEC_RAW:
+        return data
+    if codec == CODEC_ZLIB:
+        return zlib.decompress(data)
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("zstandard 패키지가 필요합니다 (pip install zstandard)")
+        return zstandard.ZstdDecompressor().decompress(data)
+    raise ValueError(f"Unknown codec: {codec}")
+
+
+def read_ref(root_dir, ref):
+    """
+    worker 프로세스에서도 쓸 수 있는 단일 객체 읽기.
+    ref: ("pack", pack_name, offset, length) 또는 ("json", path)
+    반환값은 last_content 문자열
+    """
+    if ref[0] == "json":
+        with open(ref[1], "r", encoding="utf-8") as f:
+            return json.load(f).get("last_content", "")
+    if ref[0] == "manifest":
+        raise ValueError("chunk 로 저장된 버전은 텍스트로 읽을 수 없습니다")
+    _, pack_name, offset, length = ref
+    with TIMINGS.phase("pack-read", bytes_read=length), \
+            open(os.path.join(root_dir, ".cedge", "pack", pack_name), "rb") as f:
+        f.seek(offset)
+        codec = HEADER.unpack(f.read(HEADER.size))[1]
+        data = f.read(length)
+    if codec == CODEC_CHUNKS:
+        # chunk 로 나뉜 내용은 index 가 있어야 읽을 수 있으므로 프로세스별 store 를 사용
+        return _worker_store(root_dir)._join_chunks(data).decode("utf-8")
+    return decompress(codec, data).decode("utf-8")
+
+
+_worker_stores = {}
+
+def _worker_store(root_dir):
+    # fork 된 worker 는 부모의 파일 핸들을 공유하지 않도록 pid 별로 새로 연다
+    key = (os.getpid(), os.path.abspath(root_dir))
+    store = _worker_stores.get(key)
+    if store is None:
+        store = PackStore(root_dir)
+        _worker_stores[key] = store
+    return store
+
+
+class PackStore:
+    def __init__(self, root_dir="."):
+        self.root_dir = root_dir
+        self.pack_dir = os.path.join(root_dir, ".cedge", "pack")
+        self.index_path = os.path.join(self.pack_dir, "index")
+        self.diff_dir = os.path.join(root_dir, ".cedge", "diff")
+        self.keyframe_dir = os.path.join(root_dir, ".cedge", "keyframes")
+
+        self.content = {}      # base_uuid -> (version, ref)
+        self.diffs = {}        # base_uuid -> [(version, ref), ...]
+        self.keyframes = {}    # base_uuid -> {version: ref}
+        self.manifests = {}    # base_uuid -> {version: ref}
+        self.latest_kind = {}  # base_uuid -> "C" 또는 "M"
+        self.blobs = {}        # chunk sha256 -> ref
+
+        self._readers = {}
+        self._pack_fh = None
+        self._index_fh = None
+        self.active_pack = self._latest_pack_name()
+        self._load_index()
+
+    # ---------- 내부 ----------
+
+    def _latest_pack_name(self):
+        packs = []
+        if os.path.isdir(self.pack_dir):
+            packs = sorted(n for n in os.listdir(self.pack_dir) if n.endswith(".pack"))
+        return packs[-1] if packs else "pack-0000.pack"
+
+    def _load_index(self):
+        if not os.path.exists(self.index_path):
+            return
+        with open(self.index_path, "r", encoding="utf-8") as f:
+            for line in f:
+                parts = line.rstrip("\n").split("\t")
+                if len(parts) != 6:
+                    continue  # 마지막 줄이 잘린 경우 무시
+                kind, base_uuid, version, pack_name, offset, length = parts
+                self._apply(kind, base_uuid, int(version), (pack_name, int(offset), int(length)))
+
+    def _apply(self, kind, base_uuid, version, ref):
+        if kind in ("C", "M"):
+            self.content[base_uuid] = (version, ref)
+            self.latest_kind[base_uuid] = kind
+            if kind == "M":
+                self.manifests.setdefault(base_uuid, {})[version] = ref
+        elif kind == "B":
+            self.blobs[base_uuid] = ref
+        elif kind == "D":
+            self.diffs.setdefault(base_uuid, []).append((version, ref))
+        elif kind == "K":
+            self.keyframes.setdefault(base_uuid, {})[version] = ref
+
+    def _write_object(self, kind, base_uuid, version, payload):
+        if self._pack_fh is None:
+            os.makedirs(self.pack_dir, exist_ok=True)
+            self._pack_fh = open(os.path.join(self.pack_dir, self.active_pack), "ab")
+            self._index_fh = open(self.index_path, "a", encoding="utf-8")
+
+        with TIMINGS.phase("compress"):
+            if kind in ("C", "K") and len(payload) >= CONTENT_CHUNK_MIN:
+                codec, data = CODEC_CHUNKS, json.dumps(self._put_chunks(payload)).encode("utf-8")
+            else:
+                codec, data = compress(payload)
+        with TIMINGS.phase("pack-write", bytes_written=HEADER.size + len(data)):
+            offset = self._pack_fh.tell()
+            self._pack_fh.write(HEADER.pack(len(data), codec))
+            self._pack_fh.write(data)
+            self._pack_fh.flush()
+
+            # pack 에 먼저 기록한 뒤 index 에 추가 (중간에 끊기면 index 에 없는 객체만 남음)
+            ref = (self.active_pack, offset, len(data))
+            self._index_fh.write(f"{kind}\t{base_uuid}\t{version}\t{ref[0]}\t{ref[1]}\t{ref[2]}\n")
+            self._index_fh.flush()
+        self._apply(kind, base_uuid, version, ref)
+
+    def _read(self, ref):
+        pack_name, offset, length = ref
+        fh = self._readers.get(pack_name)
+        if fh is None:
+            fh = open(os.path.join(self.pack_dir, pack_name), "rb")
+            self._readers[pack_name] = fh
+        with TIMINGS.phase("pack-read", bytes_read=length):
+            fh.seek(offset)
+            codec = HEADER.unpack(fh.read(HEADER.size))[1]
+            data = fh.read(length)
+        if codec == CODEC_CHUNKS:
+            return self._join_chunks(data)
+        return decompress(codec, data)
+
+    def _put_blob(self, chunk_hash, data):
+        if chunk_hash not in self.blobs:
+            self._write_object("B", chunk_hash, 0, data)
+
+    def _put_chunks(self, payload):
+        keys = []
+        for chunk in iter_bytes_chunks(payload):
+            chunk_hash = hashlib.sha256(chunk).hexdigest()
+            self._put_blob(chunk_hash, chunk)
+            keys.append(chunk_hash)
+        return keys
+
+    def _join_chunks(self, data):
+        return b"".join(self._read(self.blobs[h]) for h in json.loads(data.decode("utf-8")))
+
+    def _chunk_keys(self, ref):
+        """CODEC_CHUNKS 객체가 참조하는 chunk 키 (repack 에서 사용)"""
+        pack_name, offset, length = ref
+        fh = self._readers.get(pack_name)
+        if fh is None:
+            fh = open(os.path.join(self.pack_dir, pack_name), "rb")
+            self._readers[pack_name] = fh
+        fh.seek(offset)
+        codec = HEADER.unpack(fh.read(HEADER.size))[1]
+        if codec != CODEC_CHUNKS:
+            return []
+        return json.loads(fh.read(length).decode("utf-8"))
+
+    def _read_text(self, ref):
+        return self._read(ref).decode("utf-8")
+
+    def _read_diffs(self, ref):
+        return json.loads(self._read(ref).decode("utf-8"))
+
+    def legacy_path(self, base_uuid):
+        return os.path.join(self.diff_dir, f"{base_uuid}.json")
+
+    def legacy_keyframe_path(self, base_uuid, version):
+        return os.path.join(self.keyframe_dir, base_uuid, f"v{version}")
+
+    def _load_legacy(self, base_uuid):
+        """기존 JSON diff 파일. 없으면 None, 손상되었으면 ValueError"""
+        path = self.legacy_path(base_uuid)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if not isinstance(data, dict):
+            raise ValueError(f"Invalid diff file: {path}")
+        return data
+
+    # ---------- 조회 ----------
+
+    def has(self, base_uuid):
+        return base_uuid in self.content or os.path.exists(self.legacy_path(base_uuid))
+
+    def in_pack(self, base_uuid):
+        return base_uuid in self.content
+
+    def is_chunked(self, base_uuid, version=None):
+        """version(없으면 최신)이 chunk manifest 로 저장되었는지"""
+        if version is None:
+            return self.latest_kind.get(base_uuid) == "M"
+        return version in self.manifests.get(base_uuid, {})
+
+    def content_ref(self, base_uuid):
+        if base_uuid in self.content:
+            kind = "manifest" if self.is_chunked(base_uuid) else "pack"
+            return (kind,) + self.content[base_uuid][1]
+        path = self.legacy_path(base_uuid)
+        if os.path.exists(path):
+            return ("json", path)
+        return None
+
+    def last_content(self, base_uuid):
+        if base_uuid in self.content:
+            if self.is_chunked(base_uuid):
+                raise ValueError("chunk 로 저장된 버전은 텍스트로 읽을 수 없습니다")
+            return self._read_text(self.content[base_uuid][1])
+        data = self._load_legacy(base_uuid)
+        return data.get("last_content", "") if data else ""
+
+    def diffs_between(self, base_uuid, after_version, upto_version=None):
+        """after_version < version <= upto_version 인 diff 레코드 (저장 순서대로)"""
+        in_range = lambda v: v > after_version and (upto_version is None or v <= upto_version)
+        if base_uuid in self.content:
+            result = []
+            for version, ref in self.diffs.get(base_uuid, []):
+                if in_range(version):
+                    result.extend(self._read_diffs(ref))
+            return result
+        data = self._load_legacy(base_uuid) or {}
+        return [d for d in data.get("diffs", []) if in_range(d.get("version", 0))]
+
+    def keyframe_versions(self, base_uuid):
+        if base_uuid in self.content:
+            return sorted(self.keyframes.get(base_uuid, {}))
+        data = self._load_legacy(base_uuid) or {}
+        return sorted(data.get("keyframes", []))
+
+    def keyframe(self, base_uuid, version):
+        ref = self.keyframes.get(base_uuid, {}).get(version)
+        if ref is not None:
+            return self._read_text(ref)
+        try:
+            with open(self.legacy_keyframe_path(base_uuid, version), "r", encoding="utf-8") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def pending_diff_bytes(self, base_uuid, after_version):
+        """after_version 이후 누적된 diff 크기 (pack 은 압축 후 크기)"""
+        if base_uuid in self.content:
+            return sum(ref[2] for v, ref in self.diffs.get(base_uuid, []) if v > after_version)
+        return sum(len(json.dumps(d)) for d in self.diffs_between(base_uuid, after_version))
+
+    def manifest(self, base_uuid, version=None):
+        refs = self.manifests.get(base_uuid, {})
+        if version is None:
+            version = self.content[base_uuid][0]
+        return json.loads(self._read(refs[version]).decode("utf-8"))
+
+    def write_chunks(self, manifest, fh):
+        """manifest 의 chunk 들을 순서대로 fh 에 쓴다 (한 번에 chunk 하나만 메모리에 올림)"""
+        for chunk_hash, _ in manifest["chunks"]:
+            fh.write(self._read(self.blobs[chunk_hash]))
+
+    def iter_latest_chunks(self, base_uuid):
+        """
+        최신 버전 내용을 (chunk 키, 데이터) 로 순회한다 (cedge push 에서 사용).
+        텍스트 버전도 같은 common.chunking 기준으로 나누므로 harbor 의 chunk 키와 일치한다.
+        """
+        if self.is_chunked(base_uuid):
+            for chunk_hash, _ in self.manifest(base_uuid)["chunks"]:
+                yield chunk_hash, self._read(self.blobs[chunk_hash])
+            return
+        for chunk in iter_bytes_chunks(self.last_content(base_uuid).encode("utf-8")):
+            yield hashlib.sha256(chunk).hexdigest(), chunk
+
+    def load(self, base_uuid):
+        """기존 JSON 파일과 같은 형태의 dict. 기록이 없으면 None"""
+        if base_uuid in self.content:
+            return {
+                "last_content": self.last_content(base_uuid),
+                "diffs": self.diffs_between(base_uuid, 0),
+                "keyframes": self.keyframe_versions(base_uuid)
+            }
+        return self._load_legacy(base_uuid)
+
+    # ---------- 기록 ----------
+
+    def migrate_legacy(self, base_uuid):
+        """JSON diff 파일(과 keyframe 파일)을 pack 으로 옮긴다. 손상 시 ValueError"""
+        if base_uuid in self.content:
+            return
+        data = self._load_legacy(base_uuid)
+        if data is None:
+            return
+
+        groups = []
+        for d in data.get("diffs", []):
+            if groups and groups[-1][0] == d.get("version"):
+                groups[-1][1].append(d)
+            else:
+                groups.append((d.get("version"), [d]))
+        for version, records in groups:
+            self._write_object("D", base_uuid, version, json.dumps(records).encode("utf-8"))
+
+        for version in data.get("keyframes", []):
+            content = self.keyframe(base_uuid, version)
+            if content is not None:
+                self.add_keyframe(base_uuid, version, content)
+
+        latest = max((v for v, _ in groups), default=1)
+        self._write_object("C", base_uuid, latest, data.get("last_content", "").encode("utf-8"))
+        self.drop_legacy(base_uuid)
+
+    def drop_legacy(self, base_uuid):
+        try:
+            os.remove(self.legacy_path(base_uuid))
+        except OSError:
+            pass
+        kf_dir = os.path.join(self.keyframe_dir, base_uuid)
+        if os.path.isdir(kf_dir):
+            for name in os.listdir(kf_dir):
+                os.remove(os.path.join(kf_dir, name))
+            os.rmdir(kf_dir)
+
+    def append_version(self, base_uuid, diffs, content, version=1):
+        if diffs:
+            with TIMINGS.phase("encode"):
+                payload = json.dumps(diffs).encode("utf-8")
+            self._write_object("D", base_uuid, version, payload)
+        with TIMINGS.phase("encode"):
+            payload = content.encode("utf-8")
+        self._write_object("C", base_uuid, version, payload)
+
+    def add_keyframe(self, base_uuid, version, content):
+        self._write_object("K", base_uuid, version, content.encode("utf-8"))
+
+    def put_chunks(self, path, binary=False):
+        """
+        파일을 chunk 로 나눠 아직 없는 chunk 만 기록하고 manifest 를 돌려준다.
+        파일 전체 해시도 같은 읽기에서 계산한다.
+        """
+        with TIMINGS.phase("chunk", files=1):
+            manifest = chunk_file(path, self._put_blob)
+        TIMINGS.add("chunk", calls=0, bytes_read=manifest["size"])
+        manifest["binary"] = binary
+        return manifest
+
+    def append_manifest(self, base_uuid, manifest, version=1):
+        self._write_object("M", base_uuid, version, json.dumps(manifest).encode("utf-8"))
+
+    def close(self):
+        for fh in (self._pack_fh, self._index_fh, *self._readers.values()):
+            if fh is not None:
+                fh.close()
+        self._pack_fh = self._index_fh = None
+        self._readers = {}
+
+    def repack(self):
+        """
+        살아있는 객체(최신 C, 모든 D/K/M, 사용 중인 B)만 새 pack 으로 옮기고 기존 pack 과
+        JSON diff 파일을 정리한다. (before_bytes, after_bytes, migrated) 반환
+        """
+        migrated = 0
+        if os.path.isdir(self.diff_dir):
+            for name in os.listdir(self.diff_dir):
+                if name.endswith(".json"):
+                    base_uuid = name[:-len(".json")]
+                    if base_uuid not in self.content:
+                        self.migrate_legacy(base_uuid)
+                        migrated += 1
+
+        old_packs = sorted(n for n in os.listdir(self.pack_dir) if n.endswith(".pack")) \
+            if os.path.isdir(self.pack_dir) else []
+        before = sum(os.path.getsize(os.path.join(self.pack_dir, n)) for n in old_packs)
+        if not old_packs:
+            return 0, 0, migrated
+
+        content, diffs, keyframes = self.content, self.diffs, self.keyframes
+        manifests, blobs, latest_kind = self.manifests, self.blobs, self.latest_kind
+        self.close()
+
+        number = int(self.active_pack[len("pack-"):-len(".pack")]) + 1
+        new_pack = f"pack-{number:04d}.pack"
+        new_index = self.index_path + ".tmp"
+        raw = {}
+
+        with open(os.path.join(self.pack_dir, new_pack), "wb") as pack_fh, \
+                open(new_index, "w", encoding="utf-8") as index_fh:
+            def copy(kind, base_uuid, version, ref):
+                pack_name, offset, length = ref
+                fh = self._readers.get(pack_name)
+                if fh is None:
+                    fh = open(os.path.join(self.pack_dir, pack_name), "rb")
+                    self._readers[pack_name] = fh
+                fh.seek(offset)
+                chunk = fh.read(HEADER.size + length)  # 압축된 상태 그대로 복사
+                new_offset = pack_fh.tell()
+                pack_fh.write(chunk)
+                index_fh.write(f"{kind}\t{base_uuid}\t{version}\t{new_pack}\t{new_offset}\t{length}\n")
+                raw.setdefault(kind, []).append((base_uuid, version, (new_pack, new_offset, length)))
+
+            for base_uuid, items in diffs.items():
+                for version, ref in items:
+                    copy("D", base_uuid, version, ref)
+            # 어떤 manifest / C / K 에서도 쓰이지 않는 chunk 는 버린다
+            live_blobs = set()
+            for base_uuid, items in keyframes.items():
+                for version, ref in sorted(items.items()):
+                    copy("K", base_uuid, version, ref)
+                    live_blobs.update(self._chunk_keys(ref))
+            for base_uuid, items in manifests.items():
+                for version, ref in sorted(items.items()):
+                    copy("M", base_uuid, version, ref)
+                    live_blobs.update(h for h, _ in json.loads(self._read(ref).decode("utf-8"))["chunks"])
+            for base_uuid, (version, ref) in content.items():
+                if latest_kind.get(base_uuid) == "C":
+                    live_blobs.update(self._chunk_keys(ref))
+            for chunk_hash in live_blobs:
+                copy("B", chunk_hash, 0, blobs[chunk_hash])
+            for base_uuid, (version, ref) in content.items():
+                if latest_kind.get(base_uuid) == "C":
+                    copy("C", base_uuid, version, ref)
+
+            pack_fh.flush()
+            os.fsync(pack_fh.fileno())
+            index_fh.flush()
+            os.fsync(index_fh.fileno())
+
+        for fh in self._readers.values():
+            fh.close()
+        self._readers = {}
+
+        os.replace(new_index, self.index_path)
+        for name in old_packs:
+            os.remove(os.path.join(self.pack_dir, name))
+
+        self.active_pack = new_pack
+        self.content, self.diffs, self.keyframes = {}, {}, {}
+        self.manifests, self.blobs, self.latest_kind = {}, {}, {}
+        for kind in ("D", "K", "B", "M", "C"):
+            items = raw.get(kind, [])
+            for base_uuid, version, ref in items:
+                self._apply(kind, base_uuid, version, ref)
+
+        after = os.path.getsize(os.path.join(self.pack_dir, new_pack))
+        return before, after, migrated
+
+
+_stores = {}
+
+def open_store(root_dir="."):
+    """root_dir 별로 하나의 PackStore 를 재사용한다."""
+    key = os.path.abspath(root_dir)
+    store = _stores.get(key)
+    if store is None:
+        store = PackStore(root_dir)
+        _stores[key] = store
+    return store
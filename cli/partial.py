@@ -0,0 +1,175 @@
+# cli/partial.py
+# 부분 clone (cedge clone --partial) 의 prefetch 규칙, placeholder, 로컬 chunk cache 관리
+#
+# 부분 clone 은 모든 파일의 manifest(경로, 크기, 해시, chunk 목록)를 .cedge/clone.json 에
+# placeholder 로 기록하고, 파일 내용은 규칙에 맞는 것만 바로 받는다. 나머지는 `cedge fetch <glob>` 로
+# 필요할 때 받는다 (manifest 를 이미 가지고 있으므로 host 에는 증분 조회 한 번만 한다).
+#
+# 규칙은 .cedge/config.json 의 "partial" 에 남아 다음 clone(갱신) 때도 쓰인다.
+#   {"partial": {"include": ["data/train-00*.jsonl"],  이 패턴에 맞는 파일
+#                "sample": 0.05,                        경로 해시 기준 5% 표본 (실행마다 같은 파일)
+#                "max_file_size": 1073741824,           이보다 큰 파일은 prefetch 하지 않음
+#                "max_bytes": 10737418240,              받아 둔 파일의 합계 상한
+#                "cache_quota": 5368709120}}            .cedge/objects chunk cache 상한 (LRU)
+#
+# chunk cache 는 파일을 조립한 뒤에도 남아 같은 chunk 를 쓰는 다른 파일/버전을 받을 때 재사용된다.
+# cache_quota 를 넘으면 가장 오래 쓰이지 않은(mtime) chunk 부터 지운다.
+import os
+import sys
+import json
+import time
+import fnmatch
+import hashlib
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.placement import placement_key
+
+CONFIG_FILE = "config.json"
+SIZE_UNITS = {"k": 1 << 10, "m": 1 << 20, "g": 1 << 30, "t": 1 << 40}
+
+
+def parse_size(value):
+    """"512M", "10G", "1048576" 같은 크기를 바이트로 (None 은 None)"""
+    if value is None:
+        return None
+    value = str(value).strip().lower().rstrip("b")
+    if value and value[-1] in SIZE_UNITS:
+        return int(float(value[:-1]) * SIZE_UNITS[value[-1]])
+    return int(value)
+
+
+def _sampled(path, fraction):
+    return int(hashlib.sha1(path.encode("utf-8")).hexdigest()[:8], 16) / 0xFFFFFFFF < fraction
+
+
+class PrefetchRules:
+    FIELDS = ("include", "sample", "max_file_size", "max_bytes", "cache_quota")
+
+    def __init__(self, include=None, sample=None, max_file_size=None, max_bytes=None,
+                 cache_quota=None):
+        self.include = list(include or [])
+        self.sample = sample
+        self.max_file_size = max_file_size
+        self.max_bytes = max_bytes
+        self.cache_quota = cache_quota
+
+    @classmethod
+    def load(cls, root_dir="."):
+        try:
+            with open(os.path.join(root_dir, ".cedge", CONFIG_FILE), "r", encoding="utf-8") as f:
+                data = json.load(f).get("partial", {})
+        except (OSError, ValueError):
+            data = {}
+        return cls(**{k: data.get(k) for k in cls.FIELDS})
+
+    def merged(self, saved):
+        """이번에 주지 않은 항목은 저장된 규칙의 값을 쓴다"""
+        return PrefetchRules(**{k: getattr(self, k) or getattr(saved, k) for k in self.FIELDS})
+
+    def save(self, root_dir="."):
+        path = os.path.join(root_dir, ".cedge", CONFIG_FILE)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                config = json.load(f)
+        except (OSError, ValueError):
+            config = {}
+        config["partial"] = {k: getattr(self, k) for k in self.FIELDS if getattr(self, k)}
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(config, f, indent=2, ensure_ascii=False)
+
+    def matches(self, path):
+        return any(fnmatch.fnmatch(path, pattern) for pattern in self.include) \
+            or (self.sample is not None and _sampled(path, self.sample))
+
+    def select(self, entries, used=0):
+        """entries: (uuid, path, size). 규칙에 맞는 uuid 들 (경로 순, max_bytes 안에서)"""
+        chosen = []
+        for uuid_, path, size in sorted(entries, key=lambda e: e[1]):
+            if self.max_file_size and size > self.max_file_size:
+                continue
+            if not self.matches(path):
+                continue
+            if self.max_bytes and used + size > self.max_bytes:
+                continue
+            chosen.append(uuid_)
+            used += size
+        return chosen
+
+
+def add_placeholders(state, manifests, rules):
+    """
+    새로 받은 manifest 들을 placeholder 로 기록하고 지금 받을 파일 {uuid: manifest} 를 돌려준다.
+    같은 파일의 이전 버전 항목은 지우고, 이전 버전을 받아 두었던 파일은 새 버전도 받는다.
+    """
+    files = state["files"]
+    by_base = {placement_key(u): u for u in files}
+    refresh = []
+    for uuid_, manifest in manifests.items():
+        old = by_base.get(placement_key(uuid_))
+        if old is not None and old != uuid_:
+            if files.pop(old).get("fetched"):
+                refresh.append(uuid_)
+        files[uuid_] = {"path": manifest["path"], "hash": manifest["hash"],
+                        "size": manifest["size"], "chunks": manifest["chunks"], "fetched": False}
+
+    used = sum(f.get("size", 0) for f in files.values() if f.get("fetched"))
+    pending = [(u, f["path"], f["size"]) for u, f in files.items()
+               if not f.get("fetched") and "chunks" in f]
+    wanted = set(rules.select(pending, used)) | set(refresh)
+    return {u: dict(files[u], uuid=u) for u in wanted}
+
+
+def touch_chunks(store, manifests):
+    """방금 쓴 chunk 를 최근 사용으로 표시 (LRU 기준은 mtime)"""
+    now = time.time()
+    for manifest in manifests:
+        for chunk_hash, _ in manifest["chunks"]:
+            for path in (store.path(chunk_hash), store.raw_path(chunk_hash)):
+                try:
+                    os.utime(path, (now, now))
+                    break
+                except OSError:
+                    continue
+
+
+def enforce_quota(store, quota):
+    """chunk cache 가 quota 를 넘으면 오래 쓰이지 않은 chunk 부터 지운다. 지운 바이트 수"""
+    if not quota or not os.path.isdir(store.root):
+        return 0
+    objects = []
+    total = 0
+    for dirpath, _, filenames in os.walk(store.root):
+        for name in filenames:
+            if name.endswith(".tmp"):
+                continue
+            path = os.path.join(dirpath, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            objects.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+    if total <= quota:
+        return 0
+
+    objects.sort()
+    removed = 0
+    count = 0
+    for _, size, path in objects:
+        if total - removed <= quota:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        removed += size
+        count += 1
+    print(f"🧹 chunk cache 정리: {count}개 ({removed:,} bytes) 삭제, quota {quota:,} bytes")
+    return removed
+
+
+def match_entries(files, patterns):
+    """patterns 에 맞는 clone.json 항목 {uuid: 항목} (경로 순)"""
+    found = {u: f for u, f in files.items()
+             if any(fnmatch.fnmatch(f["path"], p) for p in patterns)}
+    return dict(sorted(found.items(), key=lambda item: item[1]["path"]))
@@ -0,0 +1,277 @@
+# cli/push.py
+# cedge push: 바뀐 파일 버전을 .cedge 저장소에서 harbor 로 올린다
+#
+# 1. tracked.json 에서 마지막 push 이후 새 버전이 생긴 파일만 고른다
+#    (.cedge/push.json 에 파일마다 마지막으로 올린 uuid / version / hash 를 남겨 비교)
+#    host 의 배치(/api/placement)에 따라 파일마다 primary harbor 로 보낸다
+# 2. 각 파일의 최신 내용을 chunk manifest 로 만들어 harbor 에 업로드 세션을 연다.
+#    harbor 는 이미 가진 chunk 를 빼고, 없는 chunk 만 이어 붙인 스트림의 크기를 알려준다
+# 3. 그 스트림을 PART_SIZE 조각으로 나눠 최대 jobs 개까지 동시에 PUT 한다.
+#    세션 ID 를 push.json 에 남기므로 연결이 끊기면 다음 실행 때 받지 못한 조각부터 보낸다
+# 4. commit: harbor 가 chunk 를 검증·저장하고 host 에 UUID 를 등록한다
+import os
+import json
+import time
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from packstore import open_store
+from log import open_journal
+from common.timings import TIMINGS
+
+DEFAULT_HOST = "http://localhost:8000"
+PART_SIZE = 8 << 20
+MAX_IN_FLIGHT = 4
+RETRIES = 3
+REQUEST_TIMEOUT = 120
+
+
+def make_session(pool_size=MAX_IN_FLIGHT):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def load_push_state(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"files": {}, "sessions": {}}
+
+
+def pushed_version(entry):
+    return {"uuid": entry["uuid"], "version": entry.get("version", 1), "hash": entry.get("hash")}
+
+
+def is_pushed(state, entry):
+    # 예전 push.json 은 uuid 만 남겼는데, 같은 초에 만든 버전끼리 uuid 가 겹칠 수 있어 다시 올린다
+    return state["files"].get(entry["base_uuid"]) == pushed_version(entry)
+
+
+def save_push_state(path, state):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp, path)
+
+
+def place_files(session, host, project, entries):
+    """
+    host 의 해시 링 배치에 따라 파일을 primary harbor 별로 나눈다.
+    {harbor_url: [entry, ...]} 반환. 나머지 replica 는 host 가 harbor 간 복제로 채운다.
+    """
+    res = session.post(f"{host}/api/placement", json={
+        "project": project,
+        "keys": [entry["base_uuid"] for entry in entries]
+    }, timeout=REQUEST_TIMEOUT)
+    res.raise_for_status()
+    data = res.json()
+    groups = {}
+    for entry in entries:
+        harbors = data["placement"].get(entry["base_uuid"])
+        if not harbors:
+            raise RuntimeError(f"{project} 를 관리하는 harbor 가 없습니다 (host: {host})")
+        groups.setdefault(data["harbors"][harbors[0]].rstrip("/"), []).append(entry)
+    return groups
+
+
+def build_manifest(store, entry):
+    """저장소의 최신 내용을 chunk manifest 로 만든다 (harbor 에 보낼 파일 항목)"""
+    total = hashlib.sha256()
+    chunks = []
+    for chunk_hash, data in store.iter_latest_chunks(entry["base_uuid"]):
+        total.update(data)
+        chunks.append([chunk_hash, len(data)])
+    # 파일 경로는 프로젝트 폴더 기준 (clone 시 <project>/<path> 로 복원됨)
+    path = os.path.relpath(entry["filename"], entry["project"]).replace(os.sep, "/")
+    return {
+        "uuid": entry["uuid"],
+        "base_uuid": entry["base_uuid"],
+        "path": path,
+        "version": entry["version"],
+        "size": sum(size for _, size in chunks),
+        "hash": total.hexdigest(),
+        "chunks": chunks
+    }
+
+
+def iter_parts(store, files, missing, part_size):
+    """
+    harbor 가 요청한 chunk(missing, 처음 나온 순서)만 이어 붙여 part_size 조각으로 나눈다.
+    메모리에는 조각 하나만 올라간다.
+    """
+    buf = bytearray()
+    pos = 0
+    n = 0
+    for item in files:
+        if pos == len(missing):
+            break
+        for chunk_hash, data in store.iter_latest_chunks(item["base_uuid"]):
+            if pos < len(missing) and chunk_hash == missing[pos]:
+                buf += data
+                pos += 1
+                while len(buf) >= part_size:
+                    yield n, bytes(buf[:part_size])
+                    del buf[:part_size]
+                    n += 1
+    if pos != len(missing):
+        raise RuntimeError("harbor 가 요청한 chunk 를 저장소에서 찾을 수 없습니다")
+    if buf:
+        yield n, bytes(buf)
+
+
+def put_part(session, url, n, data):
+    headers = {"X-Part-Sha256": hashlib.sha256(data).hexdigest()}
+    for attempt in range(RETRIES):
+        try:
+            res = session.put(f"{url}/parts/{n}", data=data, headers=headers,
+                              timeout=REQUEST_TIMEOUT)
+            if res.status_code == 200:
+                return n
+            error = f"{res.status_code}, {res.text}"
+        except requests.RequestException as e:
+            error = str(e)
+        time.sleep(2 ** attempt)
+    raise RuntimeError(f"part {n} 전송 실패: {error}")
+
+
+def upload_parts(session, url, parts, received, jobs):
+    """받지 않은 조각만 최대 jobs 개씩 동시에 보낸다 (느린 harbor 에 맞춰 읽기도 멈춘다)"""
+    sent = 0
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        in_flight = set()
+        for n, data in parts:
+            if n in received:
+                continue
+            if len(in_flight) >= jobs:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    future.result()
+            in_flight.add(pool.submit(put_part, session, url, n, data))
+            sent += len(data)
+        for future in in_flight:
+            future.result()
+    return sent
+
+
+def open_upload(session, harbor_url, project, files, saved, part_size):
+    """저장된 세션이 같은 파일 목록이면 이어서 쓰고, 아니면 새 세션을 연다"""
+    uuids = [item["uuid"] for item in files]
+    if saved and saved.get("harbor") == harbor_url and saved.get("uuids") == uuids:
+        res = session.get(f"{harbor_url}/upload/sessions/{saved['id']}", timeout=REQUEST_TIMEOUT)
+        if res.status_code == 200:
+            info = res.json()
+            print(f"↩️  업로드 세션 이어받기: {len(info['received'])}/{info['parts']} 조각 완료")
+            return info
+
+    res = session.post(f"{harbor_url}/upload/sessions", json={
+        "project": project,
+        "part_size": part_size,
+        "files": files
+    }, timeout=REQUEST_TIMEOUT)
+    if res.status_code != 200:
+        raise RuntimeError(f"업로드 세션 생성 실패: {res.status_code}, {res.text}")
+    return res.json()
+
+
+def push_to_harbor(store, session, harbor_url, project, entries, state, state_path, jobs,
+                   part_size, journal=None):
+    files = [build_manifest(store, entry) for entry in entries]
+    for item, entry in zip(files, entries):
+        if item["hash"] != entry["hash"]:
+            print(f"⚠️  저장소 내용이 tracked.json 과 다릅니다: {entry['filename']}")
+
+    key = f"{project}@{harbor_url}"
+    info = open_upload(session, harbor_url, project, files, state["sessions"].get(key), part_size)
+    state["sessions"][key] = {
+        "id": info["session"],
+        "harbor": harbor_url,
+        "uuids": [item["uuid"] for item in files]
+    }
+    save_push_state(state_path, state)
+
+    logical = sum(item["size"] for item in files)
+    print(f"⬆️  {project} → {harbor_url}: 파일 {len(files)}개 ({logical:,} bytes) 중 "
+          f"새 chunk {info['missing_chunks']}개 ({info['total']:,} bytes) 전송")
+
+    url = f"{harbor_url}/upload/sessions/{info['session']}"
+    for _ in range(RETRIES):
+        parts = iter_parts(store, files, info["missing"], info["part_size"])
+        with TIMINGS.phase("upload"):
+            sent = upload_parts(session, url, parts, set(info["received"]), jobs)
+        TIMINGS.add("upload", calls=0, bytes_written=sent)
+
+        res = session.post(f"{url}/commit", timeout=REQUEST_TIMEOUT)
+        if res.status_code in (409, 422) and "missing_parts" in res.json():
+            # 빠지거나 손상된 조각만 다시 보낸다
+            info["received"] = sorted(set(range(info["parts"])) - set(res.json()["missing_parts"]))
+            continue
+        if res.status_code != 200:
+            raise RuntimeError(f"commit 실패: {res.status_code}, {res.text}")
+        break
+    else:
+        raise RuntimeError("commit 실패: 조각을 다시 보내도 완료되지 않았습니다")
+
+    result = res.json()
+    by_uuid = {item["uuid"]: (item, entry) for item, entry in zip(files, entries)}
+    for r in result["results"]:
+        if r["status"] == 200:
+            item, entry = by_uuid[r["uuid"]]
+            state["files"][item["base_uuid"]] = pushed_version(entry)
+            if journal is not None:
+                journal.append("pushed", project=project, uuid=r["uuid"], file=item["base_uuid"],
+                               path=f"{project}/{item['path']}", version=item["version"],
+                               harbor=harbor_url)
+        else:
+            print(f"❌ {project}/{r['path']}: {r['status']}, {r.get('error')}")
+    del state["sessions"][key]
+    save_push_state(state_path, state)
+    print(f"✅ {project} → {harbor_url}: {result['committed']}개 push 완료 (이번 전송 {sent:,} bytes)")
+
+
+def push_files(root_dir=".", host=None, harbor=None, jobs=MAX_IN_FLIGHT, part_size=PART_SIZE):
+    tracked_path = os.path.join(root_dir, ".cedge", "tracked", "tracked.json")
+    if not os.path.exists(tracked_path):
+        print("❌ tracked.json이 존재하지 않습니다. 먼저 `cedge register .`를 실행하세요.")
+        return
+
+    with open(tracked_path, "r", encoding="utf-8") as f:
+        tracked = json.load(f)
+    host = (host or tracked.get("host_node") or DEFAULT_HOST).rstrip("/")
+
+    state_path = os.path.join(root_dir, ".cedge", "push.json")
+    state = load_push_state(state_path)
+
+    # 마지막 push 이후 새 버전이 생긴 파일만
+    by_project = {}
+    for entry in tracked.get("files", []):
+        if not is_pushed(state, entry):
+            by_project.setdefault(entry["project"], []).append(entry)
+
+    if not by_project:
+        print("✅ push 할 변경 사항이 없습니다.")
+        return
+
+    store = open_store(root_dir)
+    journal = open_journal(root_dir)
+    session = make_session(jobs)
+    for project, entries in sorted(by_project.items()):
+        try:
+            groups = {harbor.rstrip("/"): entries} if harbor else \
+                place_files(session, host, project, entries)
+        except (requests.RequestException, RuntimeError) as e:
+            print(f"❌ {project}: harbor 배치 조회 실패 ({e})")
+            continue
+        for harbor_url, group in sorted(groups.items()):
+            try:
+                push_to_harbor(store, session, harbor_url, project, group, state, state_path,
+                               jobs, part_size, journal)
+            except (requests.RequestException, RuntimeError) as e:
+                print(f"❌ {project} → {harbor_url}: push 중단 ({e})")
+                print("👉 같은 명령을 다시 실행하면 받지 못한 조각부터 이어서 보냅니다.")
@@ -0,0 +1,286 @@
+# cli/record_diff.py
+# JSONL / CSV 데이터셋의 레코드 단위 diff
+#
+# 라인 diff 는 데이터셋을 다시 정렬하거나 shard 를 나누기만 해도 파일 전체를 diff 로 남긴다.
+# 여기서는 레코드를 키(id 필드/컬럼, 설정이 없으면 레코드 내용 자체)로 맞춰 보고
+# 바뀐 레코드만 저장한다. 한 버전의 diff 는 type "r" 레코드 하나:
+#
+#   {"type": "r", "version": v, "format": "jsonl",
+#    "runs":    [["n", j, len], ["o", i, len], ...],  이전 버전의 레코드 순서
+#                  "n": 새 버전 j 번째부터 len 개, "o": removed[i] 부터 len 개
+#    "removed": [이전 버전에만 있던 레코드 원문, ...],
+#    "changed": [[새 버전 위치, 이전 버전 원문], ...],  키는 같고 내용이 바뀐 레코드
+#    "header":  이전 버전 헤더 (CSV, 바뀐 경우만)}
+#
+# 레코드 내용은 바뀐 것만 남고, 순서는 연속 구간(run)으로만 기록된다.
+# 끝에 추가하거나 일부만 고친 경우 run 은 몇 개뿐이고, 다시 정렬한 경우에도 정수 쌍만 늘어난다.
+#
+# 형식은 FORMATS 에 등록하며 확장자로 고른다. Parquet 은 바이너리라 chunk 로 저장되고,
+# pyarrow 가 있으면 show diff 에서 row group / 컬럼 / 레코드 단위 요약을 보여준다.
+import io
+import os
+import csv
+import json
+import fnmatch
+import hashlib
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+CONFIG_FILE = "config.json"   # .cedge/config.json {"record_keys": {"<glob>": "<필드 또는 컬럼>"}}
+SHOW_LIMIT = 20               # show diff 에서 종류별로 보여줄 최대 레코드 수
+
+
+class JsonlFormat:
+    name = "jsonl"
+    extensions = (".jsonl", ".ndjson")
+
+    def split(self, lines):
+        return None, lines
+
+    def join(self, header, records):
+        return records
+
+    def keys(self, header, records, key):
+        if not key:
+            return list(records)
+        path = key.split(".")
+        result = []
+        for line in records:
+            try:
+                value = json.loads(line)
+                for part in path:
+                    value = value[part]
+            except (ValueError, KeyError, TypeError, IndexError):
+                result.append(line)   # 키가 없는 레코드는 내용으로 맞춘다
+                continue
+            result.append(("k", json.dumps(value, sort_keys=True)))
+        return result
+
+
+class CsvFormat:
+    def __init__(self, name="csv", delimiter=",", extensions=(".csv",)):
+        self.name = name
+        self.delimiter = delimiter
+        self.extensions = extensions
+
+    def split(self, lines):
+        if not lines:
+            return None, []
+        return lines[0], lines[1:]
+
+    def join(self, header, records):
+        return ([header] if header is not None else []) + records
+
+    def keys(self, header, records, key):
+        columns = next(csv.reader([header or ""], delimiter=self.delimiter), [])
+        if not key or key not in columns:
+            return list(records)
+        col = columns.index(key)
+        result = []
+        for line in records:
+            row = next(csv.reader([line], delimiter=self.delimiter), [])
+            result.append(("k", row[col]) if col < len(row) else line)
+        return result
+
+
+FORMATS = {"jsonl": JsonlFormat(), "csv": CsvFormat(), "tsv": CsvFormat("tsv", "\t", (".tsv",))}
+
+
+def register_format(name, handler):
+    """새 형식 등록. handler 는 name / extensions / split / join / keys 를 가진다"""
+    FORMATS[name] = handler
+
+
+def detect_format(path):
+    """확장자로 형식 이름을 고른다. 데이터셋이 아니면 None"""
+    ext = os.path.splitext(path or "")[1].lower()
+    for name, handler in FORMATS.items():
+        if ext in handler.extensions:
+            return name
+    return None
+
+
+_record_keys = {}
+
+
+def load_record_keys(root_dir="."):
+    """.cedge/config.json 의 record_keys (root_dir 별로 한 번만 읽는다)"""
+    key = os.path.abspath(root_dir)
+    if key not in _record_keys:
+        try:
+            with open(os.path.join(root_dir, ".cedge", CONFIG_FILE), "r", encoding="utf-8") as f:
+                _record_keys[key] = json.load(f).get("record_keys", {})
+        except (OSError, ValueError):
+            _record_keys[key] = {}
+    return _record_keys[key]
+
+
+def record_key_for(record_keys, rel_path):
+    """경로에 맞는 키 필드. 더 긴(구체적인) 패턴이 우선"""
+    for pattern in sorted(record_keys, key=len, reverse=True):
+        if fnmatch.fnmatch(rel_path.replace(os.sep, "/"), pattern):
+            return record_keys[pattern]
+    return None
+
+
+def _numbered(keys):
+    """같은 키가 여러 번 나오면 몇 번째인지 붙여서 유일하게 만든다"""
+    seen = {}
+    result = []
+    for k in keys:
+        n = seen.get(k, 0)
+        seen[k] = n + 1
+        result.append((k, n))
+    return result
+
+
+def match_records(old_lines, new_lines, fmt, key=None):
+    """(handler, 이전 헤더, 이전 레코드, 새 헤더, 새 레코드, 이전 레코드별 새 위치 또는 None)"""
+    handler = FORMATS[fmt]
+    old_header, old_recs = handler.split(old_lines)
+    new_header, new_recs = handler.split(new_lines)
+
+    # 원문이 같은 레코드는 파싱 없이 바로 맞춘다. 키를 읽는(파싱하는) 것은 남은 레코드뿐이라
+    # 비용이 바뀐 레코드 수에 비례한다
+    pos = {k: j for j, k in enumerate(_numbered(new_recs))}
+    mapping = [pos.pop(k, None) for k in _numbered(old_recs)]
+    old_left = [i for i, j in enumerate(mapping) if j is None]
+    new_left = sorted(pos.values())
+    if key and old_left and new_left:
+        new_keys = handler.keys(new_header, [new_recs[j] for j in new_left], key)
+        by_key = {k: j for k, j in zip(_numbered(new_keys), new_left)}
+        old_keys = handler.keys(old_header, [old_recs[i] for i in old_left], key)
+        for i, k in zip(old_left, _numbered(old_keys)):
+            mapping[i] = by_key.get(k)
+    return handler, old_header, old_recs, new_header, new_recs, mapping
+
+
+def diff_records(old_lines, new_lines, version, fmt, key=None):
+    """이전 → 새 버전의 레코드 diff. 바뀐 것이 없으면 빈 목록"""
+    if old_lines == new_lines:
+        return []
+    _, old_header, old_recs, new_header, new_recs, mapping = \
+        match_records(old_lines, new_lines, fmt, key)
+
+    runs = []
+    removed = []
+    changed = []
+    for i, j in enumerate(mapping):
+        if j is None:
+            src, idx = "o", len(removed)
+            removed.append(old_recs[i])
+        else:
+            src, idx = "n", j
+            if new_recs[j] != old_recs[i]:
+                changed.append([j, old_recs[i]])
+        if runs and runs[-1][0] == src and runs[-1][1] + runs[-1][2] == idx:
+            runs[-1][2] += 1
+        else:
+            runs.append([src, idx, 1])
+
+    record = {"type": "r", "version": version, "format": fmt,
+              "runs": runs, "removed": removed, "changed": changed}
+    if old_header != new_header:
+        record["header"] = old_header
+    return [record]
+
+
+def revert_records(lines, record):
+    """새 버전 라인 목록에 record 를 거꾸로 적용해 이전 버전 라인 목록을 만든다"""
+    handler = FORMATS[record["format"]]
+    header, recs = handler.split(lines)
+    old_at = dict((j, line) for j, line in record["changed"])
+    removed = record["removed"]
+
+    old = []
+    for src, start, length in record["runs"]:
+        if src == "n":
+            old.extend(old_at.get(j, recs[j]) for j in range(start, start + length))
+        else:
+            old.extend(removed[start:start + length])
+    return handler.join(record.get("header", header), old)
+
+
+def describe_records(old_text, new_text, fmt, key=None, limit=SHOW_LIMIT):
+    """show diff 용 레코드 단위 변경 내용 (출력할 줄 목록)"""
+    _, old_header, old_recs, new_header, new_recs, mapping = \
+        match_records(old_text.splitlines(), new_text.splitlines(), fmt, key)
+    matched = set(j for j in mapping if j is not None)
+    removed = [old_recs[i] for i, j in enumerate(mapping) if j is None]
+    added = [new_recs[j] for j in range(len(new_recs)) if j not in matched]
+    changed = [(old_recs[i], new_recs[j]) for i, j in enumerate(mapping)
+               if j is not None and new_recs[j] != old_recs[i]]
+    moved = sum(1 for i, j in enumerate(mapping) if j is not None and i != j)
+
+    out = [f"레코드 {len(old_recs):,} → {len(new_recs):,} (키: {key or '레코드 내용'}): "
+           f"+{len(added)} -{len(removed)} ~{len(changed)}, 위치 이동 {moved}"]
+    if old_header != new_header:
+        out += [f"- header: {old_header}", f"+ header: {new_header}"]
+    out += [f"- {line}" for line in removed[:limit]]
+    out += [f"+ {line}" for line in added[:limit]]
+    for old_line, new_line in changed[:limit]:
+        out += [f"~ {old_line}", f"  → {new_line}"]
+    hidden = max(0, len(removed) - limit) + max(0, len(added) - limit) + max(0, len(changed) - limit)
+    if hidden:
+        out.append(f"... 외 {hidden}개 레코드")
+    return out
+
+
+# ---------- Parquet (pyarrow 가 있을 때만) ----------
+
+def _row_hashes(table):
+    return [hashlib.sha1(json.dumps(row, sort_keys=True, default=str).encode("utf-8")).digest()
+            for row in table.to_pylist()]
+
+
+def describe_parquet(old_bytes, new_path, key=None, limit=SHOW_LIMIT):
+    """두 Parquet 파일의 스키마 / row group·컬럼 / 레코드 단위 변경 요약. pyarrow 가 없으면 None"""
+    if pq is None:
+        return None
+    old_file = pq.ParquetFile(io.BytesIO(old_bytes))
+    new_file = pq.ParquetFile(new_path)
+    out = []
+    if old_file.schema_arrow != new_file.schema_arrow:
+        out.append(f"스키마 변경: {old_file.schema_arrow.names} → {new_file.schema_arrow.names}")
+
+    # row group 안의 컬럼 chunk 는 통계(min/max/null 수)와 크기로 먼저 비교한다
+    columns = [c for c in new_file.schema_arrow.names if c in old_file.schema_arrow.names]
+    changed_groups = []
+    for g in range(max(old_file.num_row_groups, new_file.num_row_groups)):
+        if g >= old_file.num_row_groups or g >= new_file.num_row_groups:
+            changed_groups.append((g, ["(row group 추가/삭제)"]))
+            continue
+        og, ng = old_file.metadata.row_group(g), new_file.metadata.row_group(g)
+        cols = []
+        for c in columns:
+            oc = og.column(old_file.schema_arrow.get_field_index(c))
+            nc = ng.column(new_file.schema_arrow.get_field_index(c))
+            old_stats = oc.statistics.to_dict() if oc.statistics else None
+            new_stats = nc.statistics.to_dict() if nc.statistics else None
+            if (oc.total_compressed_size, old_stats) != (nc.total_compressed_size, new_stats):
+                cols.append(c)
+        if og.num_rows != ng.num_rows or cols:
+            changed_groups.append((g, cols))
+    out.append(f"row group {old_file.num_row_groups} → {new_file.num_row_groups}, "
+               f"바뀐 row group {len(changed_groups)}개")
+    for g, cols in changed_groups[:limit]:
+        out.append(f"  row group {g}: {', '.join(cols) or '행 수 변경'}")
+
+    # 레코드 단위: 키 컬럼(없으면 행 내용 해시)으로 맞춘다
+    old_table, new_table = old_file.read(), new_file.read()
+    if key and key in old_table.column_names and key in new_table.column_names:
+        old_keys = [json.dumps(v, default=str) for v in old_table.column(key).to_pylist()]
+        new_keys = [json.dumps(v, default=str) for v in new_table.column(key).to_pylist()]
+    else:
+        old_keys, new_keys = _row_hashes(old_table), _row_hashes(new_table)
+    old_rows = dict(zip(old_keys, _row_hashes(old_table)))
+    new_rows = dict(zip(new_keys, _row_hashes(new_table)))
+    added = sum(1 for k in new_rows if k not in old_rows)
+    removed = sum(1 for k in old_rows if k not in new_rows)
+    changed = sum(1 for k, h in new_rows.items() if k in old_rows and old_rows[k] != h)
+    out.append(f"레코드 {old_table.num_rows:,} → {new_table.num_rows:,} "
+               f"(키: {key or '행 내용'}): +{added} -{removed} ~{changed}")
+    return out
@@ -0,0 +1,194 @@
+# cli/status.py
+# cedge status: 마지막 add 이후 바뀐 파일 목록 (수정 / 새 파일 / 삭제)
+#
+# 이전 버전을 복원하거나 diff 를 계산하지 않는다.
+# 1. tracked.json 의 stat 정보(size / mtime_ns / inode)가 그대로인 파일은 열지 않는다
+# 2. stat 이 바뀐 파일만 sha256 을 계산해 tracked.json 의 내용 해시와 비교한다
+#    (touch 만 된 파일은 변경으로 보지 않는다)
+# 3. 디스크에 없는 tracked 항목은 삭제로 본다
+# 폴더 순회와 해시 계산은 프로젝트의 하위 폴더 단위로 스레드 풀에서 나눠 처리한다.
+#
+# --remote 는 로컬 파일 대신 host 와 비교한다: tracked.json 의 Merkle tree 와 host 의 프로젝트 트리
+# (/api/project/<name>/merkle)를 root 부터 비교해 해시가 다른 버킷만 내려가므로,
+# 파일 수와 관계없이 왕복은 최대 DEPTH + 1 번이고 받는 양은 다른 파일 수에 비례한다.
+import os
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from commands import scan_files, stat_unchanged, HOST_NODE
+from streaming import file_hash
+from tracked import TrackedIndex
+from common.merkle import diff_trees, http_fetcher
+
+DEFAULT_JOBS = 8
+
+
+def _check(index, root_dir, full_path, st):
+    """(상태, 상대 경로). 상태: "A" 새 파일, "M" 수정, None 변경 없음"""
+    rel_path = os.path.relpath(full_path, root_dir)
+    entry = index.get(rel_path)
+    if entry is None:
+        return "A", rel_path
+    if stat_unchanged(entry, st):
+        return None, rel_path
+    if "hash" not in entry:
+        # 해시가 없는 예전 항목은 mtime 기준으로 판단
+        return ("M" if st.st_mtime > entry.get("mtime", 0) else None), rel_path
+    try:
+        changed = file_hash(full_path) != entry["hash"]
+    except OSError:
+        changed = True
+    return ("M" if changed else None), rel_path
+
+
+def _scan_unit(index, root_dir, unit):
+    """unit: ("dir", 경로) 는 하위 전체, ("files", [(경로, stat)]) 는 주어진 파일만"""
+    kind, value = unit
+    files = scan_files(value) if kind == "dir" else value
+    return [_check(index, root_dir, full_path, st) for full_path, st in files]
+
+
+def _units(root_dir):
+    """프로젝트 폴더마다 바로 아래 파일 묶음 하나 + 하위 폴더 하나씩"""
+    for project in sorted(os.listdir(root_dir)):
+        project_path = os.path.join(root_dir, project)
+        if not os.path.isdir(project_path) or project.startswith("."):
+            continue
+        direct = []
+        with os.scandir(project_path) as it:
+            for dir_entry in it:
+                try:
+                    if dir_entry.is_dir(follow_symlinks=False):
+                        yield "dir", dir_entry.path
+                    elif dir_entry.is_file():
+                        direct.append((dir_entry.path, dir_entry.stat()))
+                except OSError:
+                    continue
+        if direct:
+            yield "files", direct
+
+
+def collect_status(root_dir=".", jobs=DEFAULT_JOBS):
+    """{"modified": [...], "added": [...], "deleted": [...]} (경로는 정렬됨). tracked.json 이 없으면 None"""
+    index = TrackedIndex.load(root_dir)
+    if index is None:
+        return None
+
+    result = {"modified": [], "added": [], "deleted": []}
+    seen = set()
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        futures = [pool.submit(_scan_unit, index, root_dir, unit) for unit in _units(root_dir)]
+        for future in futures:
+            for state, rel_path in future.result():
+                seen.add(rel_path)
+                if state == "A":
+                    result["added"].append(rel_path)
+                elif state == "M":
+                    result["modified"].append(rel_path)
+
+    result["deleted"] = [name for name in index.names() if name not in seen]
+    result["modified"].sort()
+    result["added"].sort()
+    return result
+
+
+def show_status(root_dir=".", jobs=DEFAULT_JOBS, output="text"):
+    result = collect_status(root_dir, jobs)
+    if result is None:
+        print("❌ tracked.json이 존재하지 않습니다. 먼저 `cedge register .`를 실행하세요.")
+        return
+
+    if output == "json":
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+        return
+    if output == "porcelain":
+        # git status --porcelain 과 같은 "<상태> <경로>" 한 줄 형식
+        for code, key in (("M", "modified"), ("A", "added"), ("D", "deleted")):
+            for path in result[key]:
+                print(f"{code} {path}")
+        return
+
+    if not any(result.values()):
+        print("✅ 변경된 파일이 없습니다.")
+        return
+    for label, key in (("🔁 수정됨", "modified"), ("🆕 새 파일", "added"), ("🗑️  삭제됨", "deleted")):
+        if result[key]:
+            print(f"\n{label} ({len(result[key])})")
+            for path in result[key]:
+                print(f"   {path}")
+    print("\n👉 `cedge add .` 로 변경 사항을 기록하세요.")
+
+
+def _uuid_time(uuid_):
+    try:
+        t = int(uuid_.rsplit("-", 1)[1])
+    except (IndexError, ValueError):
+        return None
+    return t / 1e9 if t >= 10 ** 12 else t  # 예전 UUID 는 초, 지금은 ns
+
+
+def collect_remote_status(root_dir=".", host=None):
+    """
+    host 와 다른 파일. {"ahead": [...], "behind": [...], "local_only": [...], "remote_only": [...],
+    "errors": {project: 메시지}}. ahead/local_only 는 push 할 것, behind/remote_only 는 host 쪽이 새 것.
+    """
+    index = TrackedIndex.load(root_dir)
+    if index is None:
+        return None
+    host = (host or index.host_node or HOST_NODE).rstrip("/")
+    session = requests.Session()
+    result = {"ahead": [], "behind": [], "local_only": [], "remote_only": [], "errors": {}}
+    for project in sorted({entry["project"] for entry in index}):
+        fetch = http_fetcher(session, f"{host}/api/project/{project}/merkle")
+        try:
+            diffs, _ = diff_trees(index.merkle(project), fetch)
+        except (requests.RequestException, ValueError, KeyError) as e:
+            result["errors"][project] = str(e)
+            continue
+        for base, (local, remote) in diffs.items():
+            entry = index.get_base(base)
+            name = entry["filename"] if entry else f"{project}/{base}"
+            if remote is None:
+                result["local_only"].append(name)
+            elif local is None:
+                result["remote_only"].append(name)
+            elif (_uuid_time(local) or 0) >= (_uuid_time(remote) or 0):
+                result["ahead"].append(name)
+            else:
+                result["behind"].append(name)
+    for key in ("ahead", "behind", "local_only", "remote_only"):
+        result[key].sort()
+    return result
+
+
+def show_remote_status(root_dir=".", host=None, output="text"):
+    result = collect_remote_status(root_dir, host)
+    if result is None:
+        print("❌ tracked.json이 존재하지 않습니다. 먼저 `cedge register .`를 실행하세요.")
+        return
+
+    if output == "json":
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+        return
+    if output == "porcelain":
+        for code, key in (("M", "ahead"), ("A", "local_only"), ("B", "behind"), ("R", "remote_only")):
+            for path in result[key]:
+                print(f"{code} {path}")
+        return
+
+    for project, error in result["errors"].items():
+        print(f"❌ {project}: host 비교 실패 ({error})")
+    if not any(result[key] for key in ("ahead", "behind", "local_only", "remote_only")):
+        if not result["errors"]:
+            print("✅ host 와 같습니다.")
+        return
+    for label, key in (("⬆️  push 안 된 새 버전", "ahead"), ("🆕 host 에 없음", "local_only"),
+                       ("⬇️  host 쪽이 새 버전", "behind"), ("☁️  host 에만 있음", "remote_only")):
+        if result[key]:
+            print(f"\n{label} ({len(result[key])})")
+            for path in result[key]:
+                print(f"   {path}")
+    if result["ahead"] or result["local_only"]:
+        print("\n👉 `cedge push` 로 올리세요.")
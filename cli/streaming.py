@@ -0,0 +1,52 @@
+# cli/streaming.py
+# 대용량 / 바이너리 파일 처리
+#
+# STREAM_THRESHOLD 보다 크거나 UTF-8 텍스트가 아닌 파일은 전체를 메모리에 올리지 않고
+# READ_SIZE 단위로 읽으면서 해시를 계산하고, 내용 기반(content-defined) chunk 로 나눈다.
+# 이런 파일의 버전은 라인 diff 대신 chunk 목록(manifest)으로 저장되므로
+# 바뀐 chunk 만 새로 기록된다. chunking 자체는 harbor 와 같은 common.chunking 을 사용한다.
+import os
+import sys
+import hashlib
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.chunking import READ_SIZE
+
+STREAM_THRESHOLD = 64 << 20   # 이보다 큰 파일은 라인 diff 대신 chunk 로 저장
+SNIFF_SIZE = 8192
+
+
+def is_binary(path):
+    """앞부분만 보고 판단 (NUL 바이트가 있거나 UTF-8 로 읽을 수 없으면 바이너리)"""
+    try:
+        with open(path, "rb") as f:
+            head = f.read(SNIFF_SIZE)
+    except OSError:
+        return False
+    if b"\0" in head:
+        return True
+    try:
+        head.decode("utf-8")
+    except UnicodeDecodeError as e:
+        # 잘린 멀티바이트 문자 때문에 끝에서 실패한 경우는 텍스트로 본다
+        return e.start < len(head) - 3
+    return False
+
+
+def use_stream(path, size):
+    return size > STREAM_THRESHOLD or is_binary(path)
+
+
+def read_text(path):
+    """작은 텍스트 파일을 읽고 (text, sha256) 반환. UTF-8 이 아니면 UnicodeDecodeError"""
+    with open(path, "rb") as f:
+        data = f.read()
+    return data.decode("utf-8"), hashlib.sha256(data).hexdigest()
+
+
+def file_hash(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(READ_SIZE), b""):
+            h.update(block)
+    return h.hexdigest()
@@ -0,0 +1,263 @@
+# cli/tracked.py
+# tracked.json 을 경로 / base_uuid / 폴더 prefix 로 바로 찾을 수 있게 읽고 쓴다
+#
+# tracked.json 은 그대로 JSON 이지만, 항목을 filename 순으로 정렬해 한 줄에 하나씩 쓴다.
+#   {"host_node": "...", "files": [
+#   {...항목...},
+#   {...항목...}
+#   ]}
+# 옆의 tracked.idx 에는 STRIDE 번째 항목마다 (filename, 파일 안의 바이트 위치)를 남긴다.
+# 파일 하나나 폴더 하나만 필요할 때는 idx 에서 위치를 찾아 그 근처 줄만 읽는다 (부분 로드).
+# idx 가 없거나 tracked.json 이 idx 이후에 바뀌었으면(예전 형식 등) 전체를 읽는다.
+#
+# tracked.merkle 에는 프로젝트별 Merkle tree(common/merkle.py, 잎 = base_uuid → uuid)의 노드 해시를
+# 둔다. save() 때 add() 로 바뀐 파일의 버킷과 조상만 다시 계산하고, tracked.json 이 다른 경로로
+# 바뀌어 맞지 않으면 전체를 다시 만든다. `cedge status --remote` 가 host 의 트리와 비교할 때 쓴다.
+import os
+import sys
+import json
+import bisect
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.merkle import MerkleTree, group_leaves, leaf_key, DEPTH
+from common.timings import TIMINGS
+
+STRIDE = 256
+
+
+def tracked_path(root_dir="."):
+    return os.path.join(root_dir, ".cedge", "tracked", "tracked.json")
+
+
+def index_path(root_dir="."):
+    return os.path.join(root_dir, ".cedge", "tracked", "tracked.idx")
+
+
+def merkle_path(root_dir="."):
+    return os.path.join(root_dir, ".cedge", "tracked", "tracked.merkle")
+
+
+def _file_id(st):
+    return [st.st_size, st.st_mtime_ns]
+
+
+def folder_prefix(folder, root_dir="."):
+    """폴더 경로를 tracked.json 의 filename 기준 prefix 로 바꾼다 ('' 이면 전체)"""
+    rel = os.path.relpath(os.path.abspath(folder), os.path.abspath(root_dir))
+    return "" if rel == "." else rel.rstrip(os.sep) + os.sep
+
+
+class TrackedIndex:
+    """tracked.json 전체를 한 번 읽어 filename / base_uuid 로 색인한 것"""
+
+    def __init__(self, root_dir=".", host_node=None, entries=()):
+        self.root_dir = root_dir
+        self.host_node = host_node
+        self.by_path = {}
+        self.by_base = {}
+        self._names = None
+        self._buckets = None
+        self._merkle = None
+        self.changed = set()  # save() 때 Merkle tree 를 다시 계산할 base_uuid
+        for entry in entries:
+            self.add(entry)
+        self.changed.clear()
+
+    @classmethod
+    def load(cls, root_dir="."):
+        """tracked.json 이 없으면 None"""
+        with TIMINGS.phase("index-load"):
+            try:
+                with open(tracked_path(root_dir), "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                    TIMINGS.add("index-load", calls=0, bytes_read=f.tell())
+            except FileNotFoundError:
+                return None
+            return cls(root_dir, data.get("host_node"), data.get("files", []))
+
+    def __len__(self):
+        return len(self.by_path)
+
+    def __iter__(self):
+        """filename 순으로 항목을 순회"""
+        for name in self.names():
+            yield self.by_path[name]
+
+    def names(self):
+        if self._names is None:
+            self._names = sorted(self.by_path)
+        return self._names
+
+    def get(self, filename):
+        return self.by_path.get(filename)
+
+    def get_base(self, base_uuid):
+        return self.by_base.get(base_uuid)
+
+    def add(self, entry):
+        """항목 추가. 이미 있는 항목의 uuid 를 바꿨을 때도 다시 add 해야 Merkle tree 에 반영된다"""
+        if entry["filename"] not in self.by_path:
+            self._names = None
+        self.by_path[entry["filename"]] = entry
+        self.by_base[entry["base_uuid"]] = entry
+        self.changed.add(entry["base_uuid"])
+        if self._buckets is not None:
+            base = entry["base_uuid"]
+            buckets = self._buckets.setdefault(entry["project"], {})
+            buckets.setdefault(leaf_key(base)[:DEPTH], {})[base] = entry["uuid"]
+
+    def under(self, prefix):
+        """filename 이 prefix 로 시작하는 항목 (정렬된 이름에서 이분 탐색)"""
+        names = self.names()
+        for i in range(bisect.bisect_left(names, prefix), len(names)):
+            if not names[i].startswith(prefix):
+                break
+            yield self.by_path[names[i]]
+
+    # ---------- Merkle tree ----------
+
+    def _load_merkle(self):
+        """tracked.merkle 이 지금의 tracked.json 과 맞으면 {project: nodes}, 아니면 None"""
+        if self._merkle is None:
+            try:
+                with open(merkle_path(self.root_dir), "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if data["tracked"] == _file_id(os.stat(tracked_path(self.root_dir))) \
+                        and data["depth"] == DEPTH:
+                    self._merkle = data["projects"]
+            except (OSError, ValueError, KeyError):
+                return None
+        return self._merkle
+
+    def _project_buckets(self, project):
+        if self._buckets is None:
+            by_project = {}
+            for entry in self.by_path.values():
+                by_project.setdefault(entry["project"], []).append((entry["base_uuid"], entry["uuid"]))
+            self._buckets = {p: group_leaves(leaves) for p, leaves in by_project.items()}
+        return self._buckets.get(project, {})
+
+    def merkle(self, project):
+        """project 의 MerkleTree (잎 = base_uuid → tracked uuid)"""
+        buckets = self._project_buckets(project)
+        projects = self._load_merkle()
+        if projects is None:
+            projects = self._merkle = {}
+        if project not in projects:
+            projects[project] = {}
+            MerkleTree(projects[project], buckets.get).build(buckets)
+        return MerkleTree(projects[project], lambda prefix: buckets.get(prefix, {}))
+
+    def _save_merkle(self, projects):
+        if projects is None:
+            # 처음이거나 맞지 않으면 전체를 다시 만든다
+            self._merkle = {}
+            for project in {entry["project"] for entry in self.by_path.values()}:
+                self.merkle(project)
+        else:
+            self._merkle = projects
+            by_project = {}
+            for base in self.changed:
+                entry = self.by_base.get(base)
+                if entry is not None:
+                    by_project.setdefault(entry["project"], set()).add(base)
+            for project, bases in by_project.items():
+                if project in projects:
+                    self.merkle(project).update(bases)
+                else:
+                    self.merkle(project)
+        self.changed = set()
+        tmp = merkle_path(self.root_dir) + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"tracked": _file_id(os.stat(tracked_path(self.root_dir))), "depth": DEPTH,
+                       "projects": self._merkle}, f)
+        os.replace(tmp, merkle_path(self.root_dir))
+
+    def save(self):
+        """정렬된 한 줄 한 항목 형식으로 tracked.json 과 tracked.idx 를 다시 쓴다"""
+        merkle = self._load_merkle() if os.path.exists(tracked_path(self.root_dir)) else None
+        path = tracked_path(self.root_dir)
+        keys = []
+        tmp = path + ".tmp"
+        with TIMINGS.phase("index-save"):
+            with open(tmp, "wb") as f:
+                f.write(json.dumps({"host_node": self.host_node})[:-1].encode("utf-8"))
+                f.write(b', "files": [\n')
+                names = self.names()
+                for i, name in enumerate(names):
+                    if i % STRIDE == 0:
+                        keys.append([name, f.tell()])
+                    f.write(json.dumps(self.by_path[name], ensure_ascii=False).encode("utf-8"))
+                    f.write(b",\n" if i + 1 < len(names) else b"\n")
+                f.write(b"]}\n")
+                TIMINGS.add("index-save", calls=0, bytes_written=f.tell())
+            os.replace(tmp, path)
+
+            idx_tmp = index_path(self.root_dir) + ".tmp"
+            with open(idx_tmp, "w", encoding="utf-8") as f:
+                json.dump({"file": _file_id(os.stat(path)), "stride": STRIDE, "keys": keys}, f)
+            os.replace(idx_tmp, index_path(self.root_dir))
+        with TIMINGS.phase("merkle"):
+            self._save_merkle(merkle)
+
+
+# ---------- 부분 로드 ----------
+
+def _load_idx(root_dir):
+    """tracked.json 과 맞는 idx 면 (이름 목록, 위치 목록), 아니면 None"""
+    try:
+        with open(index_path(root_dir), "r", encoding="utf-8") as f:
+            idx = json.load(f)
+        if idx["file"] != _file_id(os.stat(tracked_path(root_dir))):
+            return None
+    except (OSError, ValueError, KeyError):
+        return None
+    return [k[0] for k in idx["keys"]], [k[1] for k in idx["keys"]]
+
+
+def _iter_from(root_dir, offset):
+    """tracked.json 의 offset 위치부터 항목을 한 줄씩 읽는다"""
+    with open(tracked_path(root_dir), "rb") as f:
+        f.seek(offset)
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith(b"]"):
+                return
+            yield json.loads(line.rstrip(b","))
+
+
+def lookup_path(root_dir, filename):
+    """filename 의 항목 하나. idx 가 있으면 STRIDE 줄 안쪽만 읽는다"""
+    idx = _load_idx(root_dir)
+    if idx is None:
+        index = TrackedIndex.load(root_dir)
+        return index.get(filename) if index else None
+    names, offsets = idx
+    i = bisect.bisect_right(names, filename) - 1
+    if i < 0:
+        return None
+    for entry in _iter_from(root_dir, offsets[i]):
+        if entry["filename"] == filename:
+            return entry
+        if entry["filename"] > filename:
+            break
+    return None
+
+
+def iter_prefix(root_dir, prefix):
+    """filename 이 prefix 로 시작하는 항목들. idx 가 있으면 해당 구간만 읽는다"""
+    idx = _load_idx(root_dir)
+    if idx is None:
+        index = TrackedIndex.load(root_dir)
+        if index:
+            yield from index.under(prefix)
+        return
+    names, offsets = idx
+    if not names:
+        return
+    i = max(0, bisect.bisect_left(names, prefix) - 1)
+    for entry in _iter_from(root_dir, offsets[i]):
+        if entry["filename"].startswith(prefix):
+            yield entry
+        elif entry["filename"] > prefix:
+            break
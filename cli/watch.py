@@ -0,0 +1,266 @@
+# cli/watch.py
+# cedge add --watch: 파일 시스템 변경을 지켜보다가 바뀐 파일만 add 한다
+#
+# - Linux 에서는 inotify 로 프로젝트 폴더들을 감시한다 (폴더마다 watch 하나, 파일 수와 무관).
+#   inotify 를 쓸 수 없으면(다른 OS, watch 수 한도 초과 등) 주기적으로 stat 만 비교하는 polling 으로 대신한다.
+# - 같은 파일의 이벤트는 하나로 합치고, 마지막 이벤트 후 debounce 초 동안 조용한 파일만 처리한다
+#   (아직 쓰는 중인 shard 를 중간에 버전으로 남기지 않도록). 계속 쓰이는 파일도 MAX_DELAY 가 지나면 처리한다.
+# - 모인 경로는 최대 MAX_BATCH 개씩 add_files 와 같은 버전 기록 로직(apply_changes)에 넘긴다.
+#   tracked.json 은 메모리에 올려 둔 채로 배치마다 저장한다.
+# - 시작할 때 한 번 전체 add 를 해서 감시 전의 변경도 놓치지 않는다.
+# - 삭제는 add 와 마찬가지로 기록하지 않는다 (cedge status 에서 확인).
+import os
+import sys
+import time
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+
+from commands import apply_changes, iter_project_files, scan_files, HOST_NODE
+from tracked import TrackedIndex
+from log import open_journal
+
+DEBOUNCE = 2.0          # 마지막 이벤트 후 이 시간(초) 동안 변화가 없으면 처리
+MAX_DELAY = 30.0        # 계속 바뀌는 파일도 처음 이벤트 후 이 시간이 지나면 처리
+MAX_BATCH = 1000        # 한 번에 add 하는 최대 파일 수
+POLL_INTERVAL = 5.0     # polling 모드의 stat 비교 주기
+
+# <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE_SELF
+_EVENT = struct.Struct("iIII")
+
+
+def _project_dirs(root_dir):
+    for project in sorted(os.listdir(root_dir)):
+        path = os.path.join(root_dir, project)
+        if os.path.isdir(path) and not project.startswith("."):
+            yield path
+
+
+class InotifyWatcher:
+    """inotify 로 폴더 트리를 감시한다. poll() 은 바뀐 파일 경로 목록 (넘침이 생기면 None)"""
+
+    def __init__(self, root_dir):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError(errno.ENOSYS, "inotify 를 지원하지 않습니다")
+        self.libc = libc
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 실패")
+        self.dirs = {}  # wd → 폴더 경로
+        try:
+            for project_path in _project_dirs(root_dir):
+                self.add_tree(project_path)
+        except OSError:
+            self.close()
+            raise
+
+    def _add_watch(self, path):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            if err == errno.ENOSPC:
+                raise OSError(err, "inotify watch 한도를 넘었습니다 (fs.inotify.max_user_watches)")
+            return  # 그 사이 사라진 폴더 등
+        self.dirs[wd] = path
+
+    def add_tree(self, top):
+        """top 과 하위 폴더를 감시에 추가하고, 이미 들어 있는 파일 경로를 돌려준다"""
+        files = []
+        stack = [top]
+        while stack:
+            current = stack.pop()
+            self._add_watch(current)
+            try:
+                with os.scandir(current) as it:
+                    for dir_entry in it:
+                        if dir_entry.is_dir(follow_symlinks=False):
+                            stack.append(dir_entry.path)
+                        elif dir_entry.is_file():
+                            files.append(dir_entry.path)
+            except OSError:
+                continue
+        return files
+
+    def poll(self, timeout):
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        changed = []
+        while True:
+            try:
+                data = os.read(self.fd, 1 << 16)
+            except BlockingIOError:
+                return changed
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT.unpack_from(data, offset)
+                name = data[offset + _EVENT.size: offset + _EVENT.size + length].rstrip(b"\0")
+                offset += _EVENT.size + length
+                if mask & IN_Q_OVERFLOW:
+                    return None
+                if mask & IN_IGNORED:
+                    self.dirs.pop(wd, None)
+                    continue
+                parent = self.dirs.get(wd)
+                if parent is None or not name:
+                    continue
+                path = os.path.join(parent, os.fsdecode(name))
+                if mask & IN_ISDIR:
+                    if mask & (IN_CREATE | IN_MOVED_TO):
+                        # 새 폴더: 감시를 추가하고, 감시 전에 생긴 파일도 처리 대상에 넣는다
+                        changed.extend(self.add_tree(path))
+                else:
+                    changed.append(path)
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollWatcher:
+    """inotify 를 쓸 수 없을 때: interval 마다 (size, mtime_ns) 를 비교한다 (파일은 열지 않음)"""
+
+    def __init__(self, root_dir, interval=POLL_INTERVAL):
+        self.root_dir = root_dir
+        self.interval = interval
+        self.snapshot = self._snapshot()
+        self.next_scan = time.monotonic() + interval
+
+    def _snapshot(self):
+        snap = {}
+        for project_path in _project_dirs(self.root_dir):
+            for full_path, st in scan_files(project_path):
+                snap[full_path] = (st.st_size, st.st_mtime_ns)
+        return snap
+
+    def poll(self, timeout):
+        wait = self.next_scan - time.monotonic()
+        if wait > timeout:
+            time.sleep(timeout)
+            return []
+        time.sleep(max(0.0, wait))
+        self.next_scan = time.monotonic() + self.interval
+        current = self._snapshot()
+        changed = [path for path, sig in current.items() if self.snapshot.get(path) != sig]
+        self.snapshot = current
+        return changed
+
+    def close(self):
+        pass
+
+
+def open_watcher(root_dir, poll=False, interval=POLL_INTERVAL):
+    if not poll and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(root_dir)
+        except OSError as e:
+            print(f"⚠️  inotify 를 사용할 수 없어 polling 으로 감시합니다: {e}")
+    return PollWatcher(root_dir, interval)
+
+
+def iter_paths(root_dir, paths):
+    """바뀐 경로들을 apply_changes 가 받는 (project, full_path, stat) 로 (사라진 파일은 건너뜀)"""
+    for full_path in paths:
+        rel_path = os.path.relpath(full_path, root_dir)
+        project = rel_path.split(os.sep, 1)[0]
+        if project.startswith(".") or os.sep not in rel_path:
+            continue
+        try:
+            st = os.stat(full_path)
+        except OSError:
+            continue
+        if os.path.isfile(full_path):
+            yield project, full_path, st
+
+
+class DirtySet:
+    """바뀐 경로를 모아 두고, 조용해진(debounce) 경로를 MAX_BATCH 개씩 꺼낸다"""
+
+    def __init__(self, debounce=DEBOUNCE, max_delay=MAX_DELAY, max_batch=MAX_BATCH):
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.max_batch = max_batch
+        self.paths = {}  # 경로 → [처음 이벤트 시각, 마지막 이벤트 시각]
+
+    def __len__(self):
+        return len(self.paths)
+
+    def mark(self, paths, now):
+        for path in paths:
+            times = self.paths.get(path)
+            if times is None:
+                self.paths[path] = [now, now]
+            else:
+                times[1] = now
+
+    def ready(self, now, force=False):
+        batch = []
+        for path, (first, last) in self.paths.items():
+            if force or now - last >= self.debounce or now - first >= self.max_delay:
+                batch.append(path)
+                if len(batch) >= self.max_batch:
+                    break
+        for path in batch:
+            del self.paths[path]
+        return sorted(batch)
+
+
+def _apply(index, root_dir, files, jobs, diff_engine):
+    changes_made, index_dirty = apply_changes(index, root_dir, files, jobs, diff_engine)
+    if changes_made or index_dirty:
+        index.save()
+    open_journal(root_dir).flush()  # 오래 떠 있는 프로세스이므로 배치마다 기록
+    return changes_made
+
+
+def watch_files(root_dir=".", jobs=1, diff_engine="auto", debounce=DEBOUNCE, poll=False,
+                interval=POLL_INTERVAL):
+    index = TrackedIndex.load(root_dir)
+    if index is None:
+        print("❌ tracked.json이 존재하지 않습니다. 먼저 `cedge register .`를 실행하세요.")
+        return
+    index.host_node = index.host_node or HOST_NODE
+
+    # 감시를 먼저 시작해야 초기 add 도중에 바뀐 파일도 놓치지 않는다
+    watcher = open_watcher(root_dir, poll, interval)
+    mode = "inotify" if isinstance(watcher, InotifyWatcher) else f"polling {interval:g}s"
+    _apply(index, root_dir, iter_project_files(root_dir), jobs, diff_engine)
+    print(f"👀 변경 감시 중 ({mode}, debounce {debounce:g}s) — Ctrl+C 로 종료")
+
+    dirty = DirtySet(debounce)
+    try:
+        while True:
+            changed = watcher.poll(min(debounce, 1.0) if len(dirty) else 1.0)
+            now = time.monotonic()
+            if changed is None:
+                # 이벤트가 넘쳐 일부를 잃었으면 전체를 한 번 다시 본다 (stat 이 같은 파일은 열지 않음)
+                print("⚠️  inotify 이벤트가 넘쳐 전체를 다시 확인합니다.")
+                _apply(index, root_dir, iter_project_files(root_dir), jobs, diff_engine)
+                continue
+            dirty.mark(changed, now)
+            batch = dirty.ready(now)
+            while batch:
+                if _apply(index, root_dir, iter_paths(root_dir, batch), jobs, diff_engine):
+                    print(f"✅ {len(batch)}개 경로 확인, tracked.json 반영 ({time.strftime('%H:%M:%S')})")
+                batch = dirty.ready(now) if len(batch) >= dirty.max_batch else []
+    except KeyboardInterrupt:
+        while len(dirty):
+            batch = dirty.ready(time.monotonic(), force=True)
+            _apply(index, root_dir, iter_paths(root_dir, batch), jobs, diff_engine)
+        print("\n👋 감시를 종료합니다.")
+    finally:
+        watcher.close()
@@ -0,0 +1,120 @@
+# common/chunking.py
+# client(.cedge/pack)와 harbor 가 함께 쓰는 content-defined chunking
+#
+# 같은 내용은 어디서 chunk 로 나누든 같은 경계와 같은 sha256 키를 가지므로,
+# 파일 간 / 프로젝트 간 / client ↔ harbor 간에 중복 chunk 를 한 번만 저장하고 전송할 수 있다.
+#
+# - 텍스트 영역: 줄 끝에서 경계를 찾는다 (줄 내용의 crc32, 줄 길이에 비례한 확률)
+# - 바이너리 영역: FastCDC 방식 gear rolling hash + normalized chunking
+import io
+import hashlib
+import random
+import zlib
+
+READ_SIZE = 1 << 20
+
+MIN_CHUNK = 64 << 10
+AVG_CHUNK = 256 << 10
+MAX_CHUNK = 1 << 20
+
+_GEAR_MASK = (1 << 64) - 1
+# normalized chunking: 평균 지점 전에는 더 엄격한 mask(비트 2개 추가), 이후에는 느슨한 mask
+_AVG_BITS = AVG_CHUNK.bit_length() - 1
+_MASK_S = ((1 << (_AVG_BITS + 2)) - 1) << (64 - _AVG_BITS - 2)
+_MASK_L = ((1 << (_AVG_BITS - 2)) - 1) << (64 - _AVG_BITS + 2)
+_rng = random.Random(0x6365646765)     # 모든 환경에서 같은 gear 테이블을 쓰도록 고정 seed
+GEAR = [_rng.getrandbits(64) for _ in range(256)]
+
+
+def chunk_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def _line_cut(data, start, end):
+    """
+    텍스트 데이터: 줄 끝에서 경계를 찾는다. 줄 내용의 crc32 로 판단하므로
+    앞쪽에 내용이 추가/삭제되어도 같은 줄에서 경계가 잡힌다.
+    줄 길이에 비례한 확률을 써서 평균 chunk 크기가 AVG_CHUNK 가 되도록 한다.
+    """
+    i = data.find(b"\n", start)
+    if i == -1 or i >= end:
+        return None
+    line_start = data.rfind(b"\n", 0, i) + 1
+    while i != -1 and i < end:
+        line_len = i - line_start + 1
+        if zlib.crc32(data[line_start:i]) % AVG_CHUNK < line_len:
+            return i + 1
+        line_start = i + 1
+        i = data.find(b"\n", line_start)
+    return end
+
+
+def _gear_cut(data, start, end):
+    """바이너리 데이터: FastCDC (gear hash + normalized chunking)"""
+    h = 0
+    gear = GEAR
+    normal = min(end, start - MIN_CHUNK + AVG_CHUNK)
+    # gear hash 는 마지막 64바이트만 영향을 주므로 MIN_CHUNK 직전부터 계산하면 된다
+    for i in range(max(0, start - 64), end):
+        h = ((h << 1) + gear[data[i]]) & _GEAR_MASK
+        if i < start:
+            continue
+        if not h & (_MASK_S if i < normal else _MASK_L):
+            return i + 1
+    return end
+
+
+def find_cut(data, eof=False):
+    n = len(data)
+    if n <= MIN_CHUNK:
+        return n if eof else None
+    end = min(n, MAX_CHUNK)
+    cut = _line_cut(data, MIN_CHUNK, end)
+    if cut is None:
+        cut = _gear_cut(data, MIN_CHUNK, end)
+    if cut == end and end == n and not eof and n < MAX_CHUNK:
+        return None  # 더 읽어봐야 경계를 알 수 있음
+    return cut
+
+
+def iter_chunks(fh):
+    """파일 객체를 content-defined chunk(bytes)로 나눈다. 메모리 사용은 MAX_CHUNK 수준"""
+    buf = b""
+    eof = False
+    while True:
+        while not eof and len(buf) < MAX_CHUNK:
+            block = fh.read(READ_SIZE)
+            if not block:
+                eof = True
+                break
+            buf += block
+        if not buf:
+            return
+        cut = find_cut(buf, eof)
+        if cut is None:
+            continue
+        yield buf[:cut]
+        buf = buf[cut:]
+
+
+def iter_bytes_chunks(data):
+    return iter_chunks(io.BytesIO(data))
+
+
+def chunk_file(path, put=None):
+    """
+    파일을 chunk 로 나눈 manifest 를 만든다.
+    put(chunk_hash, data) 가 주어지면 chunk 마다 호출한다 (저장소에 기록할 때 사용).
+    """
+    total = hashlib.sha256()
+    chunks = []
+    size = 0
+    with open(path, "rb") as f:
+        for chunk in iter_chunks(f):
+            total.update(chunk)
+            h = chunk_hash(chunk)
+            if put is not None:
+                put(h, chunk)
+            chunks.append([h, len(chunk)])
+            size += len(chunk)
+    return {"size": size, "hash": total.hexdigest(), "chunks": chunks}
@@ -0,0 +1,72 @@
+# common/chunkstore.py
+# harbor 용 content-addressed chunk 저장소
+#
+# chunk 는 sha256 키로 <root>/<앞 2글자>/<나머지> 에 zlib 압축해서 저장한다.
+# 키가 같으면 같은 내용이므로, 여러 파일/프로젝트에서 겹치는 chunk 는 한 번만 저장된다.
+#
+# compress=False 인 저장소(harbor)는 <나머지>.raw 에 원본 그대로 저장한다.
+# 파일 내용이 곧 chunk 이므로 harbor 데몬이 sendfile 로 복사 없이 보낼 수 있다.
+# 두 형식은 섞여 있어도 읽을 수 있다 (예전 harbor 의 압축 객체).
+import os
+import zlib
+import threading
+
+from common.chunking import chunk_file
+
+RAW_SUFFIX = ".raw"
+
+
+class ChunkStore:
+    def __init__(self, root, compress=True):
+        self.root = root
+        self.compress = compress
+
+    def path(self, h):
+        return os.path.join(self.root, h[:2], h[2:])
+
+    def raw_path(self, h):
+        return self.path(h) + RAW_SUFFIX
+
+    def has(self, h):
+        first, second = (self.path, self.raw_path) if self.compress else (self.raw_path, self.path)
+        return os.path.exists(first(h)) or os.path.exists(second(h))
+
+    def missing(self, hashes):
+        """저장소에 없는 chunk 키 목록 (전송 전에 중복을 거르는 데 사용)"""
+        return [h for h in dict.fromkeys(hashes) if not self.has(h)]
+
+    def put(self, h, data):
+        """새로 기록했으면 True, 이미 있으면 False"""
+        if self.has(h):
+            return False
+        path = self.path(h) if self.compress else self.raw_path(h)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # 같은 chunk 를 여러 스레드가 동시에 쓸 수 있으므로 임시 파일 이름에 스레드도 넣는다
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(zlib.compress(data, 6) if self.compress else data)
+        os.replace(tmp, path)
+        return True
+
+    def get(self, h):
+        try:
+            with open(self.raw_path(h), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            with open(self.path(h), "rb") as f:
+                return zlib.decompress(f.read())
+
+    def store_file(self, path):
+        """파일을 chunk 로 나눠 저장하고 (manifest, 새로 기록된 바이트 수) 반환"""
+        written = [0]
+
+        def put(h, data):
+            if self.put(h, data):
+                written[0] += len(data)
+
+        manifest = chunk_file(path, put)
+        return manifest, written[0]
+
+    def write_file(self, manifest, fh):
+        for h, _ in manifest["chunks"]:
+            fh.write(self.get(h))
@@ -0,0 +1,533 @@
+# common/db.py
+# host 메타데이터 저장소 (SQLite + WAL)
+#
+# 기존 host_db.json 은 요청마다 전체를 읽고 다시 쓰기 때문에 UUID 수에 비례해
+# 느려지고, 동시에 쓰는 요청끼리 서로의 변경을 덮어썼다.
+# 여기서는 project / uuid / harbor 별 인덱스를 둔 SQLite 테이블을 사용하고,
+# 모든 쓰기는 BEGIN IMMEDIATE 트랜잭션 안에서 수행한다.
+#
+# 프로젝트마다 revision 카운터를 두고, 파일 레코드(uuid 와 그 replica 위치)가 바뀔 때마다
+# 1 올린 값을 그 레코드의 rev 로 남긴다. 쓰기는 직렬화되므로 revision R 을 읽었다면
+# rev <= R 인 변경은 모두 보인다 (since=<revision> 증분 조회의 근거).
+#
+# 프로젝트마다 Merkle tree(common.merkle)도 함께 유지한다. harbor_name 이 "" 인 트리는
+# 프로젝트 전체(파일마다 최신 버전 UUID), harbor 이름인 트리는 host 가 그 harbor 에 있다고
+# 알고 있는 파일들이다. UUID / replica 가 추가될 때 바뀐 잎의 버킷과 조상만 다시 계산한다.
+import os
+import json
+import time
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from common.merkle import MerkleTree, leaf_key, group_leaves
+from common.placement import placement_key
+from common.timings import METRICS
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    name TEXT PRIMARY KEY,
+    uuid TEXT NOT NULL,
+    revision INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS uuids (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    uuid TEXT NOT NULL UNIQUE,
+    project TEXT NOT NULL,
+    harbor_name TEXT NOT NULL,
+    version INTEGER NOT NULL DEFAULT 1,
+    rev INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS idx_uuids_project ON uuids(project, seq);
+CREATE INDEX IF NOT EXISTS idx_uuids_harbor ON uuids(harbor_name);
+CREATE TABLE IF NOT EXISTS harbors (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL UNIQUE,
+    url TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS harbor_projects (
+    harbor_name TEXT NOT NULL,
+    project TEXT NOT NULL,
+    PRIMARY KEY (harbor_name, project)
+);
+CREATE INDEX IF NOT EXISTS idx_harbor_projects_project ON harbor_projects(project);
+CREATE TABLE IF NOT EXISTS replicas (
+    uuid TEXT NOT NULL,
+    harbor_name TEXT NOT NULL,
+    PRIMARY KEY (uuid, harbor_name)
+);
+CREATE INDEX IF NOT EXISTS idx_replicas_harbor ON replicas(harbor_name);
+CREATE TABLE IF NOT EXISTS merkle_leaves (
+    project TEXT NOT NULL,
+    harbor_name TEXT NOT NULL,
+    base TEXT NOT NULL,
+    mkey TEXT NOT NULL,
+    uuid TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    PRIMARY KEY (project, harbor_name, base)
+);
+CREATE INDEX IF NOT EXISTS idx_merkle_leaves_key ON merkle_leaves(project, harbor_name, mkey);
+CREATE TABLE IF NOT EXISTS merkle_nodes (
+    project TEXT NOT NULL,
+    harbor_name TEXT NOT NULL,
+    prefix TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    PRIMARY KEY (project, harbor_name, prefix)
+);
+CREATE TABLE IF NOT EXISTS harbor_health (
+    name TEXT PRIMARY KEY,
+    updated_at REAL NOT NULL,
+    load REAL NOT NULL DEFAULT 0,
+    active INTEGER NOT NULL DEFAULT 0,
+    capacity INTEGER NOT NULL DEFAULT 0,
+    free_bytes INTEGER NOT NULL DEFAULT 0,
+    egress_bps REAL NOT NULL DEFAULT 0,
+    peak_egress_bps REAL NOT NULL DEFAULT 0
+);
+"""
+
+
+class _MerkleNodes:
+    """merkle_nodes 테이블의 한 트리를 MerkleTree 가 쓰는 dict 처럼 보여 준다"""
+
+    def __init__(self, conn, project, harbor_name):
+        self.conn = conn
+        self.key = (project, harbor_name)
+
+    def get(self, prefix, default=None):
+        row = self.conn.execute(
+            "SELECT hash FROM merkle_nodes WHERE project = ? AND harbor_name = ? AND prefix = ?",
+            (*self.key, prefix)).fetchone()
+        return row["hash"] if row else default
+
+    def __setitem__(self, prefix, value):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO merkle_nodes (project, harbor_name, prefix, hash) "
+            "VALUES (?, ?, ?, ?)", (*self.key, prefix, value))
+
+    def pop(self, prefix, default=None):
+        self.conn.execute(
+            "DELETE FROM merkle_nodes WHERE project = ? AND harbor_name = ? AND prefix = ?",
+            (*self.key, prefix))
+        return default
+
+
+class HostDB:
+    """host_db 를 대신하는 SQLite 저장소. 스레드마다 별도 커넥션을 사용한다."""
+
+    def __init__(self, path, legacy_json=None):
+        self.path = path
+        self._local = threading.local()
+        self._conn().executescript(SCHEMA)
+        self._migrate_revisions()
+        if legacy_json and os.path.exists(legacy_json) and self.is_empty():
+            self.import_json(legacy_json)
+        self._backfill_replicas()
+        self._backfill_merkle()
+
+    def _migrate_revisions(self):
+        """revision 컬럼이 생기기 전의 DB: 기존 레코드는 모두 revision 1 로 본다"""
+        conn = self._conn()
+        with self.transaction():
+            if "revision" not in [r["name"] for r in conn.execute("PRAGMA table_info(projects)")]:
+                conn.execute("ALTER TABLE projects ADD COLUMN revision INTEGER NOT NULL DEFAULT 0")
+            if "rev" not in [r["name"] for r in conn.execute("PRAGMA table_info(uuids)")]:
+                conn.execute("ALTER TABLE uuids ADD COLUMN rev INTEGER NOT NULL DEFAULT 1")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_uuids_project_rev ON uuids(project, rev, seq)")
+            conn.execute("UPDATE projects SET revision = 1 WHERE revision = 0 "
+                         "AND name IN (SELECT project FROM uuids)")
+
+    def _backfill_replicas(self):
+        """replicas 테이블이 생기기 전의 DB: 등록한 harbor 를 첫 번째 replica 로 채운다"""
+        conn = self._conn()
+        if conn.execute("SELECT 1 FROM replicas LIMIT 1").fetchone() is not None:
+            return
+        with self.transaction() as conn:
+            conn.execute("INSERT OR IGNORE INTO replicas (uuid, harbor_name) "
+                         "SELECT uuid, harbor_name FROM uuids")
+
+    def _backfill_merkle(self):
+        """Merkle tree 가 생기기 전의 DB: 기존 UUID / replica 로 트리를 한 번 만든다"""
+        conn = self._conn()
+        if conn.execute("SELECT 1 FROM merkle_leaves LIMIT 1").fetchone() is not None \
+                or conn.execute("SELECT 1 FROM uuids LIMIT 1").fetchone() is None:
+            return
+        latest = {}  # (project, harbor_name) → {base: (version, uuid)}
+        rows = conn.execute(
+            "SELECT u.project, u.uuid, u.version, '' AS harbor_name FROM uuids u "
+            "UNION ALL SELECT u.project, u.uuid, u.version, r.harbor_name "
+            "FROM replicas r JOIN uuids u ON u.uuid = r.uuid")
+        for r in rows:
+            leaves = latest.setdefault((r["project"], r["harbor_name"]), {})
+            base = placement_key(r["uuid"])
+            if base not in leaves or leaves[base] < (r["version"], r["uuid"]):
+                leaves[base] = (r["version"], r["uuid"])
+        with self.transaction() as conn:
+            for (project, harbor_name), leaves in latest.items():
+                conn.executemany(
+                    "INSERT INTO merkle_leaves (project, harbor_name, base, mkey, uuid, version) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    [(project, harbor_name, base, leaf_key(base), uuid_, version)
+                     for base, (version, uuid_) in leaves.items()])
+                tree = self._merkle(conn, project, harbor_name)
+                tree.build(group_leaves((base, uuid_) for base, (_, uuid_) in leaves.items()))
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None,
+                                   check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        """쓰기 트랜잭션. 여러 worker 프로세스가 동시에 써도 변경이 유실되지 않는다."""
+        conn = self._conn()
+        if conn.in_transaction:
+            yield conn
+            return
+        # 잠금 대기(BEGIN IMMEDIATE), 트랜잭션 전체, COMMIT 시간을 /metrics 에 남긴다
+        start = time.perf_counter()
+        conn.execute("BEGIN IMMEDIATE")
+        locked = time.perf_counter()
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        committing = time.perf_counter()
+        conn.execute("COMMIT")
+        end = time.perf_counter()
+        METRICS.observe("cedge_db_lock_wait_seconds", locked - start)
+        METRICS.observe("cedge_db_commit_seconds", end - committing)
+        METRICS.observe("cedge_db_transaction_seconds", end - start)
+
+    # ---------- projects ----------
+
+    def project_exists(self, name):
+        row = self._conn().execute(
+            "SELECT 1 FROM projects WHERE name = ?", (name,)).fetchone()
+        return row is not None
+
+    def create_project(self, name, project_uuid):
+        with self.transaction() as conn:
+            conn.execute("INSERT INTO projects (name, uuid) VALUES (?, ?)",
+                         (name, project_uuid))
+
+    def list_projects(self):
+        return [r["name"] for r in self._conn().execute("SELECT name FROM projects ORDER BY name")]
+
+    def get_project(self, name):
+        conn = self._conn()
+        row = conn.execute("SELECT uuid, revision FROM projects WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            return None
+        files = [r["uuid"] for r in conn.execute(
+            "SELECT uuid FROM uuids WHERE project = ? ORDER BY seq", (name,))]
+        return {"uuid": row["uuid"], "revision": row["revision"], "files": files}
+
+    def project_revision(self, name):
+        """(project uuid, 현재 revision). 프로젝트가 없으면 None"""
+        row = self._conn().execute(
+            "SELECT uuid, revision FROM projects WHERE name = ?", (name,)).fetchone()
+        return (row["uuid"], row["revision"]) if row else None
+
+    def _bump_revision(self, conn, project):
+        """트랜잭션 안에서 프로젝트 revision 을 1 올리고 새 값을 반환"""
+        conn.execute("UPDATE projects SET revision = revision + 1 WHERE name = ?", (project,))
+        row = conn.execute("SELECT revision FROM projects WHERE name = ?", (project,)).fetchone()
+        return row["revision"] if row else 1
+
+    def _touch_uuids(self, conn, uuid_list):
+        """uuid 들의 프로젝트 revision 을 올리고 레코드 rev 를 새 값으로 바꾼다"""
+        by_project = {}
+        for i in range(0, len(uuid_list), 500):
+            chunk = uuid_list[i:i + 500]
+            marks = ",".join("?" * len(chunk))
+            for r in conn.execute(f"SELECT uuid, project FROM uuids WHERE uuid IN ({marks})", chunk):
+                by_project.setdefault(r["project"], []).append(r["uuid"])
+        for project, uuids in by_project.items():
+            rev = self._bump_revision(conn, project)
+            conn.executemany("UPDATE uuids SET rev = ? WHERE uuid = ?", [(rev, u) for u in uuids])
+
+    def manifest_page(self, project, since=0, after=(0, 0), limit=1000):
+        """
+        rev > since 인 파일 레코드를 (rev, seq) 순으로 after 다음부터 limit 개.
+        [{"uuid", "version", "harbor_name", "replicas", "rev", "seq"}, ...]
+        페이지를 넘기는 동안 바뀐 레코드는 rev 가 커져 뒤쪽에 다시 나온다 (빠지는 레코드는 없다).
+        """
+        conn = self._conn()
+        rows = [dict(r) for r in conn.execute(
+            "SELECT seq, uuid, harbor_name, version, rev FROM uuids "
+            "WHERE project = ? AND rev > ? AND (rev > ? OR (rev = ? AND seq > ?)) "
+            "ORDER BY rev, seq LIMIT ?",
+            (project, since, after[0], after[0], after[1], limit))]
+        replicas = {}
+        uuid_list = [r["uuid"] for r in rows]
+        for i in range(0, len(uuid_list), 500):
+            chunk = uuid_list[i:i + 500]
+            marks = ",".join("?" * len(chunk))
+            for r in conn.execute(
+                    f"SELECT uuid, harbor_name FROM replicas WHERE uuid IN ({marks})", chunk):
+                replicas.setdefault(r["uuid"], []).append(r["harbor_name"])
+        for r in rows:
+            r["replicas"] = replicas.get(r["uuid"], [])
+        return rows
+
+    # ---------- merkle ----------
+
+    def _merkle(self, conn, project, harbor_name=""):
+        def bucket(prefix):
+            return {r["base"]: r["uuid"] for r in conn.execute(
+                "SELECT base, uuid FROM merkle_leaves WHERE project = ? AND harbor_name = ? "
+                "AND mkey >= ? AND mkey < ?", (project, harbor_name, prefix, prefix + "~"))}
+        return MerkleTree(_MerkleNodes(conn, project, harbor_name), bucket)
+
+    def _merkle_put(self, conn, rows):
+        """rows: (project, harbor_name, uuid, version). 잎을 더 높은 버전으로만 바꾸고 트리를 갱신"""
+        changed = {}
+        for project, harbor_name, uuid_, version in rows:
+            base = placement_key(uuid_)
+            cur = conn.execute(
+                "INSERT INTO merkle_leaves (project, harbor_name, base, mkey, uuid, version) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (project, harbor_name, base) DO UPDATE "
+                "SET uuid = excluded.uuid, version = excluded.version "
+                "WHERE excluded.version > merkle_leaves.version "
+                "OR (excluded.version = merkle_leaves.version AND excluded.uuid > merkle_leaves.uuid)",
+                (project, harbor_name, base, leaf_key(base), uuid_, version))
+            if cur.rowcount:
+                changed.setdefault((project, harbor_name), set()).add(base)
+        for (project, harbor_name), bases in changed.items():
+            self._merkle(conn, project, harbor_name).update(bases)
+
+    def merkle_tree(self, project, harbor_name=""):
+        """harbor_name 이 "" 이면 프로젝트 전체 트리, 아니면 host 가 그 harbor 에 있다고 아는 파일들"""
+        return self._merkle(self._conn(), project, harbor_name)
+
+    def merkle_nodes(self, project, prefixes, harbor_name=""):
+        """비교 상대에게 보낼 {prefix: node}"""
+        tree = self.merkle_tree(project, harbor_name)
+        return {prefix: tree.node(prefix) for prefix in prefixes}
+
+    # ---------- uuids ----------
+
+    def get_uuid(self, uuid_):
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT project, harbor_name, version FROM uuids WHERE uuid = ?",
+            (uuid_,)).fetchone()
+        if row is None:
+            return None
+        info = dict(row)
+        info["replicas"] = [r["harbor_name"] for r in conn.execute(
+            "SELECT harbor_name FROM replicas WHERE uuid = ?", (uuid_,))]
+        return info
+
+    def add_uuid(self, uuid_, project, harbor_name, version=1):
+        self.add_uuids([(uuid_, project, harbor_name, version)])
+
+    def get_uuids(self, uuid_list):
+        """여러 UUID 를 한 번에 조회한다. {uuid: info} 형태로 반환."""
+        conn = self._conn()
+        found = {}
+        for i in range(0, len(uuid_list), 500):
+            chunk = uuid_list[i:i + 500]
+            marks = ",".join("?" * len(chunk))
+            for row in conn.execute(
+                    f"SELECT uuid, project, harbor_name, version FROM uuids WHERE uuid IN ({marks})",
+                    chunk):
+                info = dict(row)
+                found[info.pop("uuid")] = info
+        return found
+
+    def add_uuids(self, rows):
+        """rows: (uuid, project, harbor_name, version) 목록을 하나의 트랜잭션으로 추가"""
+        with self.transaction() as conn:
+            revs = {project: self._bump_revision(conn, project)
+                    for project in sorted({row[1] for row in rows})}
+            conn.executemany(
+                "INSERT INTO uuids (uuid, project, harbor_name, version, rev) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(*row, revs[row[1]]) for row in rows])
+            # 등록한 harbor 가 첫 번째 replica
+            conn.executemany(
+                "INSERT OR IGNORE INTO replicas (uuid, harbor_name) VALUES (?, ?)",
+                [(row[0], row[2]) for row in rows])
+            self._merkle_put(conn, [(row[1], name, row[0], row[3])
+                                    for row in rows for name in ("", row[2])])
+
+    def project_uuids(self, project, latest_only=False):
+        """
+        프로젝트의 UUID 와 replica 위치. [(uuid, [harbor_name, ...]), ...] (등록 순)
+        latest_only 면 파일(placement_key)마다 가장 높은 버전 하나만 (같은 버전이면 나중에 등록된 것)
+        """
+        conn = self._conn()
+        replicas = {}
+        for r in conn.execute(
+                "SELECT r.uuid, r.harbor_name FROM replicas r JOIN uuids u ON u.uuid = r.uuid "
+                "WHERE u.project = ?", (project,)):
+            replicas.setdefault(r["uuid"], []).append(r["harbor_name"])
+        rows = conn.execute("SELECT uuid, version FROM uuids WHERE project = ? ORDER BY seq",
+                            (project,)).fetchall()
+        if latest_only:
+            latest = {}
+            for r in rows:
+                key = placement_key(r["uuid"])
+                if key not in latest or r["version"] >= latest[key]["version"]:
+                    latest[key] = r
+            keep = {r["uuid"] for r in latest.values()}
+            rows = [r for r in rows if r["uuid"] in keep]
+        return [(r["uuid"], replicas.get(r["uuid"], [])) for r in rows]
+
+    # ---------- replicas ----------
+
+    def add_replica(self, uuid_, harbor_name):
+        with self.transaction() as conn:
+            cur = conn.execute("INSERT OR IGNORE INTO replicas (uuid, harbor_name) VALUES (?, ?)",
+                               (uuid_, harbor_name))
+            if cur.rowcount:
+                self._touch_uuids(conn, [uuid_])
+                row = conn.execute("SELECT project, version FROM uuids WHERE uuid = ?",
+                                   (uuid_,)).fetchone()
+                if row is not None:
+                    self._merkle_put(conn, [(row["project"], harbor_name, uuid_, row["version"])])
+
+    def remove_replica(self, uuid_, harbor_name):
+        """harbor 에 실제로 없는 replica 기록을 지운다 (replicator 가 다시 복제한다)"""
+        with self.transaction() as conn:
+            cur = conn.execute("DELETE FROM replicas WHERE uuid = ? AND harbor_name = ?",
+                               (uuid_, harbor_name))
+            if not cur.rowcount:
+                return
+            self._touch_uuids(conn, [uuid_])
+            row = conn.execute("SELECT project FROM uuids WHERE uuid = ?", (uuid_,)).fetchone()
+            if row is None:
+                return
+            base = placement_key(uuid_)
+            conn.execute("DELETE FROM merkle_leaves WHERE project = ? AND harbor_name = ? "
+                         "AND base = ? AND uuid = ?", (row["project"], harbor_name, base, uuid_))
+            # 같은 파일의 다른 버전이 그 harbor 에 남아 있으면 그중 최신이 잎이 된다
+            rest = [(row["project"], harbor_name, r["uuid"], r["version"]) for r in conn.execute(
+                "SELECT u.uuid, u.version FROM uuids u JOIN replicas r ON r.uuid = u.uuid "
+                "WHERE r.harbor_name = ? AND u.uuid > ? AND u.uuid < ?",
+                (harbor_name, base + "-", base + "."))
+                if placement_key(r["uuid"]) == base]
+            self._merkle_put(conn, rest)
+            self._merkle(conn, row["project"], harbor_name).update([base])
+
+    def replica_count(self, harbor_name):
+        return self._conn().execute(
+            "SELECT COUNT(*) FROM replicas WHERE harbor_name = ?", (harbor_name,)).fetchone()[0]
+
+    # ---------- harbors ----------
+
+    def get_harbor(self, name):
+        conn = self._conn()
+        row = conn.execute("SELECT name, url FROM harbors WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            return None
+        projects = [r["project"] for r in conn.execute(
+            "SELECT project FROM harbor_projects WHERE harbor_name = ?", (name,))]
+        return {"name": row["name"], "url": row["url"], "manage_project": projects}
+
+    def list_harbors(self):
+        conn = self._conn()
+        names = [r["name"] for r in conn.execute("SELECT name FROM harbors ORDER BY seq")]
+        return [self.get_harbor(n) for n in names]
+
+    def harbors_for_project(self, project):
+        return [r["harbor_name"] for r in self._conn().execute(
+            "SELECT harbor_name FROM harbor_projects WHERE project = ?", (project,))]
+
+    def harbor_manages(self, harbor_name, project):
+        row = self._conn().execute(
+            "SELECT 1 FROM harbor_projects WHERE harbor_name = ? AND project = ?",
+            (harbor_name, project)).fetchone()
+        return row is not None
+
+    def add_harbor(self, name, url, manage_project):
+        with self.transaction() as conn:
+            conn.execute("INSERT INTO harbors (name, url) VALUES (?, ?)", (name, url))
+            conn.executemany(
+                "INSERT OR IGNORE INTO harbor_projects (harbor_name, project) VALUES (?, ?)",
+                [(name, p) for p in manage_project])
+
+    def remove_harbor(self, name):
+        """harbor 와 그 harbor 에 있던 replica 기록을 지운다. 남은 replica 는 replicator 가 다시 채운다"""
+        with self.transaction() as conn:
+            lost = [r["uuid"] for r in conn.execute(
+                "SELECT uuid FROM replicas WHERE harbor_name = ?", (name,))]
+            conn.execute("DELETE FROM harbors WHERE name = ?", (name,))
+            conn.execute("DELETE FROM harbor_projects WHERE harbor_name = ?", (name,))
+            conn.execute("DELETE FROM replicas WHERE harbor_name = ?", (name,))
+            self._touch_uuids(conn, lost)
+            conn.execute("DELETE FROM harbor_health WHERE name = ?", (name,))
+            conn.execute("DELETE FROM merkle_leaves WHERE harbor_name = ?", (name,))
+            conn.execute("DELETE FROM merkle_nodes WHERE harbor_name = ?", (name,))
+
+    # ---------- harbor health ----------
+
+    def update_health(self, name, now, load, active, capacity, free_bytes, egress_bps,
+                      peak_decay=0.99):
+        """heartbeat 기록. 최대 전송 속도(peak)는 천천히 줄어들며 harbor 의 처리 능력 추정에 쓰인다"""
+        with self.transaction() as conn:
+            row = conn.execute("SELECT peak_egress_bps FROM harbor_health WHERE name = ?",
+                               (name,)).fetchone()
+            peak = max(egress_bps, row["peak_egress_bps"] * peak_decay if row else 0)
+            conn.execute(
+                "INSERT OR REPLACE INTO harbor_health (name, updated_at, load, active, capacity, "
+                "free_bytes, egress_bps, peak_egress_bps) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (name, now, load, active, capacity, free_bytes, egress_bps, peak))
+
+    def harbor_health(self):
+        """{harbor_name: 마지막 heartbeat 정보}"""
+        result = {}
+        for row in self._conn().execute("SELECT * FROM harbor_health"):
+            info = dict(row)
+            result[info.pop("name")] = info
+        return result
+
+    # ---------- misc ----------
+
+    def stats(self):
+        conn = self._conn()
+        count = lambda table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        return {
+            "total_projects": count("projects"),
+            "total_uuids": count("uuids"),
+            "total_harbors": count("harbors"),
+            "total_replicas": count("replicas")
+        }
+
+    def is_empty(self):
+        s = self.stats()
+        return not any(s.values())
+
+    def import_json(self, path):
+        """기존 host_db.json 내용을 옮겨온다 (최초 1회)."""
+        with open(path, "r") as f:
+            data = json.load(f)
+        with self.transaction() as conn:
+            for name, proj in data.get("projects", {}).items():
+                conn.execute("INSERT OR IGNORE INTO projects (name, uuid) VALUES (?, ?)",
+                             (name, proj.get("uuid", "")))
+            for uuid_, info in data.get("uuids", {}).items():
+                conn.execute(
+                    "INSERT OR IGNORE INTO uuids (uuid, project, harbor_name, version) "
+                    "VALUES (?, ?, ?, ?)",
+                    (uuid_, info.get("project", ""), info.get("harbor_name", ""),
+                     info.get("version", 1)))
+            for harbor in data.get("harbors", []):
+                conn.execute("INSERT OR IGNORE INTO harbors (name, url) VALUES (?, ?)",
+                             (harbor["name"], harbor.get("url", "")))
+                conn.executemany(
+                    "INSERT OR IGNORE INTO harbor_projects (harbor_name, project) VALUES (?, ?)",
+                    [(harbor["name"], p) for p in harbor.get("manage_project", [])])
+            conn.execute("UPDATE projects SET revision = 1 WHERE revision = 0 "
+                         "AND name IN (SELECT project FROM uuids)")
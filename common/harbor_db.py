@@ -0,0 +1,240 @@
+# common/harbor_db.py
+# harbor 메타데이터 저장소 (SQLite + WAL)
+#
+# 기존 .cedge/harbor/harbor_db.json 은 파일마다 chunk 목록까지 담은 JSON 하나라서, push commit 이나
+# 복제로 파일 하나가 바뀔 때마다 전체를 다시 쓰고(flock 으로 직렬화), 다운로드 worker 들은 바뀔 때마다
+# 전체를 다시 읽었다. 파일이 많아지면 쓰기 한 번에 몇 초씩 걸리고 그동안 다운로드도 멈춘다.
+# 여기서는 경로 / uuid / Merkle 버킷별 인덱스를 둔 테이블을 쓰고, 바뀐 행만 BEGIN IMMEDIATE
+# 트랜잭션 안에서 쓴다. 처음 열 때 harbor_db.json 이 있으면 옮겨온다 (host 의 common/db.py 와 같은 방식).
+#
+#   settings      project, harbor_name
+#   files         프로젝트 기준 상대 경로마다 harbor 가 가진 최신 버전 (크기, 해시, chunk 목록)
+#   superseded    새 버전으로 대체된 uuid → 새 uuid (다운로드 요청에 410 으로 응답)
+#   merkle_nodes  잎이 파일마다 (base_uuid → 최신 uuid) 인 Merkle tree. 바뀐 잎의 버킷과 조상만 다시 계산한다
+import os
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from common.merkle import MerkleTree, leaf_key, group_leaves
+from common.placement import placement_key
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS settings (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    uuid TEXT NOT NULL,
+    base_uuid TEXT,
+    base TEXT NOT NULL,
+    mkey TEXT NOT NULL,
+    version INTEGER NOT NULL DEFAULT 1,
+    size INTEGER NOT NULL,
+    hash TEXT NOT NULL,
+    chunks TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_files_uuid ON files(uuid);
+CREATE INDEX IF NOT EXISTS idx_files_mkey ON files(mkey);
+CREATE TABLE IF NOT EXISTS superseded (
+    uuid TEXT PRIMARY KEY,
+    newer TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS merkle_nodes (
+    prefix TEXT PRIMARY KEY,
+    hash TEXT NOT NULL
+);
+"""
+
+
+def merkle_base(uuid_, base_uuid=None):
+    return base_uuid or placement_key(uuid_)
+
+
+class _MerkleNodes:
+    """merkle_nodes 테이블을 MerkleTree 가 쓰는 dict 처럼 보여 준다"""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def get(self, prefix, default=None):
+        row = self.conn.execute("SELECT hash FROM merkle_nodes WHERE prefix = ?", (prefix,)).fetchone()
+        return row["hash"] if row else default
+
+    def __setitem__(self, prefix, value):
+        self.conn.execute("INSERT OR REPLACE INTO merkle_nodes (prefix, hash) VALUES (?, ?)",
+                          (prefix, value))
+
+    def pop(self, prefix, default=None):
+        self.conn.execute("DELETE FROM merkle_nodes WHERE prefix = ?", (prefix,))
+        return default
+
+
+class HarborDB:
+    """harbor_db.json 을 대신하는 SQLite 저장소. 스레드마다 별도 커넥션을 사용한다."""
+
+    def __init__(self, path, legacy_json=None):
+        self.path = path
+        self.pid = os.getpid()
+        self._local = threading.local()
+        self._conn().executescript(SCHEMA)
+        if legacy_json and os.path.exists(legacy_json) and self.is_empty():
+            self.import_json(legacy_json)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None,
+                                   check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        """쓰기 트랜잭션. 여러 worker 프로세스가 동시에 써도 변경이 유실되지 않는다."""
+        conn = self._conn()
+        if conn.in_transaction:
+            yield conn
+            return
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def is_empty(self):
+        conn = self._conn()
+        return conn.execute("SELECT 1 FROM settings LIMIT 1").fetchone() is None \
+            and conn.execute("SELECT 1 FROM files LIMIT 1").fetchone() is None
+
+    def import_json(self, path):
+        """기존 harbor_db.json 을 옮겨온다"""
+        with open(path, "r") as f:
+            data = json.load(f)
+        # 예전 register-file 은 절대 경로를 키로 썼다. 항목의 path(프로젝트 기준)로 맞추고 높은 버전을 남긴다
+        files = {}
+        for key, entry in data.get("registered_files", {}).items():
+            key = (entry.get("path") or key) if os.path.isabs(key) else key
+            old = files.get(key)
+            if old is None or old.get("version", 1) <= entry.get("version", 1):
+                files[key] = dict(entry, path=key)
+        with self.transaction() as conn:
+            for key in ("project", "harbor_name"):
+                conn.execute("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
+                             (key, data.get(key, "")))
+            conn.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                             [self._row(e) for e in files.values()])
+            conn.executemany("INSERT OR REPLACE INTO superseded (uuid, newer) VALUES (?, ?)",
+                             list(data.get("superseded", {}).items()))
+            leaves = ((merkle_base(e["uuid"], e.get("base_uuid")), e["uuid"]) for e in files.values())
+            self._merkle(conn).build(group_leaves(leaves))
+
+    # ---------- settings ----------
+
+    def info(self):
+        """{"project", "harbor_name"} (init 전이면 빈 문자열)"""
+        info = {"project": "", "harbor_name": ""}
+        for r in self._conn().execute("SELECT key, value FROM settings"):
+            info[r["key"]] = r["value"]
+        return info
+
+    def init(self, project, harbor_name):
+        """프로젝트와 이름을 정하고 기존 기록을 비운다"""
+        with self.transaction() as conn:
+            for table in ("files", "superseded", "merkle_nodes"):
+                conn.execute(f"DELETE FROM {table}")
+            conn.executemany("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
+                             [("project", project), ("harbor_name", harbor_name)])
+
+    # ---------- files ----------
+
+    @staticmethod
+    def _row(item):
+        base = merkle_base(item["uuid"], item.get("base_uuid"))
+        return (item["path"], item["uuid"], item.get("base_uuid"), base, leaf_key(base),
+                item.get("version", 1), item["size"], item["hash"], json.dumps(item["chunks"]))
+
+    @staticmethod
+    def _entry(row):
+        return {
+            "uuid": row["uuid"],
+            "base_uuid": row["base_uuid"],
+            "filename": os.path.basename(row["path"]),
+            "path": row["path"],
+            "version": row["version"],
+            "size": row["size"],
+            "hash": row["hash"],
+            "chunks": json.loads(row["chunks"])
+        }
+
+    def has_path(self, path):
+        return self._conn().execute("SELECT 1 FROM files WHERE path = ?", (path,)).fetchone() is not None
+
+    def lookup(self, uuid_):
+        """(항목, 새 버전 uuid) — 항목이 없고 새 버전으로 대체되었으면 두 번째 값이 있다"""
+        conn = self._conn()
+        row = conn.execute("SELECT * FROM files WHERE uuid = ? LIMIT 1", (uuid_,)).fetchone()
+        if row is not None:
+            return self._entry(row), None
+        row = conn.execute("SELECT newer FROM superseded WHERE uuid = ?", (uuid_,)).fetchone()
+        return None, (row["newer"] if row else None)
+
+    def known_uuids(self, uuid_list):
+        """uuid_list 중 이미 가졌거나 새 버전으로 대체한 것들"""
+        conn = self._conn()
+        found = set()
+        for i in range(0, len(uuid_list), 500):
+            chunk = uuid_list[i:i + 500]
+            marks = ",".join("?" * len(chunk))
+            found.update(r["uuid"] for r in conn.execute(
+                f"SELECT uuid FROM files WHERE uuid IN ({marks}) "
+                f"UNION SELECT uuid FROM superseded WHERE uuid IN ({marks})", chunk + chunk))
+        return found
+
+    def record_files(self, items):
+        """
+        push / 복제 / register-file 로 받은 파일들을 한 트랜잭션으로 기록한다.
+        같은 경로의 이전 버전은 superseded 에 남긴다. 더 낮은 버전이 늦게 오면 그 uuid 를 superseded 로 둔다.
+        """
+        changed = set()
+        with self.transaction() as conn:
+            for item in items:
+                old = conn.execute("SELECT uuid, base, version FROM files WHERE path = ?",
+                                   (item["path"],)).fetchone()
+                if old is not None and old["uuid"] != item["uuid"]:
+                    if old["version"] > item.get("version", 1):
+                        conn.execute("INSERT OR REPLACE INTO superseded (uuid, newer) VALUES (?, ?)",
+                                     (item["uuid"], old["uuid"]))
+                        continue
+                    conn.execute("INSERT OR REPLACE INTO superseded (uuid, newer) VALUES (?, ?)",
+                                 (old["uuid"], item["uuid"]))
+                if old is not None:
+                    changed.add(old["base"])
+                row = self._row(item)
+                changed.add(row[3])
+                conn.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", row)
+            if changed:
+                self._merkle(conn).update(changed)
+
+    def file_count(self):
+        return self._conn().execute("SELECT COUNT(*) AS n FROM files").fetchone()["n"]
+
+    # ---------- merkle ----------
+
+    def _merkle(self, conn):
+        def bucket(prefix):
+            return {r["base"]: r["uuid"] for r in conn.execute(
+                "SELECT base, uuid FROM files WHERE mkey >= ? AND mkey < ?", (prefix, prefix + "~"))}
+        return MerkleTree(_MerkleNodes(conn), bucket)
+
+    def merkle_tree(self):
+        """이 harbor 가 가진 파일들의 트리 (host 의 replicator 가 /merkle 로 비교한다)"""
+        return self._merkle(self._conn())
@@ -0,0 +1,217 @@
+# common/journal.py
+# host 와 클라이언트가 함께 쓰는 이벤트 저널 (append-only, 구조화된 JSON 한 줄 = 이벤트 하나)
+#
+#   <dir>/000001.log   이벤트 NDJSON (세그먼트)
+#   <dir>/000001.idx   세그먼트가 SEGMENT_BYTES 를 넘어 닫힐 때 만드는 색인
+#                      {"min_ts", "max_ts", "count",
+#                       "keys": {"project": {값: [offset, ...]}, "uuid": ..., "file": ..., "type": ...},
+#                       "time": [[ts, offset], ...]   TIME_STRIDE 개마다}
+#
+# - append() 는 메모리에 모아 두었다가 FLUSH_EVENTS 개가 쌓이거나 flush() / close() 때
+#   한 번에 쓴다 (host 는 FLUSH_INTERVAL 마다 백그라운드에서 flush). 비정상 종료 시 flush 전 이벤트는 잃는다.
+# - 쓰기는 <dir>/lock 에 flock 을 잡고 하므로 여러 프로세스가 같은 저널에 써도 섞이지 않는다.
+# - query() 는 닫힌 세그먼트의 색인으로 시간 범위가 겹치지 않는 세그먼트를 건너뛰고,
+#   project / uuid / file / type 조건이 있으면 그 offset 의 이벤트만 읽는다.
+#   열려 있는(마지막) 세그먼트만 처음부터 읽는다 (최대 SEGMENT_BYTES).
+import os
+import json
+import time
+import fcntl
+import atexit
+import bisect
+import threading
+from contextlib import contextmanager
+
+from common.timings import TIMINGS, METRICS
+
+SEGMENT_BYTES = 8 << 20
+FLUSH_EVENTS = 256
+FLUSH_INTERVAL = 1.0
+TIME_STRIDE = 256
+INDEX_FIELDS = ("project", "uuid", "file", "type")
+
+
+def _segment_name(n):
+    return f"{n:06d}"
+
+
+class Journal:
+    def __init__(self, path, flush_interval=None, text_log=None):
+        """
+        path: 저널 폴더. flush_interval 을 주면 백그라운드 스레드가 주기적으로 flush 한다.
+        text_log 를 주면 flush 할 때 "message" 가 있는 이벤트를 사람이 읽는 로그로도 남긴다.
+        """
+        self.path = path
+        self.text_log = text_log
+        self.buffer = []
+        self.lock = threading.Lock()
+        self._idx_cache = {}
+        os.makedirs(path, exist_ok=True)
+        atexit.register(self.flush)
+        if flush_interval:
+            threading.Thread(target=self._flush_loop, args=(flush_interval,), daemon=True).start()
+
+    # ---------- 쓰기 ----------
+
+    def append(self, type_, **fields):
+        event = {"ts": round(time.time(), 6), "type": type_}
+        event.update((k, v) for k, v in fields.items() if v is not None)
+        with self.lock:
+            self.buffer.append(event)
+            full = len(self.buffer) >= FLUSH_EVENTS
+        if full:
+            self.flush()
+        return event
+
+    def _flush_loop(self, interval):
+        while True:
+            time.sleep(interval)
+            try:
+                self.flush()
+            except OSError:
+                pass
+
+    @contextmanager
+    def _file_lock(self):
+        with open(os.path.join(self.path, "lock"), "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def flush(self):
+        with self.lock:
+            events, self.buffer = self.buffer, []
+        if not events:
+            return
+        start = time.perf_counter()
+        data = "".join(json.dumps(e, ensure_ascii=False) + "\n" for e in events).encode("utf-8")
+        with self._file_lock():
+            segments = self.segments()
+            n = segments[-1] if segments else 1
+            path = self._log_path(n)
+            if os.path.exists(self._idx_path(n)):
+                n += 1
+                path = self._log_path(n)
+            with open(path, "ab") as f:
+                f.write(data)
+                size = f.tell()
+            if size >= SEGMENT_BYTES:
+                self._seal(n)
+
+        if self.text_log:
+            lines = [f"[{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(e['ts']))}] {e['message']}\n"
+                     for e in events if "message" in e]
+            if lines:
+                os.makedirs(os.path.dirname(self.text_log) or ".", exist_ok=True)
+                with open(self.text_log, "a", encoding="utf-8") as f:
+                    f.writelines(lines)
+        elapsed = time.perf_counter() - start
+        METRICS.observe("cedge_journal_flush_seconds", elapsed)
+        TIMINGS.add("journal-flush", elapsed, bytes_written=len(data))
+
+    def _seal(self, n):
+        """세그먼트를 닫고 색인을 만든다. 다음 flush 부터는 새 세그먼트에 쓴다"""
+        index = {"min_ts": None, "max_ts": None, "count": 0,
+                 "keys": {field: {} for field in INDEX_FIELDS}, "time": []}
+        for offset, event in self._scan(n):
+            ts = event.get("ts", 0)
+            if index["count"] % TIME_STRIDE == 0:
+                index["time"].append([ts, offset])
+            index["count"] += 1
+            index["min_ts"] = ts if index["min_ts"] is None else min(index["min_ts"], ts)
+            index["max_ts"] = ts if index["max_ts"] is None else max(index["max_ts"], ts)
+            for field in INDEX_FIELDS:
+                if field in event:
+                    index["keys"][field].setdefault(str(event[field]), []).append(offset)
+        tmp = self._idx_path(n) + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(index, f)
+        os.replace(tmp, self._idx_path(n))
+
+    # ---------- 읽기 ----------
+
+    def _log_path(self, n):
+        return os.path.join(self.path, _segment_name(n) + ".log")
+
+    def _idx_path(self, n):
+        return os.path.join(self.path, _segment_name(n) + ".idx")
+
+    def segments(self):
+        return sorted(int(name[:-4]) for name in os.listdir(self.path)
+                      if name.endswith(".log") and name[:-4].isdigit())
+
+    def _load_idx(self, n):
+        path = self._idx_path(n)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+        cached = self._idx_cache.get(n)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        with open(path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+        self._idx_cache[n] = (mtime, index)
+        return index
+
+    def _scan(self, n, start=0):
+        """(offset, event) 를 세그먼트의 start 위치부터 순서대로"""
+        with open(self._log_path(n), "rb") as f:
+            f.seek(start)
+            offset = start
+            for line in f:
+                if line.endswith(b"\n"):
+                    try:
+                        yield offset, json.loads(line)
+                    except ValueError:
+                        pass
+                offset += len(line)
+
+    def _read_at(self, n, offsets):
+        with open(self._log_path(n), "rb") as f:
+            for offset in offsets:
+                f.seek(offset)
+                yield json.loads(f.readline())
+
+    def _segment_events(self, n, filters, since, until):
+        index = self._load_idx(n)
+        if index is None:
+            return [e for _, e in self._scan(n)]
+        if index["count"] == 0 or (since is not None and index["max_ts"] < since) \
+                or (until is not None and index["min_ts"] > until):
+            return []
+        postings = None
+        for field, value in filters.items():
+            if field in INDEX_FIELDS:
+                found = set(index["keys"][field].get(str(value), []))
+                postings = found if postings is None else postings & found
+        if postings is not None:
+            return list(self._read_at(n, sorted(postings)))
+        start = 0
+        if since is not None and index["time"]:
+            # ts 는 거의 증가 순이므로 since 보다 한 구간 앞에서부터 읽는다
+            i = bisect.bisect_left([t for t, _ in index["time"]], since) - 1
+            start = index["time"][max(0, i - 1)][1] if i >= 0 else 0
+        return [e for _, e in self._scan(n, start)]
+
+    def query(self, since=None, until=None, limit=None, newest_first=False, **filters):
+        """
+        조건에 맞는 이벤트. filters 는 필드=값 (project, uuid, file, type 은 색인 사용).
+        newest_first 이면 최신 이벤트부터 limit 개.
+        """
+        self.flush()
+        filters = {k: v for k, v in filters.items() if v is not None}
+        results = []
+        segments = self.segments()
+        for n in (reversed(segments) if newest_first else segments):
+            matched = [e for e in self._segment_events(n, filters, since, until)
+                       if (since is None or e.get("ts", 0) >= since)
+                       and (until is None or e.get("ts", 0) <= until)
+                       and all(str(e.get(k)) == str(v) for k, v in filters.items())]
+            matched.sort(key=lambda e: e.get("ts", 0), reverse=newest_first)
+            results.extend(matched)
+            if limit and len(results) >= limit:
+                return results[:limit]
+        return results
@@ -0,0 +1,175 @@
+# common/merkle.py
+# 프로젝트 파일 목록의 Merkle tree (client / harbor / host 가 같은 모양으로 만든다)
+#
+# 잎(leaf)은 파일 하나: base_uuid → 그 파일의 최신 버전 UUID.
+# 버전 UUID 는 내용이 정해지면 바뀌지 않으므로, UUID 가 같으면 내용도 같다고 본다
+# (host 는 경로나 내용 해시를 모르므로 세 곳이 공통으로 가진 값을 쓴다).
+#
+# 트리 모양은 폴더 구조 대신 sha1(base_uuid) 의 16진수 prefix 로 정한다.
+#   ""      root
+#   "a"     첫 자리가 a 인 파일들 (자식 16개)
+#   ...
+#   "a3f0"  DEPTH 자리 prefix = 버킷. 여기에 잎이 모인다
+# 폴더 하나에 shard 수백만 개가 있어도 노드의 자식 수가 16 으로 고정되고,
+# 100만 파일이면 버킷 하나에 잎이 15개 정도다.
+#
+# 노드 해시는 prefix → hash 를 담는 dict 같은 저장소(get / [] = / pop)에 두고,
+# 잎이 바뀌면 update() 로 그 버킷과 조상 DEPTH 개만 다시 계산한다 (O(변경 수 · DEPTH)).
+#
+# 두 트리를 비교할 때는 root 부터 해시가 다른 노드의 자식만 한 단계씩 내려간다 (diff_trees).
+# 한 단계의 노드들은 한 번의 요청으로 받으므로 왕복 수는 DEPTH + 1 을 넘지 않는다.
+import hashlib
+
+DEPTH = 4
+DIGITS = "0123456789abcdef"
+MAX_PREFIXES = 4096     # 노드 요청 한 번에 담는 prefix 수
+
+
+def leaf_key(base_uuid):
+    return hashlib.sha1(base_uuid.encode("utf-8")).hexdigest()
+
+
+def bucket_hash(leaves):
+    """{base_uuid: uuid} 버킷의 해시 (비었으면 None)"""
+    if not leaves:
+        return None
+    h = hashlib.sha256()
+    for base in sorted(leaves):
+        h.update(f"{base} {leaves[base]}\n".encode("utf-8"))
+    return h.hexdigest()
+
+
+def parent_hash(children):
+    """{자리 숫자: 자식 해시} 의 해시 (비었으면 None)"""
+    if not children:
+        return None
+    h = hashlib.sha256()
+    for digit in sorted(children):
+        h.update(f"{digit} {children[digit]}\n".encode("utf-8"))
+    return h.hexdigest()
+
+
+def group_leaves(leaves, depth=DEPTH):
+    """(base_uuid, uuid) 들을 {버킷 prefix: {base_uuid: uuid}} 로"""
+    buckets = {}
+    for base, value in leaves:
+        buckets.setdefault(leaf_key(base)[:depth], {})[base] = value
+    return buckets
+
+
+class MerkleTree:
+    """
+    nodes: prefix → hash 저장소 (dict 또는 get / __setitem__ / pop 을 가진 객체)
+    bucket: 버킷 prefix 를 받아 그 안의 잎 {base_uuid: uuid} 를 돌려주는 함수
+    """
+
+    def __init__(self, nodes, bucket, depth=DEPTH):
+        self.nodes = nodes
+        self.bucket = bucket
+        self.depth = depth
+
+    def _set(self, prefix, value):
+        if value is None:
+            self.nodes.pop(prefix, None)
+        else:
+            self.nodes[prefix] = value
+
+    def root(self):
+        return self.nodes.get("")
+
+    def children(self, prefix):
+        found = {}
+        for digit in DIGITS:
+            value = self.nodes.get(prefix + digit)
+            if value is not None:
+                found[digit] = value
+        return found
+
+    def update(self, base_uuids):
+        """잎이 바뀐(추가/변경/삭제) 파일들의 버킷과 그 조상만 다시 계산한다"""
+        level = {leaf_key(base)[:self.depth] for base in base_uuids}
+        for prefix in level:
+            self._set(prefix, bucket_hash(self.bucket(prefix)))
+        for _ in range(self.depth):
+            level = {prefix[:-1] for prefix in level}
+            for prefix in level:
+                self._set(prefix, parent_hash(self.children(prefix)))
+
+    def build(self, buckets):
+        """{버킷 prefix: 잎} 전체로 트리를 새로 만든다 (nodes 는 비어 있어야 한다)"""
+        level = {}
+        for prefix, leaves in buckets.items():
+            value = bucket_hash(leaves)
+            if value is not None:
+                level[prefix] = value
+        for _ in range(self.depth + 1):
+            for prefix, value in level.items():
+                self.nodes[prefix] = value
+            parents = {}
+            for prefix, value in level.items():
+                if prefix:
+                    parents.setdefault(prefix[:-1], {})[prefix[-1]] = value
+            level = {prefix: parent_hash(children) for prefix, children in parents.items()}
+
+    def node(self, prefix):
+        """비교 상대에게 보내는 노드: 중간 노드는 자식 해시, 버킷은 잎"""
+        node = {"hash": self.nodes.get(prefix)}
+        if len(prefix) >= self.depth:
+            node["leaves"] = self.bucket(prefix) if node["hash"] is not None else {}
+        else:
+            node["children"] = self.children(prefix) if node["hash"] is not None else {}
+        return node
+
+
+def parse_prefixes(values, depth=DEPTH):
+    """요청의 prefix 목록 검사. 잘못된 값이 있거나 너무 많으면 None"""
+    prefixes = values or [""]
+    if len(prefixes) > MAX_PREFIXES:
+        return None
+    for prefix in prefixes:
+        if len(prefix) > depth or any(c not in DIGITS for c in prefix):
+            return None
+    return prefixes
+
+
+def http_fetcher(session, url, timeout=60, **fields):
+    """diff_trees 에 넘길 fetch: url 에 {"prefixes": [...], **fields} 를 POST 한다 (requests 세션)"""
+    def fetch(prefixes):
+        nodes = {}
+        for i in range(0, len(prefixes), MAX_PREFIXES):
+            res = session.post(url, json={"prefixes": prefixes[i:i + MAX_PREFIXES], **fields},
+                               timeout=timeout)
+            res.raise_for_status()
+            nodes.update(res.json()["nodes"])
+        return nodes
+    return fetch
+
+
+def diff_trees(local, fetch):
+    """
+    local 트리와 상대 트리가 다른 파일들. fetch(prefix 목록) 는 상대의 {prefix: node} 를 돌려준다.
+    {base_uuid: (local uuid, 상대 uuid)} (한쪽에 없으면 None) 와 fetch 호출(왕복) 수.
+    """
+    diffs = {}
+    frontier = [""]
+    rounds = 0
+    while frontier:
+        remote = fetch(frontier)
+        rounds += 1
+        next_level = []
+        for prefix in frontier:
+            mine = local.node(prefix)
+            theirs = remote.get(prefix) or {}
+            if mine["hash"] == theirs.get("hash"):
+                continue
+            if "leaves" in mine:
+                other = theirs.get("leaves") or {}
+                for base in set(mine["leaves"]) | set(other):
+                    if mine["leaves"].get(base) != other.get(base):
+                        diffs[base] = (mine["leaves"].get(base), other.get(base))
+            else:
+                other = theirs.get("children") or {}
+                next_level.extend(prefix + d for d in DIGITS
+                                  if mine["children"].get(d) != other.get(d))
+        frontier = next_level
+    return diffs, rounds
@@ -0,0 +1,24 @@
+# common/paths.py
+# harbor / client 가 주고받는 파일 경로 검사
+#
+# manifest 의 path 는 프로젝트 기준 상대 경로("data/a.txt")다. 다른 쪽에서 받은 경로를 그대로
+# os.path.join 하면 절대 경로나 ".." 로 clone 폴더 밖에 쓸 수 있으므로, 받은 쪽에서 항상 이것으로 검사한다.
+import os
+
+
+def clean_relpath(path):
+    """정규화한 상대 경로 ('/' 구분). 비었거나 절대 경로이거나 '..' 가 있으면 ValueError"""
+    if not isinstance(path, str) or not path or "\0" in path:
+        raise ValueError(f"잘못된 경로: {path!r}")
+    path = path.replace("\\", "/")
+    if path.startswith("/") or (len(path) > 1 and path[1] == ":"):
+        raise ValueError(f"절대 경로는 쓸 수 없습니다: {path}")
+    parts = [p for p in path.split("/") if p not in ("", ".")]
+    if not parts or ".." in parts:
+        raise ValueError(f"프로젝트 밖을 가리키는 경로입니다: {path}")
+    return "/".join(parts)
+
+
+def safe_join(root, path):
+    """root 아래의 경로. path 가 root 밖을 가리키면 ValueError"""
+    return os.path.join(root, *clean_relpath(path).split("/"))
@@ -0,0 +1,46 @@
+# common/placement.py
+# 프로젝트 파일을 여러 harbor 에 나눠 두기 위한 consistent hashing
+#
+# harbor 마다 VNODES 개의 점을 해시 링 위에 놓고, 파일 키에서 시계 방향으로 만나는
+# 서로 다른 harbor 들을 replica 위치로 쓴다. harbor 가 추가/제거되어도
+# 위치가 바뀌는 파일은 약 1/N 뿐이라 재복제 양이 작다.
+import bisect
+import hashlib
+
+VNODES = 64
+REPLICAS = 2
+
+
+def _point(value):
+    return int.from_bytes(hashlib.sha1(value.encode("utf-8")).digest()[:8], "big")
+
+
+def placement_key(uuid_):
+    """
+    파일 버전 UUID 의 배치 키. cedge UUID(<project>-<path>-<time>)는 시간 부분을 떼어
+    같은 파일의 모든 버전이 같은 harbor 에 모이도록 한다 (버전 간 chunk 중복 제거에 유리).
+    """
+    return uuid_.rsplit("-", 1)[0]
+
+
+class HashRing:
+    def __init__(self, nodes, vnodes=VNODES):
+        self.nodes = sorted(set(nodes))
+        ring = sorted((_point(f"{node}#{i}"), node) for node in self.nodes for i in range(vnodes))
+        self.points = [p for p, _ in ring]
+        self.owners = [node for _, node in ring]
+
+    def lookup(self, key, count=REPLICAS):
+        """key 를 담당할 harbor 목록 (첫 번째가 primary)"""
+        count = min(count, len(self.nodes))
+        result = []
+        if not count:
+            return result
+        i = bisect.bisect(self.points, _point(key))
+        for j in range(len(self.points)):
+            node = self.owners[(i + j) % len(self.points)]
+            if node not in result:
+                result.append(node)
+                if len(result) == count:
+                    break
+        return result
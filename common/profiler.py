@@ -0,0 +1,114 @@
+# common/profiler.py
+# cedge --profile / host --profile 가 쓰는 프로파일러
+#
+#   cprofile : cProfile 결과를 path 에 저장 (python -m pstats path, snakeviz 등으로 본다).
+#              호출한 스레드만 잰다.
+#   sample   : interval 마다 모든 스레드의 스택을 찍어 collapsed stack 형식
+#              ("a;b;c 샘플 수" 한 줄씩)으로 path 에 저장한다. flamegraph.pl, speedscope 로 볼 수 있다.
+#              측정 부담이 작아 host 처럼 오래 돌고 스레드가 많은 프로세스에 맞다.
+import os
+import sys
+import time
+import pstats
+import cProfile
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+MODES = ("cprofile", "sample")
+SAMPLE_INTERVAL = 0.005
+TOP = 15
+
+
+def _frame_name(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class Sampler:
+    """interval 마다 sys._current_frames() 로 스택을 모은다"""
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name="cedge-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _loop(self):
+        me = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            for t in threading.enumerate():
+                names[t.ident] = t.name
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_name(frame))
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def write(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+    def top(self, limit=TOP):
+        """(함수, 자기 샘플 수, 포함 샘플 수) — 가장 오래 머문 함수 순"""
+        own = Counter()
+        total = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")[1:]
+            if not frames:
+                continue
+            own[frames[-1]] += count
+            for name in set(frames):
+                total[name] += count
+        return [(name, n, total[name]) for name, n in own.most_common(limit)]
+
+
+@contextmanager
+def profile(path, mode="cprofile", interval=SAMPLE_INTERVAL, out=sys.stderr):
+    """with 블록을 프로파일링해 path 에 저장하고 요약을 out 에 출력. path 가 없으면 아무것도 하지 않는다"""
+    if not path:
+        yield
+        return
+    if mode not in MODES:
+        raise ValueError(f"unknown profile mode: {mode}")
+
+    start = time.perf_counter()
+    if mode == "cprofile":
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            profiler.dump_stats(path)
+            print(f"\n🔬 cProfile {time.perf_counter() - start:.3f}s → {path} (누적 시간 상위 {TOP}개)", file=out)
+            pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(TOP)
+        return
+
+    sampler = Sampler(interval)
+    sampler.start()
+    try:
+        yield
+    finally:
+        sampler.stop()
+        sampler.write(path)
+        print(f"\n🔬 샘플 {sampler.samples:,}회 ({interval * 1000:g} ms 간격, "
+              f"{time.perf_counter() - start:.3f}s) → {path}", file=out)
+        print(f"   {'self':>6} {'total':>6}  function", file=out)
+        for name, own, total in sampler.top():
+            print(f"   {own:>6,} {total:>6,}  {name}", file=out)
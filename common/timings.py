@@ -0,0 +1,246 @@
+# common/timings.py
+# 단계별 시간 측정과 지연 히스토그램
+#
+# PhaseTimings (cedge --timings)
+#   코드 곳곳에서 with TIMINGS.phase("read", files=1, bytes_read=n): ... 로 단계 이름별
+#   wall time, 호출 수, 파일 수, 읽고 쓴 바이트를 모은다. 꺼져 있으면(기본) 아무것도 기록하지 않는다.
+#   단계는 겹칠 수 있으므로 (예: 큰 내용은 compress 안에서 chunk 마다 pack-write) 표의 시간은 각 단계의
+#   포함 시간이다. ProcessPoolExecutor worker 에서 잰 값은 call_timed 로 결과와 함께 돌려받아 합친다
+#   (worker 들의 시간을 더하므로 전체 wall time 보다 클 수 있다).
+#
+# Metrics (host 의 /metrics)
+#   이름 + label 별 히스토그램과 카운터. Prometheus text 형식으로 내보낸다.
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+FIELDS = ("seconds", "calls", "files", "bytes_read", "bytes_written")
+
+
+def format_bytes(n):
+    for unit in ("B", "KB", "MB", "GB"):
+        if n < 1024 or unit == "GB":
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+
+
+class PhaseTimings:
+    def __init__(self):
+        self.enabled = False
+        self.phases = {}
+        self.lock = threading.Lock()
+        self.started = time.perf_counter()
+
+    def enable(self):
+        self.enabled = True
+        self.phases = {}
+        self.started = time.perf_counter()
+
+    def add(self, name, seconds=0.0, calls=1, files=0, bytes_read=0, bytes_written=0):
+        if not self.enabled:
+            return
+        with self.lock:
+            p = self.phases.get(name)
+            if p is None:
+                p = self.phases[name] = dict.fromkeys(FIELDS, 0)
+            p["seconds"] += seconds
+            p["calls"] += calls
+            p["files"] += files
+            p["bytes_read"] += bytes_read
+            p["bytes_written"] += bytes_written
+
+    @contextmanager
+    def phase(self, name, files=0, bytes_read=0, bytes_written=0):
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start, 1, files, bytes_read, bytes_written)
+
+    def timed_iter(self, name, iterable):
+        """iterable 의 각 next() 에 걸린 시간을 name 단계로 기록 (항목 하나 = 파일 하나)"""
+        if not self.enabled:
+            return iterable
+        return self._timed_iter(name, iter(iterable))
+
+    def _timed_iter(self, name, it):
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(it)
+            except StopIteration:
+                self.add(name, time.perf_counter() - start, 0)
+                return
+            self.add(name, time.perf_counter() - start, 0, files=1)
+            yield item
+
+    def merge(self, phases):
+        for name, p in phases.items():
+            self.add(name, **p)
+
+    def as_dict(self):
+        with self.lock:
+            phases = {name: dict(p) for name, p in self.phases.items()}
+        return {"wall_seconds": time.perf_counter() - self.started, "phases": phases}
+
+    def report(self):
+        """단계별 표 (시간 순)"""
+        data = self.as_dict()
+        wall = data["wall_seconds"]
+        lines = [f"⏱️  단계별 시간 (전체 {wall:.3f}s, 겹치는 단계는 포함 시간)",
+                 f"   {'phase':<16} {'seconds':>9} {'%':>6} {'calls':>8} {'files':>8} {'read':>10} {'written':>10}"]
+        for name, p in sorted(data["phases"].items(), key=lambda kv: -kv[1]["seconds"]):
+            share = p["seconds"] / wall * 100 if wall else 0
+            lines.append(f"   {name:<16} {p['seconds']:>9.3f} {share:>5.1f}% {p['calls']:>8,} {p['files']:>8,} "
+                         f"{format_bytes(p['bytes_read']):>10} {format_bytes(p['bytes_written']):>10}")
+        return "\n".join(lines)
+
+
+TIMINGS = PhaseTimings()
+
+
+def call_timed(worker, task):
+    """worker 프로세스에서 worker(task) 를 재고 (결과, 단계별 값)을 돌려준다"""
+    TIMINGS.enable()
+    result = worker(task)
+    return result, TIMINGS.as_dict()["phases"]
+
+
+# ---------- host 지표 ----------
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels, extra=None):
+    items = list(labels) + ([extra] if extra else [])
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in items) + "}"
+
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        """버킷 경계로 어림한 분위수 (마지막 버킷을 넘으면 None)"""
+        if not self.count:
+            return None
+        target = q * self.count
+        seen = 0
+        for bound, n in zip(self.buckets, self.counts):
+            seen += n
+            if seen >= target:
+                return bound
+        return None
+
+
+class Metrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {}   # name → {labels: Histogram}
+        self.counters = {}     # name → {labels: value}
+        self.help = {}
+        self.buckets = {}
+
+    def describe(self, name, help_text, buckets=LATENCY_BUCKETS):
+        self.help[name] = help_text
+        self.buckets[name] = buckets
+
+    def observe(self, name, value, **labels):
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            series = self.histograms.setdefault(name, {})
+            h = series.get(key)
+            if h is None:
+                h = series[key] = Histogram(self.buckets.get(name, LATENCY_BUCKETS))
+            h.observe(value)
+
+    def inc(self, name, value=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    @contextmanager
+    def time(self, name, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def render(self):
+        """Prometheus text 형식 (version 0.0.4)"""
+        out = []
+        with self.lock:
+            for name in sorted(self.counters):
+                if name in self.help:
+                    out.append(f"# HELP {name} {self.help[name]}")
+                out.append(f"# TYPE {name} counter")
+                for key, value in sorted(self.counters[name].items()):
+                    out.append(f"{name}{_labels(key)} {value}")
+            for name in sorted(self.histograms):
+                if name in self.help:
+                    out.append(f"# HELP {name} {self.help[name]}")
+                out.append(f"# TYPE {name} histogram")
+                for key, h in sorted(self.histograms[name].items()):
+                    seen = 0
+                    for bound, n in zip(h.buckets, h.counts):
+                        seen += n
+                        out.append(f"{name}_bucket{_labels(key, ('le', f'{bound:g}'))} {seen}")
+                    out.append(f"{name}_bucket{_labels(key, ('le', '+Inf'))} {h.count}")
+                    out.append(f"{name}_sum{_labels(key)} {h.sum:.6f}")
+                    out.append(f"{name}_count{_labels(key)} {h.count}")
+        return "\n".join(out) + "\n"
+
+    def as_dict(self):
+        """사람이 보기 위한 요약: 히스토그램마다 count / 평균 / p50 / p99 (ms, 버킷 경계 기준)"""
+        def ms(v):
+            return round(v * 1000, 3) if v is not None else None
+        result = {}
+        with self.lock:
+            for name, series in sorted(self.counters.items()):
+                result[name] = [{"labels": dict(key), "value": value} for key, value in sorted(series.items())]
+            for name, series in sorted(self.histograms.items()):
+                size = self.buckets.get(name) is SIZE_BUCKETS
+                rows = []
+                for key, h in sorted(series.items()):
+                    row = {"labels": dict(key), "count": h.count}
+                    if size:
+                        row.update(mean=round(h.sum / h.count, 2) if h.count else None,
+                                   p50=h.quantile(0.5), p99=h.quantile(0.99))
+                    else:
+                        row.update(mean_ms=ms(h.sum / h.count) if h.count else None,
+                                   p50_ms=ms(h.quantile(0.5)), p99_ms=ms(h.quantile(0.99)))
+                    rows.append(row)
+                result[name] = rows
+        return result
+
+
+METRICS = Metrics()
+METRICS.describe("cedge_http_request_duration_seconds", "Request handling time by route")
+METRICS.describe("cedge_http_requests_total", "Requests by route and status")
+METRICS.describe("cedge_db_open_seconds", "Host DB open (schema check, host_db.json migration)")
+METRICS.describe("cedge_db_lock_wait_seconds", "Time waiting for BEGIN IMMEDIATE (SQLite write lock)")
+METRICS.describe("cedge_db_transaction_seconds", "Write transaction time from BEGIN to COMMIT")
+METRICS.describe("cedge_db_commit_seconds", "COMMIT time (WAL write)")
+METRICS.describe("cedge_view_reload_seconds", "Async host: time to reload the in-memory view from SQLite")
+METRICS.describe("cedge_group_commit_seconds", "Async host: time of one group commit")
+METRICS.describe("cedge_group_commit_batch_size", "Async host: requests per group commit", SIZE_BUCKETS)
+METRICS.describe("cedge_journal_flush_seconds", "Journal buffer flush time")
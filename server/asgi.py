@@ -0,0 +1,294 @@
+# server/asgi.py
+# ASGI 실행 도구 (추가 패키지 없이 표준 라이브러리만 사용)
+#
+# - run(app, host, port): asyncio 로 HTTP/1.1 연결을 받아 ASGI 앱을 부르는 작은 서버.
+#   keep-alive, Content-Length / chunked 요청 본문, 길이를 모르는 응답의 chunked 전송을 지원한다.
+#   uvicorn 이 설치되어 있으면 serve 쪽에서 uvicorn 을 대신 쓴다.
+# - WSGIBridge: WSGI 앱(Flask)을 ASGI 앱처럼 부른다. WSGI 앱은 executor 스레드에서 돌고,
+#   길이를 모르는 응답(NDJSON 스트림 등)은 나오는 대로 보낸다.
+import io
+import sys
+import asyncio
+import traceback
+from http import HTTPStatus
+from urllib.parse import unquote
+
+MAX_HEADER_BYTES = 64 << 10
+MAX_BODY_BYTES = 256 << 20
+KEEPALIVE_TIMEOUT = 75
+BACKLOG = 2048
+
+
+class BadRequest(Exception):
+    def __init__(self, status):
+        super().__init__(status)
+        self.status = status
+
+
+def _reason(status):
+    try:
+        return HTTPStatus(status).phrase
+    except ValueError:
+        return ""
+
+
+async def _read_body(reader, headers):
+    length = headers.get(b"content-length")
+    if length is not None:
+        try:
+            length = int(length)
+        except ValueError:
+            raise BadRequest(400)
+        if length > MAX_BODY_BYTES:
+            raise BadRequest(413)
+        return await reader.readexactly(length) if length else b""
+    if headers.get(b"transfer-encoding", b"").lower() == b"chunked":
+        body = bytearray()
+        while True:
+            size = int((await reader.readuntil(b"\r\n")).split(b";", 1)[0], 16)
+            if size == 0:
+                await reader.readuntil(b"\r\n")   # trailer 는 쓰지 않는다
+                return bytes(body)
+            body += await reader.readexactly(size)
+            await reader.readexactly(2)
+            if len(body) > MAX_BODY_BYTES:
+                raise BadRequest(413)
+    return b""
+
+
+async def _read_request(reader, writer):
+    """(method, target, http_version, headers[(name, value)], body). 연결이 끝났으면 None"""
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError as e:
+        if not e.partial.strip():
+            return None
+        raise BadRequest(400)
+    except asyncio.LimitOverrunError:
+        raise BadRequest(431)
+
+    lines = head[:-4].split(b"\r\n")
+    try:
+        method, target, version = lines[0].decode("latin-1").split(" ", 2)
+    except ValueError:
+        raise BadRequest(400)
+    headers = []
+    for line in lines[1:]:
+        name, _, value = line.partition(b":")
+        headers.append((name.strip().lower(), value.strip()))
+    lookup = dict(headers)
+    if lookup.get(b"expect", b"").lower() == b"100-continue":
+        writer.write(b"HTTP/1.1 100 Continue\r\n\r\n")
+    body = await _read_body(reader, lookup)
+    return method, target, version, headers, body
+
+
+class _Response:
+    """ASGI send() 를 HTTP/1.1 응답으로 바꾼다. 상태 줄과 헤더는 첫 본문과 함께 쓴다"""
+
+    def __init__(self, writer, method, keep_alive):
+        self.writer = writer
+        self.method = method
+        self.keep_alive = keep_alive
+        self.head = None
+        self.chunked = False
+        self.started = False
+        self.finished = False
+
+    async def send(self, message):
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            headers = list(message.get("headers", []))
+            names = {k.lower() for k, _ in headers}
+            self.chunked = b"content-length" not in names and status not in (204, 304) \
+                and self.method != "HEAD"
+            lines = [f"HTTP/1.1 {status} {_reason(status)}".encode("latin-1")]
+            lines.extend(k + b": " + v for k, v in headers)
+            if self.chunked:
+                lines.append(b"transfer-encoding: chunked")
+            if not self.keep_alive:
+                lines.append(b"connection: close")
+            self.head = b"\r\n".join(lines) + b"\r\n\r\n"
+            self.started = True
+        elif message["type"] == "http.response.body":
+            body = message.get("body", b"")
+            more = message.get("more_body", False)
+            if self.method == "HEAD":
+                body = b""
+            if self.chunked:
+                data = (b"%x\r\n%s\r\n" % (len(body), body) if body else b"") + \
+                    (b"" if more else b"0\r\n\r\n")
+            else:
+                data = body
+            if self.head is not None:
+                data = self.head + data
+                self.head = None
+            if data:
+                self.writer.write(data)
+                await self.writer.drain()
+            if not more:
+                self.finished = True
+
+
+async def _serve_connection(app, reader, writer):
+    client = writer.get_extra_info("peername")
+    server = writer.get_extra_info("sockname")
+    try:
+        while True:
+            try:
+                request = await asyncio.wait_for(_read_request(reader, writer), KEEPALIVE_TIMEOUT)
+            except BadRequest as e:
+                writer.write(f"HTTP/1.1 {e.status} {_reason(e.status)}\r\n"
+                             "content-length: 0\r\nconnection: close\r\n\r\n".encode("latin-1"))
+                break
+            except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                break
+            if request is None:
+                break
+
+            method, target, version, headers, body = request
+            connection = dict(headers).get(b"connection", b"").lower()
+            keep_alive = connection != b"close" if version == "HTTP/1.1" else connection == b"keep-alive"
+            path, _, query = target.partition("?")
+            scope = {
+                "type": "http",
+                "asgi": {"version": "3.0", "spec_version": "2.3"},
+                "http_version": version[5:],
+                "method": method,
+                "scheme": "http",
+                "path": unquote(path),
+                "raw_path": path.encode("latin-1"),
+                "query_string": query.encode("latin-1"),
+                "root_path": "",
+                "headers": headers,
+                "client": client[:2] if client else None,
+                "server": server[:2] if server else None,
+            }
+            done = asyncio.Event()
+            received = False
+
+            async def receive():
+                nonlocal received
+                if not received:
+                    received = True
+                    return {"type": "http.request", "body": body, "more_body": False}
+                await done.wait()
+                return {"type": "http.disconnect"}
+
+            response = _Response(writer, method, keep_alive)
+            try:
+                await app(scope, receive, response.send)
+            except Exception:
+                traceback.print_exc()
+                if response.started:
+                    break   # 응답을 보내던 중이면 연결을 끊는 수밖에 없다
+                await response.send({"type": "http.response.start", "status": 500,
+                                     "headers": [(b"content-length", b"0")]})
+                await response.send({"type": "http.response.body", "body": b""})
+            finally:
+                done.set()
+            if not response.finished or not keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+def run(app, host="0.0.0.0", port=8000, backlog=BACKLOG):
+    """app 을 이 모듈의 HTTP/1.1 서버로 실행한다 (Ctrl+C 로 종료)"""
+    async def main():
+        server = await asyncio.start_server(
+            lambda r, w: _serve_connection(app, r, w), host, port,
+            backlog=backlog, limit=MAX_HEADER_BYTES, reuse_address=True)
+        async with server:
+            await server.serve_forever()
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
+
+
+class WSGIBridge:
+    """WSGI 앱을 executor 스레드에서 부르는 ASGI 앱"""
+
+    def __init__(self, wsgi_app, executor):
+        self.app = wsgi_app
+        self.executor = executor
+
+    def environ(self, scope, body):
+        server = scope.get("server") or ("localhost", 80)
+        client = scope.get("client") or ("", 0)
+        environ = {
+            "REQUEST_METHOD": scope["method"],
+            "SCRIPT_NAME": "",
+            # WSGI 는 경로를 latin-1 문자열로 받는다 (PEP 3333)
+            "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+            "QUERY_STRING": scope["query_string"].decode("latin-1"),
+            "SERVER_NAME": str(server[0]),
+            "SERVER_PORT": str(server[1]),
+            "SERVER_PROTOCOL": f"HTTP/{scope['http_version']}",
+            "REMOTE_ADDR": client[0],
+            "REMOTE_PORT": str(client[1]),
+            "CONTENT_LENGTH": str(len(body)),
+            "wsgi.version": (1, 0),
+            "wsgi.url_scheme": scope.get("scheme", "http"),
+            "wsgi.input": io.BytesIO(body),
+            "wsgi.errors": sys.stderr,
+            "wsgi.multithread": True,
+            "wsgi.multiprocess": False,
+            "wsgi.run_once": False,
+        }
+        for name, value in scope["headers"]:
+            name = name.decode("latin-1")
+            value = value.decode("latin-1")
+            if name == "content-type":
+                environ["CONTENT_TYPE"] = value
+            elif name != "content-length":
+                key = "HTTP_" + name.upper().replace("-", "_")
+                environ[key] = f"{environ[key]},{value}" if key in environ else value
+        return environ
+
+    async def __call__(self, scope, receive, send):
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+        environ = self.environ(scope, body)
+        started = {}
+
+        def start_response(status, headers, exc_info=None):
+            started["status"] = int(status.split(" ", 1)[0])
+            started["headers"] = headers
+            return lambda data: None   # write() 는 쓰는 앱이 없다
+
+        def call():
+            """길이를 아는 응답은 끝까지 읽고, 아니면 첫 조각만 읽어 돌려준다"""
+            result = self.app(environ, start_response)
+            it = iter(result)
+            sized = any(k.lower() == "content-length" for k, _ in started.get("headers", ()))
+            if sized:
+                chunks = list(it)
+                return result, None, chunks
+            return result, it, [next(it, b"")]
+
+        loop = asyncio.get_running_loop()
+        result, it, chunks = await loop.run_in_executor(self.executor, call)
+        try:
+            await send({"type": "http.response.start", "status": started["status"],
+                        "headers": [(k.lower().encode("latin-1"), v.encode("latin-1"))
+                                    for k, v in started["headers"]]})
+            if it is None:
+                await send({"type": "http.response.body", "body": b"".join(chunks)})
+                return
+            chunk = chunks[0]
+            while chunk is not None:
+                if chunk:
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+                chunk = await loop.run_in_executor(self.executor, next, it, None)
+            await send({"type": "http.response.body", "body": b""})
+        finally:
+            if hasattr(result, "close"):
+                await loop.run_in_executor(self.executor, result.close)
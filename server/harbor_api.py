@@ -1,8 +1,23 @@
 from flask import Blueprint, request, jsonify
-from utils import load_db, save_db, write_log
+from utils import get_db, write_log, record_event
+import time
+from common.placement import HashRing, REPLICAS, placement_key
+from health import rank_harbors, writable_harbors
+import replicator
 
 harbor_bp = Blueprint('harbor', __name__)
 
+def _wake_replicator(db, projects):
+    # 새 UUID 는 등록한 harbor 에만 있으므로, replica 를 둘 harbor 가 더 있으면 바로 복제를 시작한다
+    if any(len(db.harbors_for_project(p)) > 1 for p in projects):
+        replicator.wake()
+
+def _valid_name(value):
+    return isinstance(value, str) and value != ""
+
+def _valid_version(value):
+    return isinstance(value, int) and not isinstance(value, bool) and value >= 1
+
 @harbor_bp.route("/api/register_harbor", methods=["POST"])
 def register_harbor():
     data = request.get_json()
@@ -11,79 +26,272 @@ def register_harbor():
     if not all(k in data for k in required):
         return jsonify({"error": "Missing required fields"}), 400
 
-    db = load_db()
-
-    for harbor in db["harbors"]:
-        if harbor["name"] == data["name"]:
+    db = get_db()
+    with db.transaction():
+        if db.get_harbor(data["name"]) is not None:
             return jsonify({"error": "Harbor with same name already exists"}), 409
 
-    for project in data["manage_project"]:
-        if project not in db["projects"]:
-            return jsonify({"error": f"Project '{project}' does not exist"}), 404
-
-    for harbor in db["harbors"]:
-        for p in harbor.get("manage_project", []):
-            if p in data["manage_project"]:
-                return jsonify({
-                    "error": f"Project '{p}' already managed by another Harbor",
-                    "existing_harbor": harbor["name"]
-                }), 409
-
-    db["harbors"].append({
-        "name": data["name"],
-        "url": data["url"],
-        "manage_project": data["manage_project"]
-    })
-
-    save_db(db)
-    write_log(f"harbor-registered: {data['name']} → manages {data['manage_project']}")
+        for project in data["manage_project"]:
+            if not db.project_exists(project):
+                return jsonify({"error": f"Project '{project}' does not exist"}), 404
+
+        # 한 프로젝트를 여러 harbor 가 함께 관리할 수 있다 (파일은 해시 링으로 나눠 배치)
+        db.add_harbor(data["name"], data["url"], data["manage_project"])
+
+    write_log(f"harbor-registered: {data['name']} → manages {data['manage_project']}",
+              "harbor-registered", harbor=data["name"], url=data["url"],
+              projects=data["manage_project"])
+    replicator.wake()
     return jsonify({"status": "Harbor registered"}), 200
 
-@harbor_bp.route("/api/register_file", methods=["POST"])
-def register_file():
-    data = request.get_json()
-    required_keys = ["uuid", "project", "harbor_name"]
+@harbor_bp.route("/api/harbors/<name>", methods=["DELETE"])
+def remove_harbor(name):
+    db = get_db()
+    with db.transaction():
+        if db.get_harbor(name) is None:
+            return jsonify({"error": "Harbor not found"}), 404
+        lost = db.replica_count(name)
+        db.remove_harbor(name)
 
-    if not all(k in data for k in required_keys):
+    write_log(f"harbor-removed: {name} replicas={lost}", "harbor-removed",
+              harbor=name, replicas=lost)
+    replicator.wake()
+    return jsonify({"status": "Harbor removed", "replicas_removed": lost}), 200
+
+def compute_placement(db, data):
+    """placement 응답 (body, status). db 는 HostDB 또는 같은 조회 메서드를 가진 view"""
+    if not isinstance(data, dict) or not _valid_name(data.get("project")) \
+            or not isinstance(data.get("keys"), list):
+        return {"error": "Missing required fields"}, 400
+    if not db.project_exists(data["project"]):
+        return {"error": "Project does not exist"}, 404
+
+    names = db.harbors_for_project(data["project"])
+    ring = HashRing(writable_harbors(db, names))
+    return {
+        "harbors": {n: db.get_harbor(n)["url"] for n in names},
+        "replicas": min(REPLICAS, len(names)),
+        "placement": {key: ring.lookup(key) for key in data["keys"]}
+    }, 200
+
+@harbor_bp.route("/api/placement", methods=["POST"])
+def placement():
+    """
+    파일 키(base_uuid)마다 저장할 harbor 목록 (첫 번째가 primary).
+    body: {"project": ..., "keys": [...]}
+    """
+    body, status = compute_placement(get_db(), request.get_json())
+    return jsonify(body), status
+
+@harbor_bp.route("/api/replicas", methods=["POST"])
+def add_replica():
+    """harbor 가 다른 경로(수동 복사 등)로 받은 파일을 replica 로 알린다"""
+    data = request.get_json()
+    if not data or not data.get("uuid") or not data.get("harbor_name"):
         return jsonify({"error": "Missing required fields"}), 400
 
-    db = load_db()
+    db = get_db()
+    with db.transaction():
+        info = db.get_uuid(data["uuid"])
+        if info is None:
+            return jsonify({"error": "UUID not found"}), 404
+        if not db.harbor_manages(data["harbor_name"], info["project"]):
+            return jsonify({"error": "Harbor does not manage this project"}), 403
+        db.add_replica(data["uuid"], data["harbor_name"])
+    return jsonify({"status": "Replica registered"}), 200
+
+def apply_register_file(db, data):
+    """
+    register_file 의 검증 + 추가. 호출하는 쪽의 트랜잭션 안에서 실행한다.
+    (응답 body, status, 추가한 row 또는 None)
+    """
+    required_keys = ["uuid", "project", "harbor_name"]
+    if not isinstance(data, dict) or not all(k in data for k in required_keys):
+        return {"error": "Missing required fields"}, 400, None
+    if not all(_valid_name(data[k]) for k in required_keys) or not _valid_version(data.get("version", 1)):
+        return {"error": "Invalid fields"}, 400, None
+
     uuid_ = data["uuid"]
     project = data["project"]
     harbor_name = data["harbor_name"]
     version = data.get("version", 1)
 
-    if uuid_ in db.get("uuids", {}):
-        return jsonify({
+    existing = db.get_uuid(uuid_)
+    if existing is not None:
+        return {
             "error": "UUID already registered",
             "uuid": uuid_,
-            "registered_project": db["uuids"][uuid_]["project"]
-        }), 409
-
-    if project not in db.get("projects", {}):
-        return jsonify({"error": "Project does not exist"}), 404
+            "registered_project": existing["project"],
+            "registered_version": existing["version"]
+        }, 409, None
 
-    valid_harbor = any(
-        harbor["name"] == harbor_name and project in harbor.get("manage_project", [])
-        for harbor in db.get("harbors", [])
-    )
-    if not valid_harbor:
-        return jsonify({"error": "Harbor does not manage this project"}), 403
+    if not db.project_exists(project):
+        return {"error": "Project does not exist"}, 404, None
 
-    db["uuids"][uuid_] = {
-        "project": project,
-        "harbor_name": harbor_name,
-        "version": version
-    }
+    if not db.harbor_manages(harbor_name, project):
+        return {"error": "Harbor does not manage this project"}, 403, None
 
-    db["projects"][project]["files"].append(uuid_)
-    save_db(db)
+    row = (uuid_, project, harbor_name, version)
+    db.add_uuids([row])
+    return {"status": "File UUID registered"}, 200, row
 
+def log_registered_file(db, row):
+    """커밋된 뒤: 로그 + 복제 시작"""
+    uuid_, project, harbor_name, version = row
     msg = f"file-registration success: uuid={uuid_} project={project} harbor={harbor_name}"
-    write_log(msg)
-    return jsonify({"status": "File UUID registered"}), 200
+    write_log(msg, "file-version-added", project=project, uuid=uuid_,
+              file=placement_key(uuid_), harbor=harbor_name, version=version)
+    _wake_replicator(db, [project])
+
+@harbor_bp.route("/api/register_file", methods=["POST"])
+def register_file():
+    db = get_db()
+    with db.transaction():
+        body, status, row = apply_register_file(db, request.get_json())
+    if row is not None:
+        log_registered_file(db, row)
+    return jsonify(body), status
+
+@harbor_bp.route("/api/harbors", methods=["GET"])
+def list_harbors():
+    db = get_db()
+    return jsonify(db.list_harbors())
 
 @harbor_bp.route("/api/uuid/<uuid_>", methods=["GET"])
 def get_uuid_info(uuid_):
-    db = load_db()
-    return jsonify(db["uuids"].get(uuid_, {}))
\ No newline at end of file
+    db = get_db()
+    return jsonify(db.get_uuid(uuid_) or {})
+
+@harbor_bp.route("/api/uuid/<uuid_>/replicas", methods=["GET"])
+def get_ranked_replicas(uuid_):
+    """UUID 의 replica 를 harbor 상태(부하, 처리량, heartbeat) 기준으로 정렬"""
+    db = get_db()
+    info = db.get_uuid(uuid_)
+    if info is None:
+        return jsonify({"error": "UUID not found"}), 404
+    return jsonify({"uuid": uuid_, "replicas": rank_harbors(db, info["replicas"])}), 200
+
+@harbor_bp.route("/api/project/<name>/harbors", methods=["GET"])
+def get_ranked_harbors(name):
+    """프로젝트를 관리하는 harbor 들을 상태 기준으로 정렬 (clone 이 source 를 고를 때 사용)"""
+    db = get_db()
+    if not db.project_exists(name):
+        return jsonify({"error": "Project does not exist"}), 404
+    return jsonify(rank_harbors(db, db.harbors_for_project(name))), 200
+
+def apply_heartbeat(db, data):
+    """heartbeat 의 검증 + 기록. (응답 body, status)"""
+    if not isinstance(data, dict) or not _valid_name(data.get("name")):
+        return {"error": "Missing required fields"}, 400
+    if db.get_harbor(data["name"]) is None:
+        return {"error": "Harbor not found"}, 404
+    try:
+        db.update_health(data["name"], time.time(), float(data.get("load", 0)),
+                         int(data.get("active", 0)), int(data.get("capacity", 0)),
+                         int(data.get("free_bytes", 0)), float(data.get("egress_bps", 0)))
+    except (TypeError, ValueError):
+        return {"error": "Invalid heartbeat fields"}, 400
+    return {"status": "ok"}, 200
+
+@harbor_bp.route("/api/heartbeat", methods=["POST"])
+def heartbeat():
+    """
+    harbor 상태 보고.
+    body: {"name", "load", "active", "capacity", "free_bytes", "egress_bps"}
+    """
+    body, status = apply_heartbeat(get_db(), request.get_json())
+    return jsonify(body), status
+
+def apply_register_files(db, data):
+    """
+    register_files 의 검증 + 추가. 호출하는 쪽의 트랜잭션 안에서 실행한다.
+    (응답 body, status, 추가한 row 목록)
+    """
+    if not isinstance(data, dict) or not isinstance(data.get("files"), list):
+        return {"error": "Missing required fields"}, 400, []
+
+    results = []
+    rows = []
+    existing = db.get_uuids([item["uuid"] for item in data["files"]
+                             if isinstance(item, dict) and _valid_name(item.get("uuid"))])
+    project_ok = {}
+    harbor_ok = {}
+    seen = {}   # 이 요청 안에서 먼저 나온 uuid → version
+
+    for item in data["files"]:
+        if not isinstance(item, dict):
+            results.append({"uuid": None, "status": 400, "error": "Invalid file entry"})
+            continue
+        uuid_ = item.get("uuid")
+        project = item.get("project", data.get("project"))
+        harbor_name = item.get("harbor_name", data.get("harbor_name"))
+        version = item.get("version", 1)
+
+        if not uuid_ or not project or not harbor_name:
+            results.append({"uuid": uuid_, "status": 400, "error": "Missing required fields"})
+            continue
+        if not all(_valid_name(v) for v in (uuid_, project, harbor_name)) or not _valid_version(version):
+            results.append({"uuid": uuid_ if _valid_name(uuid_) else None, "status": 400,
+                            "error": "Invalid file entry"})
+            continue
+        if uuid_ in existing or uuid_ in seen:
+            results.append({
+                "uuid": uuid_,
+                "status": 409,
+                "error": "UUID already registered",
+                "registered_project": existing[uuid_]["project"] if uuid_ in existing else project,
+                "registered_version": existing[uuid_]["version"] if uuid_ in existing else seen[uuid_]
+            })
+            continue
+
+        if project not in project_ok:
+            project_ok[project] = db.project_exists(project)
+        if not project_ok[project]:
+            results.append({"uuid": uuid_, "status": 404, "error": "Project does not exist"})
+            continue
+
+        if (harbor_name, project) not in harbor_ok:
+            harbor_ok[(harbor_name, project)] = db.harbor_manages(harbor_name, project)
+        if not harbor_ok[(harbor_name, project)]:
+            results.append({"uuid": uuid_, "status": 403,
+                            "error": "Harbor does not manage this project"})
+            continue
+
+        seen[uuid_] = version
+        rows.append((uuid_, project, harbor_name, version))
+        results.append({"uuid": uuid_, "status": 200})
+
+    db.add_uuids(rows)
+    return {
+        "status": "Batch processed",
+        "registered": len(rows),
+        "failed": len(results) - len(rows),
+        "results": results
+    }, 200, rows
+
+def log_registered_batch(db, data, rows):
+    """커밋된 뒤: 로그 + 복제 시작"""
+    if not rows:
+        return
+    write_log(f"file-registration batch: count={len(rows)} project={data.get('project')} "
+              f"harbor={data.get('harbor_name')}", "file-batch-registered",
+              project=data.get("project"), harbor=data.get("harbor_name"), count=len(rows))
+    for uuid_, project, harbor_name, version in rows:
+        record_event("file-version-added", project=project, uuid=uuid_,
+                     file=placement_key(uuid_), harbor=harbor_name, version=version)
+    _wake_replicator(db, {row[1] for row in rows})
+
+@harbor_bp.route("/api/register_files", methods=["POST"])
+def register_files():
+    """
+    여러 UUID 를 한 번에 등록한다.
+    body: {"project": ..., "harbor_name": ..., "files": [{"uuid": ..., "version": 1}, ...]}
+    각 항목에 project / harbor_name 이 있으면 상위 값 대신 사용한다.
+    유효한 항목은 하나의 트랜잭션으로 커밋되고, 항목별 결과가 반환된다.
+    """
+    data = request.get_json()
+    db = get_db()
+    with db.transaction():
+        body, status, rows = apply_register_files(db, data)
+    log_registered_batch(db, data, rows)
+    return jsonify(body), status
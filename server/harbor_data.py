@@ -0,0 +1,343 @@
+# server/harbor_data.py
+# harbor 데몬의 다운로드 경로 (cedge clone 이 사용)
+#
+#   GET/HEAD /files/<uuid>        파일 manifest (경로, 크기, 해시, chunk 목록)
+#   GET/HEAD /files/<uuid>/data   파일 전체 내용 (chunk 를 이어 붙여 전송)
+#   GET/HEAD /chunks/<sha256>     chunk 하나
+#
+# - 내용이 해시로 정해지므로 ETag 는 해시이고, If-None-Match 가 맞으면 304 를 돌려준다
+# - Range: bytes=a-b / a- / -n (단일 범위) 를 지원한다. 여러 범위는 전체(200)로 응답
+# - 파일 항목은 요청마다 harbor DB(SQLite)에서 uuid 인덱스로 찾는다 (push / 복제가 쓰는 동안에도 막히지 않는다)
+# - 원본 그대로 저장된 chunk(.raw)는 socket.sendfile 로 커널에서 바로 보낸다 (복사 없음)
+# - 클라이언트 IP 별 전송 속도 제한 (같은 IP 의 연결들이 어느 worker 에 붙든 한도를 나눠 쓴다)
+# - 보낸 바이트/처리 중인 연결 수를 worker 프로세스들이 공유하는 카운터에 센다 (heartbeat 용)
+# - keep-alive 연결은 IDLE_TIMEOUT 초 동안 다음 요청이 없거나, 스레드를 기다리는 연결이 생기면 닫는다
+#   (쉬고 있는 연결이 스레드 풀을 붙잡아 새 연결이 밀리지 않도록)
+#
+# 그 밖의 요청(업로드 세션 등)은 Flask 앱으로 넘긴다.
+import os
+import re
+import json
+import time
+import hashlib
+import select
+import multiprocessing
+from wsgiref.simple_server import WSGIRequestHandler, ServerHandler
+
+from harbor_main import get_harbor_db, open_chunk_store
+
+SEND_SLICE = 256 << 10    # 속도 제한이 있을 때 한 번에 보내는 크기
+RATE_SLOTS = 4096         # 속도 제한 상태를 둘 수 있는 클라이언트 IP 수 (동시에 받는 IP 수보다 넉넉하게)
+IDLE_TIMEOUT = 15         # keep-alive 연결이 다음 요청을 기다리는 최대 시간(초), 소켓 timeout 으로도 쓴다
+IDLE_POLL = 0.25          # 다음 요청을 기다리는 동안 밀린 연결이 있는지 보는 간격(초)
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class RateLimiter:
+    """
+    클라이언트 IP 별 전송 속도 제한. worker 프로세스들이 같은 상태를 쓴다 (fork 전에 만들어야 공유된다).
+    IP 마다 '다음 바이트를 보낼 수 있는 시각'을 두고, 보낼 양만큼 뒤로 미룬다.
+    시각은 공유 메모리의 고정 크기 표(slots 칸)에 IP 해시로 자리를 잡아 두고, 이미 지난 칸은 다른 IP 가 다시 쓴다.
+    time.monotonic 은 프로세스끼리 같은 시계라서 그대로 비교할 수 있다.
+    """
+
+    PROBE = 16    # 자리를 찾을 때 살펴보는 칸 수. 모두 차 있으면 첫 칸을 같이 쓴다 (한도가 더 빡빡해질 뿐)
+
+    def __init__(self, rate, slots=RATE_SLOTS):
+        self.rate = rate
+        self.lock = multiprocessing.Lock()
+        self.keys = multiprocessing.Array("q", slots, lock=False)
+        self.next_free = multiprocessing.Array("d", slots, lock=False)
+
+    @staticmethod
+    def _key(client):
+        digest = hashlib.blake2b(client.encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, "little", signed=True) or 1    # 0 은 빈 칸
+
+    def _slot(self, key, now):
+        """lock 안에서 호출. key 의 칸 번호 (없으면 빈 칸이나 지난 칸을 잡는다)"""
+        size = len(self.keys)
+        first = key % size
+        free = None
+        for i in range(self.PROBE):
+            slot = (first + i) % size
+            if self.keys[slot] == key:
+                return slot
+            if free is None and (self.keys[slot] == 0 or self.next_free[slot] <= now):
+                free = slot
+        slot = first if free is None else free
+        if self.keys[slot] != key:
+            self.keys[slot] = key
+            self.next_free[slot] = now
+        return slot
+
+    def wait(self, client, nbytes):
+        if not self.rate:
+            return
+        key = self._key(client)
+        with self.lock:
+            now = time.monotonic()
+            slot = self._slot(key, now)
+            start = max(now, self.next_free[slot])
+            self.next_free[slot] = start + nbytes / self.rate
+        if start > now:
+            time.sleep(start - now)
+
+
+class Metrics:
+    """
+    worker 프로세스들이 함께 쓰는 카운터 (fork 전에 만들어야 공유된다).
+    bytes_sent, requests 는 누적값이고 active 는 지금 열려 있는 연결 수.
+    """
+
+    def __init__(self):
+        self.bytes_sent = multiprocessing.Value("q", 0)
+        self.requests = multiprocessing.Value("q", 0)
+        self.active = multiprocessing.Value("i", 0)
+
+    @staticmethod
+    def add(counter, n):
+        with counter.get_lock():
+            counter.value += n
+
+    def snapshot(self):
+        return {"bytes_sent": self.bytes_sent.value, "requests": self.requests.value,
+                "active": self.active.value}
+
+
+def parse_range(header, size):
+    """(start, end) — end 는 포함. 헤더가 없거나 지원하지 않는 형식이면 None, 범위 밖이면 False"""
+    if not header:
+        return None
+    m = _RANGE_RE.match(header.strip())
+    if not m or (not m.group(1) and not m.group(2)):
+        return None
+    if not m.group(1):
+        length = int(m.group(2))
+        if length == 0:
+            return False
+        return max(0, size - length), size - 1
+    start = int(m.group(1))
+    end = int(m.group(2)) if m.group(2) else size - 1
+    if start >= size or end < start:
+        return False
+    return start, min(end, size - 1)
+
+
+class HarborRequestHandler(WSGIRequestHandler):
+    """데이터 요청은 직접 처리하고(keep-alive), 나머지는 WSGI 앱으로 넘긴다"""
+
+    protocol_version = "HTTP/1.1"
+    server_version = "CedgeHarbor/1.0"
+    timeout = IDLE_TIMEOUT    # 요청 중간에 멈춘 클라이언트도 이 시간이 지나면 끊는다
+
+    def handle(self):
+        metrics = self.server.metrics
+        metrics.add(metrics.active, 1)
+        try:
+            self.close_connection = True
+            self.handle_one_request()
+            while not self.close_connection and self.wait_next_request():
+                self.handle_one_request()
+        finally:
+            metrics.add(metrics.active, -1)
+
+    def wait_next_request(self):
+        """
+        다음 요청이 오면 True. IDLE_TIMEOUT 이 지나거나 이 worker 에 스레드를 기다리는 연결이 있으면
+        False (연결을 닫고 스레드를 내준다. 클라이언트는 새 연결로 다시 요청한다)
+        """
+        waiting = getattr(self.server, "has_waiting", lambda: False)
+        deadline = time.monotonic() + IDLE_TIMEOUT
+        while not waiting():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            try:
+                readable, _, _ = select.select([self.connection], [], [], min(IDLE_POLL, remaining))
+            except (OSError, ValueError):
+                return False
+            if readable:
+                return True
+        return False
+
+    def handle_one_request(self):
+        try:
+            self.raw_requestline = self.rfile.readline(65537)
+        except (ConnectionError, TimeoutError):
+            self.close_connection = True
+            return
+        if not self.raw_requestline:
+            self.close_connection = True
+            return
+        if len(self.raw_requestline) > 65536:
+            self.requestline = self.request_version = self.command = ""
+            self.send_error(414)
+            return
+        if not self.parse_request():
+            return
+
+        self.server.metrics.add(self.server.metrics.requests, 1)
+        try:
+            if self.command in ("GET", "HEAD") and self.serve_data():
+                return
+        except (ConnectionError, TimeoutError):
+            self.close_connection = True
+            return
+
+        # wsgiref 는 HTTP/1.0 으로 응답하므로 이 연결은 닫는다
+        self.close_connection = True
+        handler = ServerHandler(self.rfile, self.wfile, self.get_stderr(), self.get_environ(),
+                                multithread=True)
+        handler.request_handler = self
+        handler.run(self.server.get_app())
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    # ---------- 데이터 경로 ----------
+
+    def serve_data(self):
+        """처리했으면 True, 데이터 경로가 아니면 False"""
+        parts = self.path.split("?", 1)[0].strip("/").split("/")
+        if len(parts) == 2 and parts[0] == "chunks":
+            self.serve_chunk(parts[1])
+        elif len(parts) in (2, 3) and parts[0] == "files":
+            entry, newer = get_harbor_db().lookup(parts[1])
+            if entry is None:
+                if newer:
+                    self.send_json(410, {"error": "Superseded by a newer version",
+                                         "superseded_by": newer})
+                else:
+                    self.send_json(404, {"error": "File not found"})
+            elif len(parts) == 2:
+                self.serve_manifest(entry)
+            elif parts[2] == "data":
+                self.serve_file(entry)
+            else:
+                return False
+        else:
+            return False
+        return True
+
+    def send_json(self, code, body, etag=None):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        if etag:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(data)
+
+    def not_modified(self, etag):
+        if etag in [t.strip() for t in self.headers.get("If-None-Match", "").split(",")]:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return True
+        return False
+
+    def serve_manifest(self, entry):
+        etag = f'"m-{entry["uuid"]}"'
+        if self.not_modified(etag):
+            return
+        self.send_json(200, {
+            "uuid": entry["uuid"],
+            "base_uuid": entry.get("base_uuid"),
+            "path": entry["path"],
+            "version": entry.get("version", 1),
+            "size": entry["size"],
+            "hash": entry["hash"],
+            "chunks": entry["chunks"]
+        }, etag)
+
+    def serve_chunk(self, chunk_hash):
+        store = self.server.store
+        if len(chunk_hash) != 64 or not store.has(chunk_hash):
+            self.send_json(404, {"error": "Chunk not found"})
+            return
+        try:
+            size = os.path.getsize(store.raw_path(chunk_hash))
+            segments = [(store.raw_path(chunk_hash), 0, size)]
+        except OSError:
+            # 예전 형식(압축)으로 저장된 chunk 는 풀어서 보낸다
+            data = store.get(chunk_hash)
+            size = len(data)
+            segments = [(data, 0, size)]
+        self.send_segments(f'"{chunk_hash}"', size, segments)
+
+    def serve_file(self, entry):
+        store = self.server.store
+        segments = []
+        for chunk_hash, size in entry["chunks"]:
+            raw = store.raw_path(chunk_hash)
+            segments.append((raw if os.path.exists(raw) else store.get(chunk_hash), 0, size))
+        self.send_segments(f'"{entry["hash"]}"', entry["size"], segments)
+
+    def send_segments(self, etag, size, segments):
+        """segments: (경로 또는 bytes, offset, length) 목록. Range 에 해당하는 부분만 보낸다"""
+        if self.not_modified(etag):
+            return
+        rng = parse_range(self.headers.get("Range"), size)
+        if rng is False:
+            self.send_response(416)
+            self.send_header("Content-Range", f"bytes */{size}")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        start, end = rng if rng else (0, size - 1)
+        self.send_response(206 if rng else 200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(end - start + 1))
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "public, max-age=31536000, immutable")
+        if rng:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        self.end_headers()
+        if self.command == "HEAD" or size == 0:
+            return
+
+        # 요청 범위를 segment 단위로 잘라서 보낸다
+        pos = 0
+        for source, offset, length in segments:
+            lo = max(start, pos)
+            hi = min(end + 1, pos + length)
+            if lo < hi:
+                self.send_source(source, offset + lo - pos, hi - lo)
+            pos += length
+            if pos > end:
+                break
+
+    def send_source(self, source, offset, count):
+        self.server.metrics.add(self.server.metrics.bytes_sent, count)
+        limiter = self.server.limiter
+        client = self.client_address[0]
+        step = SEND_SLICE if limiter.rate else count
+
+        if isinstance(source, bytes):
+            view = memoryview(source)
+            for i in range(offset, offset + count, step):
+                n = min(step, offset + count - i)
+                limiter.wait(client, n)
+                self.wfile.write(view[i:i + n])
+            return
+
+        with open(source, "rb") as f:
+            for i in range(offset, offset + count, step):
+                n = min(step, offset + count - i)
+                limiter.wait(client, n)
+                self.connection.sendfile(f, i, n)
+
+
+def attach_data_plane(server, rate_limit=0, verbose=False):
+    """WSGIServer 에 데이터 경로 처리에 필요한 상태를 붙인다"""
+    server.store = open_chunk_store()
+    server.limiter = RateLimiter(rate_limit)
+    server.metrics = Metrics()
+    server.verbose = verbose
+    return server
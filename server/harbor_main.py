@@ -1,38 +1,54 @@
 import os
-import json
+import sys
+import fcntl
 import argparse
 import uuid
 import requests
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.chunkstore import ChunkStore
+from common.harbor_db import HarborDB
+from common.paths import clean_relpath
 
 # 🔧 Harbor 로컬 정보 저장 경로
 HARBOR_DIR = os.path.join(".cedge", "harbor")
-HARBOR_DB = os.path.join(HARBOR_DIR, "harbor_db.json")
+HARBOR_DB = os.path.join(HARBOR_DIR, "harbor_db.sqlite3")
+LEGACY_HARBOR_DB = os.path.join(HARBOR_DIR, "harbor_db.json")
+HARBOR_OBJECTS = os.path.join(HARBOR_DIR, "objects")   # content-addressed chunk 저장소 (원본 그대로, sendfile 용)
 HOST_URL = "http://localhost:8000"
-
-# 🔧 로컬 Harbor DB 초기화
-def ensure_harbor_db():
-    if not os.path.exists(HARBOR_DIR):
-        os.makedirs(HARBOR_DIR)
-    if not os.path.exists(HARBOR_DB):
-        with open(HARBOR_DB, "w") as f:
-            json.dump({"project": "", "harbor_name": "", "registered_files": {}}, f)
-
-def load_harbor_db():
-    ensure_harbor_db()
-    with open(HARBOR_DB, "r") as f:
-        return json.load(f)
-
-def save_harbor_db(db):
-    with open(HARBOR_DB, "w") as f:
-        json.dump(db, f, indent=2)
+BATCH_SIZE = 1000       # /api/register_files 한 번에 보낼 UUID 수
+MAX_IN_FLIGHT = 4       # 동시에 전송 중인 batch 수
+
+# 🔧 로컬 Harbor DB (common/harbor_db.py, 기존 harbor_db.json 은 처음 열 때 옮겨온다)
+_db = None
+
+def get_harbor_db():
+    # fork 한 worker 는 부모의 SQLite 커넥션을 쓰면 안 되므로 프로세스마다 새로 연다
+    global _db
+    if _db is None or _db.pid != os.getpid():
+        os.makedirs(HARBOR_DIR, exist_ok=True)
+        _db = HarborDB(HARBOR_DB, legacy_json=LEGACY_HARBOR_DB)
+    return _db
+
+@contextmanager
+def file_lock(path):
+    # harbor 데몬이 여러 프로세스로 실행될 수 있으므로 파일 잠금(flock)을 사용한다
+    with open(path, "a") as fh:
+        fcntl.flock(fh, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fh, fcntl.LOCK_UN)
+
+def open_chunk_store():
+    return ChunkStore(HARBOR_OBJECTS, compress=False)
 
 # 🔧 Harbor 초기 등록 (host에 관리자로 등록됨)
 def init_harbor(project, harbor_name, url="http://localhost:9000"):
-    db = load_harbor_db()
-    db["project"] = project
-    db["harbor_name"] = harbor_name
-    db["registered_files"] = {}
-    save_harbor_db(db)
+    get_harbor_db().init(project, harbor_name)
 
     # host에 등록 요청
     res = requests.post(f"{HOST_URL}/api/register_harbor", json={
@@ -42,41 +58,117 @@ def init_harbor(project, harbor_name, url="http://localhost:9000"):
     })
     print(f"[HOST RESPONSE] {res.status_code}: {res.text}")
 
-# 🔧 파일 등록
-def register_file(filepath):
-    db = load_harbor_db()
-    project = db.get("project")
-    harbor_name = db.get("harbor_name")
+# 🔧 파일 등록 (파일 또는 디렉토리)
+def iter_files(path):
+    if os.path.isfile(path):
+        yield path
+        return
+    for dirpath, dirnames, filenames in os.walk(path):
+        # .cedge 등 숨김 폴더는 제외
+        dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+        for fname in filenames:
+            yield os.path.join(dirpath, fname)
+
+def make_session(pool_size=MAX_IN_FLIGHT):
+    # keep-alive 커넥션을 재사용하는 세션
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def post_batch(session, project, harbor_name, batch):
+    try:
+        res = session.post(f"{HOST_URL}/api/register_files", json={
+            "project": project,
+            "harbor_name": harbor_name,
+            "files": [{"uuid": item["uuid"], "version": item.get("version", 1)} for item in batch]
+        })
+    except requests.RequestException as e:
+        return batch, None, str(e)
+    if res.status_code != 200:
+        return batch, None, f"{res.status_code}, {res.text}"
+    return batch, res.json().get("results", []), None
+
+def register_file(filepath, batch_size=BATCH_SIZE, max_in_flight=MAX_IN_FLIGHT):
+    db = get_harbor_db()
+    info = db.info()
+    project = info["project"]
+    harbor_name = info["harbor_name"]
 
     if not project or not harbor_name:
         print("❌ harbor is not initialized. Run `init` first.")
         return
 
-    abs_path = os.path.abspath(filepath)
-    if abs_path in db["registered_files"]:
-        print(f"⚠️  File already registered: {filepath}")
+    if not os.path.exists(filepath):
+        print(f"❌ File not found: {filepath}")
         return
 
-    file_uuid = str(uuid.uuid4())
-    db["registered_files"][abs_path] = {
-        "uuid": file_uuid,
-        "filename": os.path.basename(filepath)
-    }
-    save_harbor_db(db)
-
-    # host에 uuid 등록 요청
-    res = requests.post(f"{HOST_URL}/api/register_file", json={
-        "uuid": file_uuid,
-        "project": project,
-        "harbor_name": harbor_name
-    })
-
-    if res.status_code == 200:
-        print(f"✅ Registered: {filepath} → UUID: {file_uuid}")
-    else:
-        print(f"❌ Failed to register with host: {res.status_code}, {res.text}")
+    # 파일 내용을 chunk 로 나눠 저장 (이미 있는 chunk 는 다시 쓰지 않음)
+    store = open_chunk_store()
+    pending = []
+    total_bytes = 0
+    new_bytes = 0
+    for path in iter_files(filepath):
+        abs_path = os.path.abspath(path)
+        try:
+            # manifest 의 path 는 harbor 폴더(= 프로젝트 루트) 기준 상대 경로여야 한다
+            rel_path = clean_relpath(os.path.relpath(abs_path).replace(os.sep, "/"))
+        except ValueError:
+            print(f"❌ harbor 폴더 밖의 파일은 등록할 수 없습니다: {path}")
+            continue
+        if db.has_path(rel_path):
+            print(f"⚠️  File already registered: {path}")
+            continue
+        manifest, written = store.store_file(path)
+        total_bytes += manifest["size"]
+        new_bytes += written
+        pending.append({
+            "path": path,
+            "rel_path": rel_path,
+            "uuid": str(uuid.uuid4()),
+            "manifest": manifest
+        })
+
+    if not pending:
+        return
+    print(f"🧩 chunk 저장: {total_bytes:,} bytes 중 {new_bytes:,} bytes 신규 (나머지는 중복 제거)")
+
+    batches = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+    registered = []
+
+    # batch 들을 하나의 keep-alive 세션으로 동시에 전송
+    session = make_session(max_in_flight)
+    with ThreadPoolExecutor(max_workers=max_in_flight) as pool:
+        futures = [pool.submit(post_batch, session, project, harbor_name, b) for b in batches]
+        for future in futures:
+            batch, results, error = future.result()
+            if error is not None:
+                print(f"❌ Failed to register with host: {error}")
+                continue
+            status = {r.get("uuid"): r for r in results}
+            for item in batch:
+                r = status.get(item["uuid"], {})
+                if r.get("status") == 200:
+                    registered.append({"uuid": item["uuid"], "path": item["rel_path"],
+                                       **item["manifest"]})
+                    print(f"✅ Registered: {item['path']} → UUID: {item['uuid']}")
+                else:
+                    print(f"❌ Failed to register {item['path']}: {r.get('status')}, {r.get('error')}")
+
+    # 로컬 harbor DB 에는 마지막에 한 트랜잭션으로 기록한다
+    # (그동안 push commit / 복제가 같은 경로에 새 버전을 썼으면 record_files 가 버전을 비교한다)
+    if registered:
+        db.record_files(registered)
+    print(f"\n📦 {len(registered)}/{len(pending)} files registered")
 
 # ✨ CLI
+def positive_int(value):
+    n = int(value)
+    if n < 1:
+        raise argparse.ArgumentTypeError(f"must be a positive integer: {value}")
+    return n
+
 def main():
     parser = argparse.ArgumentParser()
     subparsers = parser.add_subparsers(dest="command")
@@ -87,14 +179,17 @@ def main():
     init_parser.add_argument("--url", default="http://localhost:9000")
 
     register_parser = subparsers.add_parser("register-file")
-    register_parser.add_argument("filepath")
+    register_parser.add_argument("filepath", help="File or directory to register")
+    register_parser.add_argument("--batch-size", type=positive_int, default=BATCH_SIZE)
+    register_parser.add_argument("--jobs", type=positive_int, default=MAX_IN_FLIGHT,
+                                 help="Number of batches in flight")
 
     args = parser.parse_args()
 
     if args.command == "init":
         init_harbor(args.project, args.name, args.url)
     elif args.command == "register-file":
-        register_file(args.filepath)
+        register_file(args.filepath, args.batch_size, args.jobs)
     else:
         parser.print_help()
 
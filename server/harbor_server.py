@@ -0,0 +1,157 @@
+# server/harbor_server.py
+# harbor 데몬: 저장된 파일/chunk 를 내보내고(cedge clone), cedge push 업로드 세션과
+# host 의 복제 요청을 받는다
+# (.cedge/harbor 가 있는 폴더에서 실행, 먼저 `harbor_main.py init` 필요)
+#
+# 동시 처리 모델
+#   --workers N : 같은 listen 소켓을 공유하는 프로세스 N 개 (fork)
+#   --threads M : 프로세스마다 연결을 처리하는 스레드 M 개. keep-alive 연결은 요청 사이에도 스레드를
+#                 쥐고 있지만, 스레드를 기다리는 연결이 생기거나 IDLE_TIMEOUT(harbor_data.py)이 지나면 닫는다
+#   --rate-limit : 클라이언트 IP 별 초당 전송 바이트 (0 이면 제한 없음, 모든 worker 가 함께 센다)
+#
+# 상태 보고
+#   --heartbeat S : S 초마다 host 의 /api/heartbeat 로 부하(처리 중인 연결 / 전체 스레드),
+#                   남은 디스크, 최근 전송 속도를 보낸다 (0 이면 보내지 않음).
+#                   host 는 이 값으로 harbor 순위를 매기고 죽은 harbor 를 배치/복제에서 뺀다
+import os
+import time
+import shutil
+import signal
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from wsgiref.simple_server import WSGIServer
+
+import requests
+from flask import Flask
+from upload_api import upload_bp
+from replica_api import replica_bp
+from harbor_data import HarborRequestHandler, attach_data_plane
+from harbor_main import HARBOR_DIR, HOST_URL, get_harbor_db
+
+app = Flask(__name__)
+app.register_blueprint(upload_bp)
+app.register_blueprint(replica_bp)
+
+DEFAULT_THREADS = 64
+HEARTBEAT_INTERVAL = 10
+
+
+class HarborServer(WSGIServer):
+    """연결마다 스레드를 새로 만들지 않고 고정 크기 스레드 풀에서 처리한다"""
+
+    request_queue_size = 1024
+
+    def __init__(self, address, threads=DEFAULT_THREADS):
+        super().__init__(address, HarborRequestHandler)
+        self.threads = threads
+        self.pool = None
+        self.waiting = 0      # 받았지만 아직 스레드가 잡히지 않은 연결 수
+        self.waiting_lock = threading.Lock()
+
+    def has_waiting(self):
+        return self.waiting > 0
+
+    def process_request(self, request, client_address):
+        if self.pool is None:
+            # fork 이후 각 worker 에서 만든다
+            self.pool = ThreadPoolExecutor(max_workers=self.threads)
+        with self.waiting_lock:
+            self.waiting += 1
+        self.pool.submit(self._process, request, client_address)
+
+    def _process(self, request, client_address):
+        with self.waiting_lock:
+            self.waiting -= 1
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+
+def send_heartbeats(metrics, capacity, host=HOST_URL, interval=HEARTBEAT_INTERVAL):
+    """interval 초마다 host 에 상태를 보고한다. host 가 응답하지 않아도 계속 시도한다"""
+    session = requests.Session()
+    name = None
+    last = metrics.snapshot()
+    last_time = time.monotonic()
+    while True:
+        time.sleep(interval)
+        now = time.monotonic()
+        current = metrics.snapshot()
+        egress = (current["bytes_sent"] - last["bytes_sent"]) / max(now - last_time, 1e-6)
+        last, last_time = current, now
+
+        name = name or get_harbor_db().info()["harbor_name"]
+        if not name:
+            continue
+        try:
+            session.post(f"{host}/api/heartbeat", json={
+                "name": name,
+                "load": round(min(1.0, current["active"] / capacity), 4),
+                "active": current["active"],
+                "capacity": capacity,
+                "free_bytes": shutil.disk_usage(HARBOR_DIR).free,
+                "egress_bps": round(egress)
+            }, timeout=interval)
+        except requests.RequestException:
+            pass
+
+
+def serve(bind="0.0.0.0", port=9000, workers=1, threads=DEFAULT_THREADS, rate_limit=0,
+          verbose=False, heartbeat=HEARTBEAT_INTERVAL):
+    server = HarborServer((bind, port), threads)
+    server.set_app(app)
+    attach_data_plane(server, rate_limit, verbose)
+
+    children = []
+    parent = True
+    for _ in range(workers - 1):
+        pid = os.fork()
+        if pid == 0:
+            children = []
+            parent = False
+            break
+        children.append(pid)
+
+    if children:
+        def stop(signum, frame):
+            for pid in children:
+                os.kill(pid, signal.SIGTERM)
+            raise SystemExit(0)
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+
+    # heartbeat 는 부모 프로세스 하나만 보낸다 (카운터는 worker 들이 공유)
+    if heartbeat > 0 and parent:
+        threading.Thread(target=send_heartbeats,
+                         args=(server.metrics, workers * threads, HOST_URL, heartbeat),
+                         daemon=True).start()
+
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bind", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Number of worker processes")
+    parser.add_argument("--threads", type=int, default=DEFAULT_THREADS,
+                        help="Connection threads per worker")
+    parser.add_argument("--rate-limit", type=int, default=0,
+                        help="Per-client bandwidth limit in bytes/sec (0 = unlimited)")
+    parser.add_argument("--heartbeat", type=float, default=HEARTBEAT_INTERVAL,
+                        help="Seconds between health reports to the host (0 = disabled)")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args()
+
+    print(f"⚓ CEDGE Harbor 서버 실행 중... (http://localhost:{args.port}, "
+          f"workers={args.workers}, threads={args.threads})")
+    serve(args.bind, args.port, args.workers, args.threads, args.rate_limit, args.verbose,
+          args.heartbeat)
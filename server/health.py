@@ -0,0 +1,65 @@
+# server/health.py
+# harbor heartbeat 를 바탕으로 replica 순위를 매긴다
+#
+# weight = 여유(1 - load) × 상대 처리 능력(peak egress / 가장 빠른 harbor 의 peak)
+# HEARTBEAT_TIMEOUT 동안 heartbeat 가 없으면 죽은 것으로 보고 맨 뒤로 보낸다.
+# heartbeat 를 한 번도 보내지 않은 harbor(예전 버전)는 상태를 모르므로 보통(weight 0.5)으로 본다.
+import time
+
+HEARTBEAT_TIMEOUT = 30
+MIN_WEIGHT = 0.05
+UNKNOWN_WEIGHT = 0.5
+MIN_FREE_BYTES = 1 << 30    # 이보다 여유 공간이 적으면 복제 대상에서 뺀다
+
+
+def harbor_status(info, fastest, now):
+    if info is None:
+        return {"alive": None, "weight": UNKNOWN_WEIGHT}
+    alive = now - info["updated_at"] <= HEARTBEAT_TIMEOUT
+    headroom = max(MIN_WEIGHT, 1 - info["load"])
+    capacity = info["peak_egress_bps"] / fastest if fastest else 1.0
+    weight = headroom * max(MIN_WEIGHT, capacity) if alive else 0.0
+    return {
+        "alive": alive,
+        "weight": round(weight, 4),
+        "load": info["load"],
+        "active": info["active"],
+        "free_bytes": info["free_bytes"],
+        "egress_bps": info["egress_bps"],
+        "peak_egress_bps": info["peak_egress_bps"],
+        "last_heartbeat": info["updated_at"]
+    }
+
+
+def rank_harbors(db, names, now=None):
+    """names 를 weight 높은 순으로 정렬한 [{name, url, alive, weight, ...}] (죽은 harbor 는 맨 뒤)"""
+    now = now or time.time()
+    health = db.harbor_health()
+    fastest = max((health[n]["peak_egress_bps"] for n in names
+                   if n in health and now - health[n]["updated_at"] <= HEARTBEAT_TIMEOUT), default=0)
+    ranked = []
+    for name in names:
+        harbor = db.get_harbor(name)
+        if harbor is None:
+            continue
+        status = harbor_status(health.get(name), fastest, now)
+        ranked.append({"name": name, "url": harbor["url"], **status})
+    ranked.sort(key=lambda h: (h["alive"] is False, -h["weight"]))
+    for i, h in enumerate(ranked):
+        h["rank"] = i + 1
+    return ranked
+
+
+def live_harbors(db, names, now=None):
+    """죽지 않은 harbor (상태를 모르는 harbor 포함). 배치/복제 대상 계산에 쓴다"""
+    now = now or time.time()
+    health = db.harbor_health()
+    return [n for n in names
+            if n not in health or now - health[n]["updated_at"] <= HEARTBEAT_TIMEOUT]
+
+
+def writable_harbors(db, names, now=None):
+    """live 이면서 여유 공간이 충분한 harbor"""
+    health = db.harbor_health()
+    return [n for n in live_harbors(db, names, now)
+            if n not in health or health[n]["free_bytes"] >= MIN_FREE_BYTES]
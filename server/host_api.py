@@ -1,6 +1,16 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify
+import gzip
+import json
 import uuid
-from utils import load_db, save_db, write_log
+import zlib
+import hashlib
+from utils import get_db, get_journal, write_log
+from common.merkle import parse_prefixes, DEPTH
+
+LOG_LIMIT = 100            # /api/log 기본 이벤트 수
+MANIFEST_PAGE = 1000        # JSON 페이지 기본 크기
+MANIFEST_MAX_PAGE = 10000
+NDJSON_BATCH = 1000         # NDJSON 스트림에서 DB 를 한 번에 읽는 레코드 수
 
 host_bp = Blueprint('host', __name__)
 
@@ -11,30 +21,150 @@ def create_project():
     if not name:
         return jsonify({"error": "Project name required"}), 400
 
-    db = load_db()
-    if name in db["projects"]:
-        return jsonify({"error": "Project already exists"}), 409
-
+    db = get_db()
     new_uuid = str(uuid.uuid4())
-    db["projects"][name] = {
-        "uuid": new_uuid,
-        "files": []
-    }
+    with db.transaction():
+        if db.project_exists(name):
+            return jsonify({"error": "Project already exists"}), 409
+        db.create_project(name, new_uuid)
 
-    save_db(db)
-    write_log(f"project-created: {name} uuid={new_uuid}")
+    write_log(f"project-created: {name} uuid={new_uuid}", "project-created",
+              project=name, uuid=new_uuid)
     return jsonify({"status": "Project created", "uuid": new_uuid}), 200
 
 @host_bp.route("/api/project/<name>", methods=["GET"])
 def get_project(name):
-    db = load_db()
-    return jsonify(db["projects"].get(name, {}))
+    db = get_db()
+    return jsonify(db.get_project(name) or {})
+
+@host_bp.route("/api/log", methods=["GET"])
+def get_log():
+    """
+    host 저널 조회 (최신순).
+      project / uuid / file(base_uuid) / type : 색인으로 찾는 조건
+      since / until : unix 시각, limit : 최대 이벤트 수 (기본 100)
+    """
+    try:
+        since = float(request.args["since"]) if "since" in request.args else None
+        until = float(request.args["until"]) if "until" in request.args else None
+        limit = int(request.args.get("limit", LOG_LIMIT))
+    except ValueError:
+        return jsonify({"error": "Invalid since, until or limit"}), 400
+    events = get_journal().query(
+        since=since, until=until, limit=limit, newest_first=True,
+        project=request.args.get("project"), uuid=request.args.get("uuid"),
+        file=request.args.get("file"), type=request.args.get("type"))
+    return jsonify({"events": events}), 200
+
+@host_bp.route("/api/project/<name>/merkle", methods=["GET", "POST"])
+def get_merkle(name):
+    """
+    프로젝트 Merkle tree 의 노드들 (common/merkle.py).
+      GET  ?prefix=<p>&prefix=<q>&harbor=<name>
+      POST {"prefixes": [...], "harbor": <name>}   (한 단계의 노드가 많을 때)
+    harbor 가 없으면 프로젝트 전체 트리, 있으면 host 가 그 harbor 에 있다고 아는 파일들의 트리.
+    응답: {"depth", "nodes": {prefix: {"hash", "children" | "leaves"}}}
+    """
+    db = get_db()
+    if not db.project_exists(name):
+        return jsonify({"error": "Project does not exist"}), 404
+    data = (request.get_json(silent=True) or {}) if request.method == "POST" else {}
+    harbor = data.get("harbor", request.args.get("harbor", ""))
+    prefixes = parse_prefixes(data.get("prefixes") or request.args.getlist("prefix"))
+    if prefixes is None:
+        return jsonify({"error": "Invalid prefixes"}), 400
+    return jsonify({"depth": DEPTH, "nodes": db.merkle_nodes(name, prefixes, harbor)}), 200
 
 @host_bp.route("/api/stats", methods=["GET"])
 def get_stats():
-    db = load_db()
-    return jsonify({
-        "total_projects": len(db["projects"]),
-        "total_uuids": len(db["uuids"]),
-        "total_harbors": len(db["harbors"])
-    })
\ No newline at end of file
+    db = get_db()
+    return jsonify(db.stats())
+
+def _parse_cursor(value):
+    """커서 "<rev>.<seq>" -> (rev, seq)"""
+    if not value:
+        return (0, 0)
+    rev, seq = value.split(".", 1)
+    return (int(rev), int(seq))
+
+def _manifest_record(row):
+    return {"uuid": row["uuid"], "version": row["version"], "harbor_name": row["harbor_name"],
+            "replicas": row["replicas"], "rev": row["rev"]}
+
+def _wants_gzip():
+    return "gzip" in request.headers.get("Accept-Encoding", "")
+
+@host_bp.route("/api/project/<name>/manifest", methods=["GET"])
+def get_manifest(name):
+    """
+    프로젝트 파일 레코드(uuid, version, replica 위치)를 페이지 단위로 반환.
+      since=<revision>  이 revision 이후 바뀐 레코드만 (증분 동기화, 기본 0 = 전체)
+      cursor=<값>       이전 응답의 next_cursor
+      limit=<n>         페이지 크기 (JSON, 1 ~ MANIFEST_MAX_PAGE)
+      format=ndjson     페이지 없이 한 줄에 레코드 하나씩 스트리밍
+                        (첫 줄 {"project", "revision", "since"}, 마지막 줄 {"end": true})
+    응답의 revision 을 저장해 두었다가 다음에 since 로 보내면 바뀐 것만 받는다.
+    Accept-Encoding: gzip 이면 압축하고, If-None-Match 가 맞으면 304.
+    """
+    db = get_db()
+    current = db.project_revision(name)
+    if current is None:
+        return jsonify({"error": "Project does not exist"}), 404
+    project_uuid, revision = current
+    try:
+        since = int(request.args.get("since", 0))
+        after = _parse_cursor(request.args.get("cursor"))
+        limit = int(request.args.get("limit", MANIFEST_PAGE))
+        if limit < 1:
+            raise ValueError(f"limit must be positive: {limit}")
+        limit = min(limit, MANIFEST_MAX_PAGE)
+    except ValueError:
+        return jsonify({"error": "Invalid since, cursor or limit"}), 400
+    ndjson = request.args.get("format") == "ndjson" or \
+        "application/x-ndjson" in request.headers.get("Accept", "")
+
+    # revision 이 같으면 같은 질의의 결과도 같다
+    query = hashlib.sha1(request.query_string + (b"n" if ndjson else b"j")).hexdigest()[:12]
+    etag = f'"{project_uuid[:8]}-r{revision}-{query}"'
+    if etag in [t.strip() for t in request.headers.get("If-None-Match", "").split(",")]:
+        return Response(status=304, headers={"ETag": etag})
+
+    compress = _wants_gzip()
+    headers = {"ETag": etag, "Vary": "Accept-Encoding", "X-Cedge-Revision": str(revision)}
+    if compress:
+        headers["Content-Encoding"] = "gzip"
+
+    if ndjson:
+        def stream():
+            # gzip 스트림을 배치마다 flush 해서 클라이언트가 받는 대로 처리할 수 있게 한다
+            encoder = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+            def emit(lines):
+                data = "".join(json.dumps(line) + "\n" for line in lines).encode("utf-8")
+                return encoder.compress(data) + encoder.flush(zlib.Z_SYNC_FLUSH) if encoder else data
+
+            yield emit([{"project": name, "revision": revision, "since": since}])
+            cursor = after
+            while True:
+                rows = db.manifest_page(name, since, cursor, NDJSON_BATCH)
+                if rows:
+                    yield emit(_manifest_record(r) for r in rows)
+                    cursor = (rows[-1]["rev"], rows[-1]["seq"])
+                if len(rows) < NDJSON_BATCH:
+                    break
+            yield emit([{"end": True}])
+            if encoder:
+                yield encoder.flush()
+        return Response(stream(), mimetype="application/x-ndjson", headers=headers)
+
+    rows = db.manifest_page(name, since, after, limit)
+    next_cursor = f"{rows[-1]['rev']}.{rows[-1]['seq']}" if len(rows) == limit else None
+    body = json.dumps({
+        "project": name,
+        "revision": revision,
+        "since": since,
+        "files": [_manifest_record(r) for r in rows],
+        "next_cursor": next_cursor
+    }).encode("utf-8")
+    if compress:
+        body = gzip.compress(body, 6)
+    return Response(body, mimetype="application/json", headers=headers)
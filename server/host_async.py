@@ -0,0 +1,266 @@
+# server/host_async.py
+# 비동기(ASGI) host
+#
+# Flask 개발 서버에서는 요청마다 스레드가 SQLite 쓰기 트랜잭션을 따로 열기 때문에, harbor 와
+# client 가 수백 개가 되면 heartbeat / 파일 등록이 BEGIN IMMEDIATE 잠금과 커밋 앞에 줄을 선다.
+# 여기서는 /api/* 계약은 그대로 두고 요청을 이렇게 처리한다.
+#
+# - 쓰기 (register_file, register_files, heartbeat): 이벤트 루프에서 큐에 넣으면 writer 스레드 하나가
+#   그 사이 모인 요청들을 한 트랜잭션으로 커밋한다 (group commit). 요청마다 SAVEPOINT 를 두므로
+#   하나가 실패해도 나머지는 커밋되고, 응답은 커밋이 끝난 뒤에 보낸다.
+# - 읽기 (harbor 목록/순위, placement): 메모리의 view(프로젝트, harbor, 관리 관계, heartbeat)로 바로 답한다.
+#   view 는 group commit 뒤(heartbeat)와 이 프로세스가 처리한 다른 쓰기 요청 뒤에 다시 읽는다.
+# - UUID 조회는 reader 스레드에서 SQLite 로 읽는다 (WAL 이므로 쓰기와 동시에 읽는다).
+# - 나머지 (manifest 스트림, merkle, log, 프로젝트/harbor 생성·삭제 ...)는 기존 Flask blueprint 를
+#   WSGI bridge 로 부른다. 응답은 Flask host 와 같다.
+# - 직접 처리하는 route 의 처리 시간과 group commit 크기 / 시간은 /metrics (server/metrics.py) 에 남긴다.
+#
+# uvicorn 이 설치되어 있으면 uvicorn 으로, 없으면 server/asgi.py 의 작은 HTTP 서버로 실행한다.
+import re
+import json
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from asgi import WSGIBridge, run
+from utils import get_db
+from health import rank_harbors
+from harbor_api import (apply_register_file, apply_register_files, apply_heartbeat,
+                        compute_placement, log_registered_file, log_registered_batch)
+from metrics import observe_request
+from common.timings import METRICS
+
+try:
+    import uvicorn
+except ImportError:
+    uvicorn = None
+
+MAX_BATCH = 256         # group commit 한 번에 담는 최대 요청 수
+READ_THREADS = 16       # UUID 조회와 Flask bridge 를 처리하는 스레드 수
+
+
+class HostView:
+    """
+    host DB 의 작은 테이블들(프로젝트, harbor, 관리 관계, heartbeat)의 메모리 사본.
+    HostDB 와 같은 이름의 조회 메서드를 가지므로 rank_harbors / compute_placement 에 그대로 넘긴다.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.reload()
+
+    def reload(self):
+        with METRICS.time("cedge_view_reload_seconds", tables="all"):
+            harbors = {h["name"]: h for h in self.db.list_harbors()}
+            by_project = {}
+            for h in harbors.values():
+                for project in h["manage_project"]:
+                    by_project.setdefault(project, []).append(h["name"])
+            projects = set(self.db.list_projects())
+            health = self.db.harbor_health()
+        self.projects, self.harbors, self.by_project, self.health = \
+            projects, harbors, by_project, health
+
+    def reload_health(self):
+        with METRICS.time("cedge_view_reload_seconds", tables="health"):
+            self.health = self.db.harbor_health()
+
+    def project_exists(self, name):
+        return name in self.projects
+
+    def get_harbor(self, name):
+        return self.harbors.get(name)
+
+    def list_harbors(self):
+        return list(self.harbors.values())
+
+    def harbors_for_project(self, project):
+        return list(self.by_project.get(project, ()))
+
+    def harbor_manages(self, harbor_name, project):
+        return harbor_name in self.by_project.get(project, ())
+
+    def harbor_health(self):
+        return self.health
+
+
+class GroupCommitter:
+    """쓰기 요청을 모아 writer 스레드 하나에서 한 트랜잭션으로 커밋한다"""
+
+    def __init__(self, db, max_batch=MAX_BATCH, on_commit=None):
+        self.db = db
+        self.max_batch = max_batch
+        self.on_commit = on_commit
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="group-commit")
+        self.queue = None
+        self.task = None
+        self.commits = 0
+        self.ops = 0
+
+    async def submit(self, fn, *args):
+        """fn(db, *args) 를 다음 group commit 에서 실행하고 그 결과를 돌려준다"""
+        if self.queue is None:
+            self.queue = asyncio.Queue()
+            self.task = asyncio.get_running_loop().create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((fn, args, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            # 앞의 커밋이 도는 동안 쌓인 요청이 다음 커밋 하나로 묶인다
+            batch = [await self.queue.get()]
+            while len(batch) < self.max_batch and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            try:
+                results = await loop.run_in_executor(self.executor, self._commit, batch)
+            except Exception as e:
+                results = [e] * len(batch)
+            for (_, _, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    def _commit(self, batch):
+        results = []
+        start = time.perf_counter()
+        with self.db.transaction() as conn:
+            for fn, args, _ in batch:
+                conn.execute("SAVEPOINT op")
+                try:
+                    results.append(fn(self.db, *args))
+                except Exception as e:
+                    conn.execute("ROLLBACK TO op")
+                    results.append(e)
+                conn.execute("RELEASE op")
+        self.commits += 1
+        self.ops += len(batch)
+        METRICS.observe("cedge_group_commit_seconds", time.perf_counter() - start)
+        METRICS.observe("cedge_group_commit_batch_size", len(batch))
+        if self.on_commit:
+            self.on_commit()
+        return results
+
+
+def _json(status, body):
+    return status, json.dumps(body).encode("utf-8")
+
+
+class HostApp:
+    """host 의 ASGI 앱. 자주 오는 요청은 직접 처리하고 나머지는 Flask 앱(wsgi_app)에 넘긴다"""
+
+    def __init__(self, wsgi_app, db=None, max_batch=MAX_BATCH, read_threads=READ_THREADS):
+        self.db = db or get_db()
+        self.view = HostView(self.db)
+        self.committer = GroupCommitter(self.db, max_batch, on_commit=self.view.reload_health)
+        self.readers = ThreadPoolExecutor(max_workers=read_threads, thread_name_prefix="host-read")
+        self.bridge = WSGIBridge(wsgi_app, self.readers)
+        # route 는 Flask rule 과 같은 형식으로 적는다 (/metrics 의 label 이 Flask host 와 같도록)
+        routes = [
+            ("POST", "/api/heartbeat", self.heartbeat),
+            ("POST", "/api/register_file", self.register_file),
+            ("POST", "/api/register_files", self.register_files),
+            ("POST", "/api/placement", self.placement),
+            ("GET", "/api/harbors", self.list_harbors),
+            ("GET", "/api/project/<name>/harbors", self.ranked_harbors),
+            ("GET", "/api/uuid/<uuid_>", self.uuid_info),
+            ("GET", "/api/uuid/<uuid_>/replicas", self.uuid_replicas),
+        ]
+        self.routes = [(method, rule, re.compile(re.sub(r"<[^>]+>", "([^/]+)", rule)), handler)
+                       for method, rule, handler in routes]
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                await send({"type": message["type"] + ".complete"})
+                if message["type"] == "lifespan.shutdown":
+                    return
+        if scope["type"] != "http":
+            return
+
+        for method, rule, pattern, handler in self.routes:
+            match = pattern.fullmatch(scope["path"])
+            if match and scope["method"] == method:
+                break
+        else:
+            # 처리 시간은 Flask 앱의 미들웨어(metrics.install)가 잰다
+            await self.bridge(scope, receive, send)
+            if scope["method"] not in ("GET", "HEAD"):
+                # 프로젝트 / harbor 생성·삭제 등이 view 에 보이도록 다시 읽는다
+                await asyncio.get_running_loop().run_in_executor(self.readers, self.view.reload)
+            return
+
+        start = time.perf_counter()
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+        try:
+            data = json.loads(body) if body else None
+        except ValueError:
+            status, payload = _json(400, {"error": "Invalid JSON body"})
+        else:
+            status, payload = await handler(data, *match.groups())
+        await send({"type": "http.response.start", "status": status,
+                    "headers": [(b"content-type", b"application/json"),
+                                (b"content-length", str(len(payload)).encode("latin-1"))]})
+        await send({"type": "http.response.body", "body": payload})
+        observe_request(method, rule, status, time.perf_counter() - start)
+
+    async def _read(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.readers, fn, *args)
+
+    # ---------- 쓰기 (group commit) ----------
+
+    async def heartbeat(self, data):
+        body, status = await self.committer.submit(apply_heartbeat, data)
+        return _json(status, body)
+
+    async def register_file(self, data):
+        body, status, row = await self.committer.submit(apply_register_file, data)
+        if row is not None:
+            log_registered_file(self.view, row)
+        return _json(status, body)
+
+    async def register_files(self, data):
+        body, status, rows = await self.committer.submit(apply_register_files, data)
+        log_registered_batch(self.view, data or {}, rows)
+        return _json(status, body)
+
+    # ---------- 읽기 (view / reader 스레드) ----------
+
+    async def placement(self, data):
+        body, status = compute_placement(self.view, data)
+        return _json(status, body)
+
+    async def list_harbors(self, data):
+        return _json(200, self.view.list_harbors())
+
+    async def ranked_harbors(self, data, name):
+        if not self.view.project_exists(name):
+            return _json(404, {"error": "Project does not exist"})
+        return _json(200, rank_harbors(self.view, self.view.harbors_for_project(name)))
+
+    async def uuid_info(self, data, uuid_):
+        return _json(200, await self._read(self.db.get_uuid, uuid_) or {})
+
+    async def uuid_replicas(self, data, uuid_):
+        info = await self._read(self.db.get_uuid, uuid_)
+        if info is None:
+            return _json(404, {"error": "UUID not found"})
+        return _json(200, {"uuid": uuid_, "replicas": rank_harbors(self.view, info["replicas"])})
+
+
+def serve(wsgi_app, bind="0.0.0.0", port=8000):
+    app = HostApp(wsgi_app)
+    if uvicorn is not None:
+        uvicorn.run(app, host=bind, port=port, log_level="warning")
+    else:
+        run(app, bind, port)
@@ -0,0 +1,221 @@
+# server/loadtest.py
+# host 부하 테스트: 임시 폴더에 host 를 띄우고 여러 client 가 동시에 요청을 보내
+# 초당 처리량과 지연(p50 / p99)을 잰다. --servers 로 Flask host 와 async host 를 차례로 비교한다.
+#
+#   python server/loadtest.py --clients 200 --duration 10 --servers flask,async --json result.json
+#
+# 요청 구성 (client 마다 무작위, --seed 로 고정)
+#   heartbeat 40%, register_file 20%, placement 20%, project harbors 10%, uuid 조회 10%
+# harbor 들은 --harbors 개를 등록만 하고 실제로 띄우지 않는다 (replicator 도 끈다).
+# client 는 --procs 개 프로세스에 나눠 돌고, 각 client 는 keep-alive 연결 하나를 쓴다.
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import socket
+import argparse
+import tempfile
+import threading
+import subprocess
+import http.client
+import multiprocessing
+
+SERVER_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT = "load"
+MIX = [("heartbeat", 40), ("register_file", 20), ("placement", 20), ("harbors", 10), ("uuid", 10)]
+STARTUP_TIMEOUT = 20
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def call(conn, method, path, body=None):
+    """(status, 응답 JSON)"""
+    headers = {"Content-Type": "application/json"} if body is not None else {}
+    conn.request(method, path, json.dumps(body) if body is not None else None, headers)
+    res = conn.getresponse()
+    data = res.read()
+    return res.status, json.loads(data) if data else None
+
+
+def start_host(kind, workdir, port):
+    log = open(os.path.join(workdir, f"host-{kind}.log"), "w")
+    proc = subprocess.Popen([sys.executable, os.path.join(SERVER_DIR, "main.py"), "--server", kind,
+                             "--bind", "127.0.0.1", "--port", str(port), "--no-replicator"],
+                            cwd=workdir, stdout=log, stderr=subprocess.STDOUT)
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"{kind} host 가 시작하지 못했습니다 ({log.name})")
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+            if call(conn, "GET", "/api/harbors")[0] == 200:
+                return proc
+        except OSError:
+            time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError(f"{kind} host 가 {STARTUP_TIMEOUT}초 안에 응답하지 않았습니다")
+
+
+def seed_host(port, harbors):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    call(conn, "POST", "/api/create_project", {"name": PROJECT})
+    for i in range(harbors):
+        # 등록만 하는 harbor (discard 포트). 배치와 순위 계산에는 쓰이지만 연결되지는 않는다
+        call(conn, "POST", "/api/register_harbor",
+             {"name": f"lh{i}", "url": "http://127.0.0.1:9", "manage_project": [PROJECT]})
+
+
+def _client(port, harbors, deadline, seed, samples, lock):
+    rng = random.Random(seed)
+    routes = [name for name, weight in MIX for _ in range(weight)]
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    mine = {}
+    registered = []
+    errors = 0
+    count = 0
+    while time.time() < deadline:
+        route = rng.choice(routes)
+        if route == "heartbeat":
+            args = ("POST", "/api/heartbeat", {
+                "name": f"lh{rng.randrange(harbors)}", "load": round(rng.random(), 3),
+                "active": rng.randrange(64), "capacity": 64, "free_bytes": 1 << 40,
+                "egress_bps": rng.randrange(1 << 27)})
+        elif route == "register_file":
+            uuid_ = f"load{seed}-{count:08x}-1"
+            args = ("POST", "/api/register_file", {"uuid": uuid_, "project": PROJECT,
+                                                   "harbor_name": f"lh{rng.randrange(harbors)}"})
+            registered.append(uuid_)
+        elif route == "placement":
+            args = ("POST", "/api/placement",
+                    {"project": PROJECT, "keys": [f"k{rng.randrange(1 << 20)}" for _ in range(8)]})
+        elif route == "harbors":
+            args = ("GET", f"/api/project/{PROJECT}/harbors", None)
+        else:
+            uuid_ = rng.choice(registered) if registered else "missing-1"
+            args = ("GET", f"/api/uuid/{uuid_}", None)
+        count += 1
+
+        start = time.perf_counter()
+        try:
+            status, _ = call(conn, *args)
+            ok = status < 500
+        except (OSError, http.client.HTTPException, ValueError):
+            conn.close()
+            ok = False
+        elapsed = time.perf_counter() - start
+        if ok:
+            mine.setdefault(route, []).append(elapsed)
+        else:
+            errors += 1
+    conn.close()
+    with lock:
+        for route, values in mine.items():
+            samples.setdefault(route, []).extend(values)
+        samples["_errors"] = samples.get("_errors", 0) + errors
+
+
+def _worker(port, harbors, deadline, seeds, queue):
+    samples = {}
+    lock = threading.Lock()
+    threads = [threading.Thread(target=_client, args=(port, harbors, deadline, s, samples, lock))
+               for s in seeds]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    queue.put(samples)
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+def summarize(samples, duration):
+    def stats(values):
+        return {"count": len(values), "rps": round(len(values) / duration, 1),
+                "p50_ms": round(percentile(values, 0.50) * 1000, 2),
+                "p99_ms": round(percentile(values, 0.99) * 1000, 2)}
+    everything = [v for route, values in samples.items() if route != "_errors" for v in values]
+    if not everything:
+        return {"count": 0, "rps": 0, "errors": samples.get("_errors", 0), "routes": {}}
+    result = stats(everything)
+    result["errors"] = samples.get("_errors", 0)
+    result["routes"] = {route: stats(values) for route, values in sorted(samples.items())
+                        if route != "_errors"}
+    return result
+
+
+def run_load(port, clients, procs, duration, harbors, seed):
+    deadline = time.time() + duration
+    queue = multiprocessing.Queue()
+    seeds = [seed * 100003 + i for i in range(clients)]
+    workers = [multiprocessing.Process(target=_worker,
+                                       args=(port, harbors, deadline, seeds[i::procs], queue))
+               for i in range(procs)]
+    for w in workers:
+        w.start()
+    samples = {}
+    for _ in workers:
+        for route, values in queue.get().items():
+            if route == "_errors":
+                samples[route] = samples.get(route, 0) + values
+            else:
+                samples.setdefault(route, []).extend(values)
+    for w in workers:
+        w.join()
+    return summarize(samples, duration)
+
+
+def print_result(kind, result):
+    print(f"\n[{kind}] {result['count']:,} 요청, {result['rps']:,} req/s, "
+          f"p50 {result.get('p50_ms')} ms, p99 {result.get('p99_ms')} ms, 오류 {result['errors']}")
+    for route, r in result["routes"].items():
+        print(f"   {route:<15} {r['count']:>8,}  {r['rps']:>9,} req/s  "
+              f"p50 {r['p50_ms']:>8} ms  p99 {r['p99_ms']:>8} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CEDGE host load test")
+    parser.add_argument("--servers", default="flask,async", help="Comma separated: flask, async")
+    parser.add_argument("--clients", type=int, default=200, help="Concurrent clients")
+    parser.add_argument("--procs", type=int, default=min(8, os.cpu_count() or 1),
+                        help="Client processes")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds per server")
+    parser.add_argument("--harbors", type=int, default=50, help="Registered (fake) harbors")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", default=None, help="Write results to this file")
+    args = parser.parse_args()
+
+    results = {}
+    for kind in args.servers.split(","):
+        workdir = tempfile.mkdtemp(prefix=f"cedge-load-{kind}-")
+        port = free_port()
+        proc = start_host(kind, workdir, port)
+        try:
+            seed_host(port, args.harbors)
+            print(f"🚀 {kind}: client {args.clients}개 ({args.procs} 프로세스), {args.duration:g}초")
+            results[kind] = run_load(port, args.clients, max(1, args.procs), args.duration,
+                                     args.harbors, args.seed)
+        finally:
+            proc.terminate()
+            proc.wait()
+            shutil.rmtree(workdir, ignore_errors=True)
+        print_result(kind, results[kind])
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "results": results}, f, indent=2)
+        print(f"\n📝 {args.json}")
+
+
+if __name__ == "__main__":
+    main()
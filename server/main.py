@@ -1,11 +1,41 @@
+import signal
+import argparse
 from flask import Flask
 from host_api import host_bp
 from harbor_api import harbor_bp
+import metrics
+import replicator
+import host_async
+from common.profiler import profile, MODES as PROFILE_MODES, SAMPLE_INTERVAL
 
 app = Flask(__name__)
 app.register_blueprint(host_bp)
 app.register_blueprint(harbor_bp)
+metrics.install(app)
 
 if __name__ == "__main__":
-    print("🔗 CEDGE Host 서버 실행 중... (http://localhost:8000)")
-    app.run(host="0.0.0.0", port=8000)
\ No newline at end of file
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bind", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--server", choices=["async", "flask"], default="async",
+                        help="async: group commit + in-memory reads (host_async.py), flask: dev server")
+    parser.add_argument("--no-replicator", action="store_true",
+                        help="Do not run background replication (load tests)")
+    parser.add_argument("--profile", default=None, metavar="FILE",
+                        help="Profile the host until it stops (Ctrl+C) and write the result to FILE")
+    parser.add_argument("--profile-mode", choices=PROFILE_MODES, default="sample",
+                        help="sample (default): all threads as collapsed stacks, cprofile: main thread only")
+    parser.add_argument("--sample-interval", type=float, default=SAMPLE_INTERVAL)
+    args = parser.parse_args()
+
+    print(f"🔗 CEDGE Host 서버 실행 중... (http://localhost:{args.port}, {args.server})")
+    if not args.no_replicator:
+        replicator.start()
+    if args.profile:
+        # 프로파일 결과는 종료할 때 쓰므로 SIGTERM 도 Ctrl+C 처럼 처리한다
+        signal.signal(signal.SIGTERM, signal.default_int_handler)
+    with profile(args.profile, args.profile_mode, args.sample_interval):
+        if args.server == "flask":
+            app.run(host=args.bind, port=args.port, threaded=True)
+        else:
+            host_async.serve(app, args.bind, args.port)
@@ -0,0 +1,49 @@
+# server/metrics.py
+# host 지표: 요청마다 route 별 처리 시간을 재는 미들웨어와 GET /metrics
+#
+# - Flask 앱은 install(app) 으로 before/after_request 에서 잰다 (응답 객체가 만들어질 때까지,
+#   NDJSON 스트림은 본문을 다 보내기 전 시간). async host 가 직접 처리하는 route 는 HostApp 이
+#   observe_request 로 같은 이름의 지표에 남긴다. route 는 Flask rule 형식(/api/uuid/<uuid_>)이다.
+# - DB 트랜잭션(잠금 대기, COMMIT), view 재로딩, group commit, 저널 flush 시간은
+#   common/db.py, host_async.py, common/journal.py 가 같은 METRICS 에 기록한다.
+# - /metrics 는 Prometheus text 형식, /metrics?format=json 은 count / 평균 / p50 / p99 요약
+import os
+import sys
+import time
+from flask import Blueprint, Response, request, g, jsonify
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.timings import METRICS
+
+UNMATCHED = "<unmatched>"   # 없는 경로는 label 이 늘어나지 않도록 하나로 묶는다
+
+metrics_bp = Blueprint("metrics", __name__)
+
+
+def observe_request(method, route, status, seconds):
+    METRICS.observe("cedge_http_request_duration_seconds", seconds, method=method, route=route)
+    METRICS.inc("cedge_http_requests_total", method=method, route=route, status=status)
+
+
+def install(app):
+    @app.before_request
+    def start_timer():
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def record_request(response):
+        started = g.pop("request_started", None)
+        if started is not None:
+            route = request.url_rule.rule if request.url_rule else UNMATCHED
+            observe_request(request.method, route, response.status_code,
+                            time.perf_counter() - started)
+        return response
+
+    app.register_blueprint(metrics_bp)
+
+
+@metrics_bp.route("/metrics", methods=["GET"])
+def metrics():
+    if request.args.get("format") == "json":
+        return jsonify(METRICS.as_dict())
+    return Response(METRICS.render(), mimetype="text/plain; version=0.0.4")
@@ -0,0 +1,139 @@
+# server/replica_api.py
+# harbor 간 복제: host 의 replicator 가 요청하면 다른 harbor 에서 파일을 가져온다
+#
+#   POST /replicate  {"uuid": ..., "sources": [harbor_url, ...]}
+#                    또는 {"files": [{"uuid": ..., "sources": [...]}, ...]} (한 번에 여러 개)
+#   GET  /merkle?prefix=<p>&prefix=<q>  또는 POST /merkle {"prefixes": [...]}
+#
+# source harbor 의 /files/<uuid> manifest 를 받고, 이 harbor 에 없는 chunk 만
+# /chunks/<sha256> 로 가져와 검증한 뒤 저장한다. 이미 가진 UUID 면 아무것도 받지 않는다.
+# 여러 UUID 를 한 요청으로 받으면 harbor DB 에는 한 트랜잭션으로 기록한다.
+# source 가 그 UUID 를 새 버전으로 대체했다고(410) 하면 410 과 superseded_by 를 그대로 돌려준다.
+#
+# /merkle 은 이 harbor 가 가진 파일들의 Merkle tree 노드를 돌려준다. host 의 replicator 가
+# 자기 기록(host 가 이 harbor 에 있다고 아는 파일)과 비교해 다른 부분만 내려가 본다.
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from flask import Blueprint, request, jsonify
+from harbor_main import get_harbor_db, open_chunk_store, make_session
+from common.merkle import parse_prefixes, DEPTH
+from common.paths import clean_relpath
+
+REQUEST_TIMEOUT = 60
+REPLICATE_JOBS = 4     # 여러 UUID 를 받을 때 동시에 가져오는 파일 수
+
+replica_bp = Blueprint('replica', __name__)
+
+
+def _pull(session, store, source, uuid_):
+    """source harbor 에서 파일을 가져와 (manifest, 새로 받은 바이트 수) 반환"""
+    res = session.get(f"{source}/files/{uuid_}", timeout=REQUEST_TIMEOUT)
+    res.raise_for_status()
+    manifest = res.json()
+    manifest["path"] = clean_relpath(manifest["path"])  # 다른 harbor 가 준 경로도 검사한다
+
+    fetched = 0
+    for chunk_hash, _ in manifest["chunks"]:
+        if store.has(chunk_hash):
+            continue
+        res = session.get(f"{source}/chunks/{chunk_hash}", timeout=REQUEST_TIMEOUT)
+        res.raise_for_status()
+        if hashlib.sha256(res.content).hexdigest() != chunk_hash:
+            raise ValueError(f"chunk hash mismatch: {chunk_hash}")
+        store.put(chunk_hash, res.content)
+        fetched += len(res.content)
+    return manifest, fetched
+
+
+def _replicate_one(session, store, uuid_, sources):
+    """sources 를 차례로 시도한다. (결과, manifest) — 실패하면 manifest 는 None"""
+    errors = []
+    superseded_by = None
+    for source in sources:
+        try:
+            manifest, fetched = _pull(session, store, source.rstrip("/"), uuid_)
+        except (requests.RequestException, ValueError, KeyError) as e:
+            if getattr(getattr(e, "response", None), "status_code", None) == 410:
+                try:
+                    superseded_by = e.response.json().get("superseded_by") or superseded_by
+                except ValueError:
+                    pass
+            errors.append(f"{source}: {e}")
+            continue
+        return {"uuid": uuid_, "status": 200, "source": source, "fetched": fetched}, manifest
+
+    if superseded_by:
+        return {"uuid": uuid_, "status": 410, "error": "Superseded by a newer version",
+                "superseded_by": superseded_by, "details": errors}, None
+    return {"uuid": uuid_, "status": 502, "error": "No source could provide the file",
+            "details": errors}, None
+
+
+def _valid_item(item):
+    return isinstance(item, dict) and isinstance(item.get("uuid"), str) and item["uuid"] \
+        and isinstance(item.get("sources"), list) and item["sources"] \
+        and all(isinstance(s, str) for s in item["sources"])
+
+
+@replica_bp.route("/replicate", methods=["POST"])
+def replicate():
+    """
+    {"uuid", "sources"} 하나, 또는 {"files": [{"uuid", "sources"}, ...]} 여러 개를 한 번에 가져온다.
+    받은 파일은 마지막에 한 트랜잭션으로 기록하고, 여러 개면 {"results": [{"uuid", "status", ...}]} 로 답한다.
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "Missing required fields"}), 400
+    batch = "files" in data
+    items = data["files"] if batch else [data]
+    if not isinstance(items, list) or not all(_valid_item(item) for item in items):
+        return jsonify({"error": "Missing required fields"}), 400
+
+    db = get_harbor_db()
+    have = db.known_uuids([item["uuid"] for item in items])
+    store = open_chunk_store()
+    session = make_session(REPLICATE_JOBS)
+    results = {}
+    todo = []
+    for item in items:
+        if item["uuid"] in have:
+            results[item["uuid"]] = {"uuid": item["uuid"], "status": 200, "fetched": 0,
+                                     "stored": True}
+        else:
+            todo.append(item)
+
+    manifests = []
+    with ThreadPoolExecutor(max_workers=REPLICATE_JOBS) as pool:
+        for result, manifest in pool.map(
+                lambda item: _replicate_one(session, store, item["uuid"], item["sources"]), todo):
+            results[result["uuid"]] = result
+            if manifest is not None:
+                manifests.append(manifest)
+
+    if manifests:
+        db.record_files(manifests)
+
+    if batch:
+        ordered = [results[item["uuid"]] for item in items]
+        return jsonify({"results": ordered, "fetched": sum(r.get("fetched", 0) for r in ordered)}), 200
+
+    result = results[data["uuid"]]
+    code = result.pop("status")
+    if code != 200:
+        result.pop("uuid")
+        return jsonify(result), code
+    if result.pop("stored", False):
+        return jsonify({"status": "Already stored", **result}), 200
+    return jsonify({"status": "Replicated", **result}), 200
+
+
+@replica_bp.route("/merkle", methods=["GET", "POST"])
+def merkle():
+    data = (request.get_json(silent=True) or {}) if request.method == "POST" else {}
+    prefixes = parse_prefixes(data.get("prefixes") or request.args.getlist("prefix"))
+    if prefixes is None:
+        return jsonify({"error": "Invalid prefixes"}), 400
+    tree = get_harbor_db().merkle_tree()
+    return jsonify({"depth": DEPTH, "nodes": {p: tree.node(p) for p in prefixes}}), 200
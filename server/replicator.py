@@ -0,0 +1,186 @@
+# server/replicator.py
+# host 의 백그라운드 재복제
+#
+# 프로젝트마다 관리 harbor 들로 해시 링(common.placement)을 만들고, 각 파일의 최신 버전 UUID 가
+# 링이 정한 REPLICAS 개 harbor 에 모두 있는지 확인한다. 빠진 harbor 에는
+# 이미 가진 harbor 들을 source 로 주고 POST <harbor>/replicate 로 가져가게 한다
+# (target harbor 별로 BATCH_SIZE 개씩 묶어 한 요청으로 보낸다).
+# 예전 버전은 harbor 가 지우고 410 을 돌려주므로 복제하지 않는다. 아직 host 가 모르는 새 버전 때문에
+# source 가 410 을 주면 실패로 세지 않고 건너뛴다 (새 버전이 등록되면 그 UUID 로 계획된다).
+#
+# harbor 가 추가되거나 제거되면 wake() 로 바로 한 번 돌고, 그 밖에는 INTERVAL 마다 돈다.
+# heartbeat 가 끊긴 harbor 는 링에서 빠지므로, 그 harbor 에만 있던 replica 도 다른 곳에 다시 채워진다.
+# 링에서 빠진 위치의 기존 replica 는 지우지 않는다 (읽기 분산에 그대로 쓰인다).
+#
+# 복제 계획 전에 살아 있는 harbor 마다 anti-entropy 검사를 한다: host 가 그 harbor 에 있다고
+# 아는 파일들의 Merkle tree 와 harbor 의 /merkle 을 비교해 다른 버킷만 내려가 본다.
+# 일치하면 요청 한 번으로 끝난다. harbor 에 없는 replica 기록은 지워 다시 복제되게 하고,
+# host 가 몰랐던 replica(host 에 등록된 UUID)는 기록에 더한다.
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from utils import get_db, write_log, record_event
+from health import rank_harbors, writable_harbors
+from common.placement import HashRing, placement_key, REPLICAS
+from common.merkle import diff_trees, http_fetcher
+
+INTERVAL = 60
+JOBS = 8
+BATCH_SIZE = 100        # /replicate 한 번에 보내는 UUID 수 (target harbor 는 harbor_db 를 한 번만 기록한다)
+REQUEST_TIMEOUT = 600
+
+_wake = threading.Event()
+_thread = None
+
+
+def make_session(pool_size=JOBS):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def plan_project(db, project, replicas=REPLICAS):
+    """(uuid, target harbor, source harbor 목록) 복제 작업과 source 가 하나도 없는 UUID 목록"""
+    # heartbeat 가 끊긴 harbor 는 source 로도, 배치 대상으로도 쓰지 않는다.
+    # source 는 여유 있는 harbor 부터 시도하도록 순위 순으로 준다
+    names = db.harbors_for_project(project)
+    live = [h["name"] for h in rank_harbors(db, names) if h["alive"] is not False]
+    ring = HashRing(writable_harbors(db, names))
+    tasks = []
+    lost = []
+    for uuid_, have in db.project_uuids(project, latest_only=True):
+        sources = [h for h in live if h in have]
+        for target in ring.lookup(placement_key(uuid_), replicas):
+            if target in have:
+                continue
+            if not sources:
+                lost.append(uuid_)
+                break
+            tasks.append((uuid_, target, sources))
+    return tasks, lost
+
+
+def verify_harbor(db, session, project, harbor, url):
+    """host 기록과 harbor 가 실제로 가진 파일을 맞춘다. 고친 replica 기록 수를 반환"""
+    diffs, _ = diff_trees(db.merkle_tree(project, harbor), http_fetcher(session, f"{url}/merkle"))
+    fixed = 0
+    for base, (recorded, actual) in diffs.items():
+        recorded_info = db.get_uuid(recorded) if recorded else None
+        actual_info = db.get_uuid(actual) if actual else None
+        if actual_info and (recorded_info is None or actual_info["version"] >= recorded_info["version"]):
+            # harbor 가 가진 버전을 host 가 몰랐다 (기록된 버전은 harbor 에서 대체된 것)
+            db.add_replica(actual, harbor)
+            record_event("replica-found", project=project, uuid=actual, file=base, harbor=harbor)
+            fixed += 1
+        elif actual and actual_info is None:
+            record_event("replica-unregistered", project=project, uuid=actual, file=base,
+                         harbor=harbor)
+        elif recorded:
+            # host 기록에는 있지만 harbor 에 그 버전이 없다 → 기록을 지우면 다음 계획에서 다시 복제된다
+            db.remove_replica(recorded, harbor)
+            write_log(f"replica-missing: uuid={recorded} harbor={harbor}", "replica-missing",
+                      project=project, uuid=recorded, file=base, harbor=harbor)
+            fixed += 1
+    return fixed
+
+
+def copy_replicas(session, urls, target, batch):
+    """batch: [(uuid, sources), ...] 를 target 이 한 요청으로 가져가게 한다. UUID 별 결과 목록 반환"""
+    res = session.post(f"{urls[target]}/replicate", json={
+        "files": [{"uuid": uuid_, "sources": [urls[s] for s in sources]} for uuid_, sources in batch]
+    }, timeout=REQUEST_TIMEOUT)
+    res.raise_for_status()
+    return res.json()["results"]
+
+
+def group_tasks(tasks, batch_size=BATCH_SIZE):
+    """(uuid, target, sources) 작업을 target 별로 묶어 [(target, [(uuid, sources), ...]), ...]"""
+    by_target = {}
+    for uuid_, target, sources in tasks:
+        by_target.setdefault(target, []).append((uuid_, sources))
+    return [(target, items[i:i + batch_size])
+            for target, items in by_target.items()
+            for i in range(0, len(items), batch_size)]
+
+
+def replicate_once(replicas=REPLICAS, jobs=JOBS):
+    """한 번 전체를 점검하고 {"copied", "failed", "lost", "bytes"} 반환"""
+    db = get_db()
+    urls = {h["name"]: h["url"].rstrip("/") for h in db.list_harbors()}
+    session = make_session(jobs)
+    result = {"copied": 0, "failed": 0, "lost": 0, "bytes": 0, "repaired": 0}
+
+    for project in db.list_projects():
+        for h in rank_harbors(db, db.harbors_for_project(project)):
+            if h["alive"] is False or h["name"] not in urls:
+                continue
+            try:
+                result["repaired"] += verify_harbor(db, session, project, h["name"], urls[h["name"]])
+            except (requests.RequestException, ValueError, KeyError):
+                continue  # 응답하지 않거나 /merkle 이 없는 harbor 는 이번에는 건너뛴다
+
+        tasks, lost = plan_project(db, project, replicas)
+        result["lost"] += len(lost)
+        for uuid_ in lost:
+            write_log(f"replica-lost: uuid={uuid_} project={project}", "replica-lost",
+                      project=project, uuid=uuid_, file=placement_key(uuid_))
+        if not tasks:
+            continue
+
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            futures = {pool.submit(copy_replicas, session, urls, target, batch): (target, batch)
+                       for target, batch in group_tasks(tasks)}
+            for future, (target, batch) in futures.items():
+                try:
+                    copies = future.result()
+                except (requests.RequestException, ValueError, KeyError) as e:
+                    copies = [{"uuid": uuid_, "status": None, "error": str(e)} for uuid_, _ in batch]
+                for copy in copies:
+                    uuid_ = copy.get("uuid")
+                    if copy.get("status") == 410:
+                        continue  # source 에서 새 버전으로 대체됨
+                    if copy.get("status") != 200:
+                        result["failed"] += 1
+                        write_log(f"replica-failed: uuid={uuid_} target={target} "
+                                  f"error={copy.get('error')}",
+                                  "replica-failed", project=project, uuid=uuid_, harbor=target)
+                        continue
+                    result["bytes"] += copy.get("fetched", 0)
+                    db.add_replica(uuid_, target)
+                    record_event("replica-added", project=project, uuid=uuid_,
+                                 file=placement_key(uuid_), harbor=target)
+                    result["copied"] += 1
+
+    if result["copied"] or result["failed"] or result["lost"] or result["repaired"]:
+        write_log(f"replication-pass: copied={result['copied']} failed={result['failed']} "
+                  f"lost={result['lost']} repaired={result['repaired']} bytes={result['bytes']}",
+                  "replication-pass", **result)
+    return result
+
+
+def wake():
+    """harbor 구성이 바뀌었을 때 다음 주기를 기다리지 않고 바로 점검하게 한다"""
+    _wake.set()
+
+
+def _loop(interval):
+    while True:
+        _wake.wait(interval)
+        _wake.clear()
+        try:
+            replicate_once()
+        except Exception as e:
+            write_log(f"replication-error: {e}", "replication-error")
+
+
+def start(interval=INTERVAL):
+    global _thread
+    if _thread is None:
+        _thread = threading.Thread(target=_loop, args=(interval,), daemon=True)
+        _thread.start()
+    return _thread
@@ -0,0 +1,306 @@
+# server/upload_api.py
+# harbor 의 이어받기 가능한 업로드 세션 (cedge push 가 사용)
+#
+# 1. POST /upload/sessions                 파일 manifest 목록을 받고, harbor 에 없는 chunk 만 골라
+#                                          업로드할 바이트 스트림(없는 chunk 를 이어 붙인 것)의 크기를 정한다
+# 2. PUT  /upload/sessions/<id>/parts/<n>  스트림을 part_size 단위로 나눈 n 번째 조각. 순서와 상관없이
+#                                          동시에 받을 수 있고, 받은 조각 번호는 parts 파일에 기록된다
+# 3. GET  /upload/sessions/<id>            받은 조각 번호 (연결이 끊긴 뒤 이어서 보낼 때 사용)
+# 4. POST /upload/sessions/<id>/commit     chunk 해시 검증 → ChunkStore 저장 → host 에 UUID 등록
+#                                          → harbor DB 반영 → 세션 삭제
+#
+# 세션은 .cedge/harbor/uploads/<id>/ 아래 session.json, data(스트림), parts 로 저장되므로
+# harbor 를 다시 시작해도 이어서 받을 수 있다.
+import os
+import re
+import json
+import uuid
+import hashlib
+from contextlib import contextmanager, ExitStack
+
+from flask import Blueprint, request, jsonify
+from harbor_main import (HARBOR_DIR, BATCH_SIZE, get_harbor_db, file_lock, open_chunk_store,
+                         make_session, post_batch)
+from common.paths import clean_relpath
+
+UPLOAD_DIR = os.path.join(HARBOR_DIR, "uploads")
+PART_SIZE = 8 << 20
+MIN_PART_SIZE = 1 << 20
+MAX_PART_SIZE = 64 << 20
+COPY_SIZE = 1 << 20
+_SID_RE = re.compile(r"^[0-9a-f]{32}$")
+
+upload_bp = Blueprint('upload', __name__)
+
+
+def _session_lock(sid):
+    return file_lock(os.path.join(_session_dir(sid), "lock"))
+
+
+def _session_dir(sid):
+    return os.path.join(UPLOAD_DIR, sid)
+
+
+@contextmanager
+def _locked_session(sid):
+    """세션 잠금을 잡은 채로 session 을 준다. 없거나 이미 commit 된 세션이면 None"""
+    with ExitStack() as stack:
+        try:
+            if not _SID_RE.match(sid):
+                raise FileNotFoundError(sid)
+            stack.enter_context(_session_lock(sid))
+        except FileNotFoundError:
+            yield None
+            return
+        yield _load_session(sid)
+
+
+def _load_session(sid):
+    if not _SID_RE.match(sid):
+        return None
+    try:
+        with open(os.path.join(_session_dir(sid), "session.json"), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _received_parts(sid):
+    try:
+        with open(os.path.join(_session_dir(sid), "parts"), "r") as f:
+            return {int(line) for line in f if line.strip()}
+    except OSError:
+        return set()
+
+
+def _part_count(session):
+    return -(-session["total"] // session["part_size"])
+
+
+def _part_length(session, n):
+    return min(session["part_size"], session["total"] - n * session["part_size"])
+
+
+def _session_status(session, received):
+    return {
+        "session": session["id"],
+        "part_size": session["part_size"],
+        "total": session["total"],
+        "parts": _part_count(session),
+        "received": sorted(received),
+        "missing_chunks": len(session["missing"])
+    }
+
+
+def _valid_file(item):
+    if not isinstance(item, dict) or not all(k in item for k in ("uuid", "path", "size", "hash", "chunks")):
+        return False
+    if not isinstance(item["uuid"], str) or not isinstance(item["size"], int) \
+            or not isinstance(item["chunks"], list):
+        return False
+    return all(isinstance(c, list) and len(c) == 2 and isinstance(c[0], str) and isinstance(c[1], int)
+               for c in item["chunks"])
+
+
+@upload_bp.route("/upload/sessions", methods=["POST"])
+def create_session():
+    """
+    body: {"project": ..., "part_size": ..., "files": [{"uuid", "base_uuid", "path", "version",
+           "size", "hash", "chunks": [[sha256, size], ...]}, ...]}
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or not data.get("project") or not isinstance(data.get("files"), list):
+        return jsonify({"error": "Missing required fields"}), 400
+    try:
+        part_size = min(max(int(data.get("part_size", PART_SIZE)), MIN_PART_SIZE), MAX_PART_SIZE)
+    except (TypeError, ValueError):
+        return jsonify({"error": "Invalid part_size"}), 400
+
+    if data["project"] != get_harbor_db().info()["project"]:
+        return jsonify({"error": "Harbor does not manage this project"}), 403
+
+    for item in data["files"]:
+        if not _valid_file(item):
+            path = item.get("path") if isinstance(item, dict) else None
+            return jsonify({"error": "Missing required fields", "file": path}), 400
+        try:
+            item["path"] = clean_relpath(item["path"])
+        except ValueError as e:
+            return jsonify({"error": str(e), "file": item["path"]}), 400
+
+    # 여러 파일에 같은 chunk 가 있으면 처음 나온 한 번만 받는다 (client 도 같은 순서로 보냄)
+    store = open_chunk_store()
+    missing = {}
+    for item in data["files"]:
+        for chunk_hash, size in item["chunks"]:
+            if chunk_hash not in missing and not store.has(chunk_hash):
+                missing[chunk_hash] = size
+
+    session = {
+        "id": uuid.uuid4().hex,
+        "project": data["project"],
+        "part_size": part_size,
+        "total": sum(missing.values()),
+        "missing": [[h, size] for h, size in missing.items()],
+        "files": data["files"]
+    }
+
+    sdir = _session_dir(session["id"])
+    os.makedirs(sdir)
+    with open(os.path.join(sdir, "data"), "wb") as f:
+        f.truncate(session["total"])
+    open(os.path.join(sdir, "parts"), "w").close()
+    with open(os.path.join(sdir, "session.json"), "w", encoding="utf-8") as f:
+        json.dump(session, f)
+
+    result = _session_status(session, set())
+    result["missing"] = [h for h, _ in session["missing"]]
+    return jsonify(result), 200
+
+
+@upload_bp.route("/upload/sessions/<sid>", methods=["GET"])
+def get_session(sid):
+    session = _load_session(sid)
+    if session is None:
+        return jsonify({"error": "Upload session not found"}), 404
+    result = _session_status(session, _received_parts(sid))
+    result["missing"] = [h for h, _ in session["missing"]]
+    return jsonify(result), 200
+
+
+@upload_bp.route("/upload/sessions/<sid>/parts/<int:n>", methods=["PUT"])
+def put_part(sid, n):
+    session = _load_session(sid)
+    if session is None:
+        return jsonify({"error": "Upload session not found"}), 404
+    if n < 0 or n >= _part_count(session):
+        return jsonify({"error": "Part out of range"}), 400
+
+    expected = _part_length(session, n)
+    offset = n * session["part_size"]
+    digest = hashlib.sha256()
+    written = 0
+
+    # 조각을 메모리에 모으지 않고 받은 만큼 제자리(offset)에 쓴다
+    try:
+        fd = os.open(os.path.join(_session_dir(sid), "data"), os.O_WRONLY)
+    except FileNotFoundError:
+        return jsonify({"error": "Upload session not found"}), 404  # 그 사이에 commit 되었다
+    try:
+        while written <= expected:
+            block = request.stream.read(COPY_SIZE)
+            if not block:
+                break
+            if written + len(block) <= expected:
+                os.pwrite(fd, block, offset + written)
+            digest.update(block)
+            written += len(block)
+        if written == expected:
+            os.fsync(fd)
+    finally:
+        os.close(fd)
+
+    if written != expected:
+        return jsonify({"error": "Part length mismatch", "expected": expected,
+                        "received": written}), 400
+    part_hash = request.headers.get("X-Part-Sha256")
+    if part_hash and part_hash != digest.hexdigest():
+        return jsonify({"error": "Part hash mismatch"}), 422
+
+    with _locked_session(sid) as current:
+        if current is None:
+            return jsonify({"error": "Upload session not found"}), 404
+        with open(os.path.join(_session_dir(sid), "parts"), "a") as f:
+            f.write(f"{n}\n")
+    return jsonify({"part": n, "offset": offset, "length": expected}), 200
+
+
+def _store_chunks(sid, session, store):
+    """스트림에서 chunk 를 잘라 검증 후 저장. 해시가 틀린 chunk 가 걸친 조각 번호를 반환"""
+    bad_parts = set()
+    offset = 0
+    with open(os.path.join(_session_dir(sid), "data"), "rb") as f:
+        for chunk_hash, size in session["missing"]:
+            data = f.read(size)
+            if hashlib.sha256(data).hexdigest() != chunk_hash:
+                first = offset // session["part_size"]
+                last = (offset + max(size, 1) - 1) // session["part_size"]
+                bad_parts.update(range(first, last + 1))
+            else:
+                store.put(chunk_hash, data)
+            offset += size
+    return bad_parts
+
+
+def _register_with_host(project, harbor_name, files):
+    """host 에 UUID 를 등록하고 uuid -> (status, error) 를 반환"""
+    session = make_session()
+    status = {}
+    versions = {item["uuid"]: item.get("version", 1) for item in files}
+    for i in range(0, len(files), BATCH_SIZE):
+        batch, results, error = post_batch(session, project, harbor_name, files[i:i + BATCH_SIZE])
+        if error is not None:
+            for item in batch:
+                status[item["uuid"]] = (502, error)
+            continue
+        for r in results:
+            code = r.get("status")
+            # 이전 commit 이 host 등록 후 중단된 경우: 같은 프로젝트, 같은 버전으로 이미 등록되어 있으면
+            # 성공으로 본다 (다른 버전이 같은 UUID 를 쓰고 있으면 새 버전이 host 에 알려지지 않으므로 실패)
+            if code == 409 and r.get("registered_project") == project \
+                    and r.get("registered_version") == versions.get(r.get("uuid")):
+                code = 200
+            status[r.get("uuid")] = (code, r.get("error"))
+    return status
+
+
+@upload_bp.route("/upload/sessions/<sid>/commit", methods=["POST"])
+def commit_session(sid):
+    # 이미 commit 된 세션(응답을 못 받은 client 의 재시도)이나 없는 세션은 404
+    with _locked_session(sid) as session:
+        if session is None:
+            return jsonify({"error": "Upload session not found"}), 404
+
+        received = _received_parts(sid)
+        missing_parts = sorted(set(range(_part_count(session))) - received)
+        if missing_parts:
+            return jsonify({"error": "Upload incomplete", "missing_parts": missing_parts}), 409
+
+        store = open_chunk_store()
+        bad_parts = _store_chunks(sid, session, store)
+        if bad_parts:
+            # 해당 조각만 다시 받도록 기록에서 지운다
+            with open(os.path.join(_session_dir(sid), "parts"), "w") as f:
+                f.writelines(f"{n}\n" for n in sorted(received - bad_parts))
+            return jsonify({"error": "Chunk hash mismatch", "missing_parts": sorted(bad_parts)}), 422
+
+        absent = {h for item in session["files"] for h, _ in item["chunks"] if not store.has(h)}
+        if absent:
+            return jsonify({"error": "Chunks missing from harbor store",
+                            "chunks": sorted(absent)}), 409
+
+        db = get_harbor_db()
+        status = _register_with_host(session["project"], db.info()["harbor_name"], session["files"])
+
+        results = []
+        committed_files = []
+        for item in session["files"]:
+            code, error = status.get(item["uuid"], (500, "No response from host"))
+            results.append({"uuid": item["uuid"], "path": item["path"], "status": code,
+                            **({"error": error} if code != 200 else {})})
+            if code == 200:
+                committed_files.append(item)
+        db.record_files(committed_files)
+
+        for name in ("data", "parts", "session.json", "lock"):
+            os.remove(os.path.join(_session_dir(sid), name))
+        os.rmdir(_session_dir(sid))
+
+    committed = sum(1 for r in results if r["status"] == 200)
+    return jsonify({
+        "status": "Committed",
+        "committed": committed,
+        "failed": len(results) - committed,
+        "stored_bytes": session["total"],
+        "results": results
+    }), 200
@@ -1,26 +1,42 @@
-import json
 import os
-import datetime
+import sys
+import threading
 
-DATA_PATH = "host_db.json"
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.db import HostDB
+from common.journal import Journal, FLUSH_INTERVAL
+from common.timings import METRICS
+
+DATA_PATH = "host_db.sqlite3"
+LEGACY_DATA_PATH = "host_db.json"
 LOG_DIR = "logs"
 LOG_FILE = os.path.join(LOG_DIR, "project_registration_log.txt")
+JOURNAL_DIR = os.path.join(LOG_DIR, "journal")
+
+_db = None
+_journal = None
+_journal_lock = threading.Lock()
 
-if not os.path.exists(DATA_PATH):
-    with open(DATA_PATH, "w") as f:
-        json.dump({"projects": {}, "uuids": {}, "harbors": []}, f)
+def get_journal():
+    # 이벤트는 모아서 FLUSH_INTERVAL 마다 기록된다 (요청마다 파일을 열고 닫지 않음)
+    global _journal
+    with _journal_lock:
+        if _journal is None:
+            _journal = Journal(JOURNAL_DIR, flush_interval=FLUSH_INTERVAL, text_log=LOG_FILE)
+    return _journal
 
-def write_log(message):
-    if not os.path.exists(LOG_DIR):
-        os.makedirs(LOG_DIR)
-    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    with open(LOG_FILE, "a") as f:
-        f.write(f"[{timestamp}] {message}\\n")
+def write_log(message, event="log", **fields):
+    """사람이 읽는 로그(LOG_FILE) 한 줄 + 저널 이벤트"""
+    get_journal().append(event, message=message, **fields)
 
-def load_db():
-    with open(DATA_PATH, "r") as f:
-        return json.load(f)
+def record_event(event, **fields):
+    """LOG_FILE 에는 남기지 않는 저널 이벤트 (파일 버전 등록처럼 수가 많은 것)"""
+    get_journal().append(event, **fields)
 
-def save_db(db):
-    with open(DATA_PATH, "w") as f:
-        json.dump(db, f, indent=2)
+def get_db():
+    # 기존 host_db.json 이 있으면 최초 실행 시 SQLite 로 옮겨온다
+    global _db
+    if _db is None:
+        with METRICS.time("cedge_db_open_seconds"):
+            _db = HostDB(DATA_PATH, legacy_json=LEGACY_DATA_PATH)
+    return _db
@@ -0,0 +1,30 @@
+# tests/conftest.py
+# cli/ 모듈을 benchmarks 와 같은 방식으로 불러온다
+import os
+import sys
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPO_DIR, "cli"))
+sys.path.insert(0, REPO_DIR)
+
+import pytest
+
+
+def cold():
+    """열어 둔 pack / 저널을 닫아 다음 단계가 새 CLI 실행처럼 디스크에서 읽게 한다"""
+    import log
+    import packstore
+    for journal in log._journals.values():
+        journal.flush()
+    log._journals.clear()
+    for store in packstore._stores.values():
+        store.close()
+    packstore._stores.clear()
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    cold()
+    yield tmp_path
+    cold()
@@ -0,0 +1,53 @@
+# tests/test_record_diff.py
+# revert_records(new, diff_records(old, new)) 가 old 를 그대로 돌려주는지 확인한다
+import json
+
+import pytest
+
+from record_diff import diff_records, revert_records
+
+JSONL_OLD = [json.dumps({"id": i, "name": f"n{i}", "score": i * 10}) for i in range(8)]
+JSONL_NEW = [
+    JSONL_OLD[1],
+    json.dumps({"id": 0, "name": "n0", "score": 999}),   # 키는 같고 내용만 바뀜 + 자리 이동
+    JSONL_OLD[2],
+    json.dumps({"id": 100, "name": "new", "score": 1}),  # 추가
+    JSONL_OLD[4],
+    JSONL_OLD[4],                                        # 중복 레코드
+    json.dumps({"id": 5, "name": "n5-edit", "score": 50}),
+    JSONL_OLD[7],
+    json.dumps({"name": "no-key"}),                       # 키가 없는 레코드
+]
+
+CSV_OLD = ["id,name,score"] + [f"{i},n{i},{i * 10}" for i in range(8)]
+CSV_NEW = ["id,name,score"] + [
+    "1,n1,10", "0,n0,999", "2,n2,20", "100,new,1", "4,n4,40", "4,n4,40", "5,n5-edit,50", "7,n7,70"]
+
+CASES = [
+    ("jsonl", JSONL_OLD, JSONL_NEW, "id"),
+    ("csv", CSV_OLD, CSV_NEW, "id"),
+    ("tsv", [l.replace(",", "\t") for l in CSV_OLD], [l.replace(",", "\t") for l in CSV_NEW], "id"),
+    ("csv", CSV_OLD, ["id,label,score"] + CSV_NEW[1:], "id"),   # 헤더가 바뀐 경우
+]
+
+
+@pytest.mark.parametrize("fmt, old, new, key", CASES)
+@pytest.mark.parametrize("use_key", [False, True])
+def test_round_trip(fmt, old, new, key, use_key):
+    records = diff_records(old, new, 2, fmt, key if use_key else None)
+    assert len(records) == 1
+    assert revert_records(new, records[0]) == old
+
+
+@pytest.mark.parametrize("fmt, old, new, key", CASES)
+def test_round_trip_reversed(fmt, old, new, key):
+    records = diff_records(new, old, 2, fmt, key)
+    assert revert_records(old, records[0]) == new
+
+
+@pytest.mark.parametrize("fmt, lines", [("jsonl", JSONL_OLD), ("csv", CSV_OLD)])
+def test_edge_cases(fmt, lines):
+    assert diff_records(lines, list(lines), 2, fmt, "id") == []
+    for old, new in ((lines, []), ([], lines)):
+        records = diff_records(old, new, 2, fmt, "id")
+        assert revert_records(new, records[0]) == old